@@ -0,0 +1,19 @@
+"""ASGI entry point for the async app.
+
+Run with:
+    hypercorn asgi:app --bind 127.0.0.1:5000
+    OR
+    python asgi.py
+"""
+from src.asgi_app import create_asgi_app
+from src.config.settings import Config
+
+app = create_asgi_app()
+
+if __name__ == "__main__":
+    print(f"Starting async server on http://127.0.0.1:{Config.FLASK_PORT}")
+    app.run(
+        host='127.0.0.1',
+        port=Config.FLASK_PORT,
+        debug=Config.FLASK_DEBUG
+    )
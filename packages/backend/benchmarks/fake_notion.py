@@ -0,0 +1,351 @@
+"""Local stand-in for the Notion API used by the benchmarks.
+
+Implements the subset of endpoints NotionService calls (database query and
+retrieve, page create/retrieve/update, block children list/append, block
+update/delete) against in-memory data, with configurable latency, rate
+limiting and error injection. Block payloads over Notion's size limits are
+rejected with a validation_error like the real API.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+from src.services.description_blocks import MAX_BLOCKS_PER_REQUEST, MAX_RICH_TEXT_ITEMS, MAX_TEXT_LENGTH
+from src.services.throttled_client import endpoint_name
+
+
+class FakeNotion:
+    """In-memory Notion workspace plus the knobs that shape its responses."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0,
+                 rate_limit: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        """Initialize an empty workspace.
+
+        Args:
+            latency: Seconds added to every response
+            jitter: Extra random latency, up to this many seconds
+            rate_limit: Requests per second allowed before answering 429
+                (0 disables rate limiting)
+            error_rate: Share of requests answered with a 503
+            seed: Seed for jitter and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self.pages: Dict[str, Dict] = {}
+        self.blocks: Dict[str, List[Dict]] = {}
+        self.calls: Dict[str, int] = {}
+        self.rate_limited = 0
+        self.errors = 0
+        self._tokens = rate_limit
+        self._updated = time.monotonic()
+
+    # Accounting
+
+    def total_calls(self) -> int:
+        """Return the number of requests received so far."""
+        with self._lock:
+            return sum(self.calls.values())
+
+    def snapshot(self) -> Dict:
+        """Return request counters (per endpoint, 429s and injected errors)."""
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "rate_limited": self.rate_limited,
+                "injected_errors": self.errors
+            }
+
+    def _admit(self, endpoint: str) -> Tuple[Optional[int], Optional[str], float]:
+        """Count a request and decide whether to fail it.
+
+        Returns:
+            Tuple of (error_status, error_code, retry_after)
+        """
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+                self._updated = now
+                if self._tokens < 1:
+                    self.rate_limited += 1
+                    return 429, 'rate_limited', (1 - self._tokens) / self.rate_limit
+                self._tokens -= 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return 503, 'service_unavailable', 0.0
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        time.sleep(delay)
+        return None, None, 0.0
+
+    # Seeding
+
+    def add_page(self, database_id: str, properties: Dict) -> Dict:
+        """Store a page directly (used to seed existing postings)."""
+        return self._create_page({"parent": {"database_id": database_id}, "properties": properties})
+
+    # Request handling
+
+    def handle(self, method: str, path: str, query: Dict, body: Dict) -> Tuple[int, Dict, Dict]:
+        """Answer one API request.
+
+        Returns:
+            Tuple of (status, json_body, headers)
+        """
+        path = path.split('/v1/', 1)[-1].strip('/')
+        status, code, retry_after = self._admit(endpoint_name(method, path))
+        if status:
+            headers = {"Retry-After": f"{retry_after:.3f}"} if status == 429 else {}
+            return status, {"object": "error", "status": status, "code": code, "message": code}, headers
+
+        error = self._validate_blocks(body)
+        if error:
+            return 400, {"object": "error", "status": 400, "code": "validation_error", "message": error}, {}
+
+        match = re.fullmatch(r'databases/([^/]+)/query', path)
+        if match and method == 'POST':
+            return 200, self._query(match.group(1), body), {}
+        match = re.fullmatch(r'databases/([^/]+)', path)
+        if match and method == 'GET':
+            return 200, self._database(match.group(1)), {}
+        if path == 'pages' and method == 'POST':
+            return 200, self._create_page(body), {}
+        match = re.fullmatch(r'pages/([^/]+)', path)
+        if match:
+            page = self.pages.get(match.group(1))
+            if page is None:
+                return self._not_found()
+            if method == 'PATCH':
+                with self._lock:
+                    page['properties'].update(self._properties(body.get('properties', {})))
+                    page['last_edited_time'] = self._timestamp()
+            return 200, page, {}
+        match = re.fullmatch(r'blocks/([^/]+)/children', path)
+        if match:
+            if method == 'PATCH':
+                return 200, {"object": "list", "results": self._append(match.group(1), body.get('children', []))}, {}
+            return 200, self._list_children(match.group(1), query), {}
+        match = re.fullmatch(r'blocks/([^/]+)', path)
+        if match and method in ('PATCH', 'DELETE'):
+            return self._update_block(match.group(1), body, delete=method == 'DELETE')
+        return 400, {"object": "error", "status": 400, "code": "invalid_request_url", "message": path}, {}
+
+    @staticmethod
+    def _validate_blocks(body: Dict) -> Optional[str]:
+        """Check children and rich_text against Notion's request limits."""
+        children = body.get('children') or []
+        if len(children) > MAX_BLOCKS_PER_REQUEST:
+            return f"body.children.length should be ≤ {MAX_BLOCKS_PER_REQUEST}, instead was {len(children)}."
+        for block in children + [body]:
+            content = block.get(block.get('type', ''), {}) or next(
+                (value for value in block.values() if isinstance(value, dict) and 'rich_text' in value), {}
+            )
+            items = content.get('rich_text', [])
+            if len(items) > MAX_RICH_TEXT_ITEMS:
+                return f"rich_text.length should be ≤ {MAX_RICH_TEXT_ITEMS}, instead was {len(items)}."
+            for item in items:
+                length = len(item['text']['content'].encode('utf-16-le')) // 2
+                if length > MAX_TEXT_LENGTH:
+                    return f"text.content.length should be ≤ {MAX_TEXT_LENGTH}, instead was {length}."
+        return None
+
+    @staticmethod
+    def _not_found() -> Tuple[int, Dict, Dict]:
+        return 404, {"object": "error", "status": 404, "code": "object_not_found", "message": "Not found"}, {}
+
+    @staticmethod
+    def _timestamp() -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+
+    @staticmethod
+    def _database(database_id: str) -> Dict:
+        return {
+            "object": "database",
+            "id": database_id,
+            "properties": {
+                "Position": {"type": "title"},
+                "Company": {"type": "rich_text"},
+                "Posting URL": {"type": "url"},
+                "Origin": {"type": "select"},
+                "LinkedIn Job ID": {"type": "number"}
+            }
+        }
+
+    @staticmethod
+    def _properties(properties: Dict) -> Dict:
+        """Turn request property values into response-shaped values."""
+        result = {}
+        for name, value in properties.items():
+            prop_type = next(key for key in value if key != 'type')
+            prop = {"type": prop_type, prop_type: value[prop_type]}
+            if prop_type in ('title', 'rich_text'):
+                prop[prop_type] = [
+                    {"type": "text", "text": item['text'], "plain_text": item['text']['content']}
+                    for item in value[prop_type]
+                ]
+            result[name] = prop
+        return result
+
+    def _create_page(self, body: Dict) -> Dict:
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            "parent": body['parent'],
+            "properties": self._properties(body.get('properties', {})),
+            "last_edited_time": self._timestamp(),
+            "archived": False
+        }
+        with self._lock:
+            self.pages[page_id] = page
+        self._append(page_id, body.get('children', []))
+        return page
+
+    def _append(self, parent_id: str, children: List[Dict]) -> List[Dict]:
+        added = []
+        for child in children:
+            block = json.loads(json.dumps(child))
+            block["id"] = str(uuid.uuid4())
+            block["has_children"] = False
+            content = block.get(block['type'], {})
+            for item in content.get('rich_text', []):
+                item['plain_text'] = item['text']['content']
+            added.append(block)
+        with self._lock:
+            self.blocks.setdefault(parent_id, []).extend(added)
+        return added
+
+    def _list_children(self, parent_id: str, query: Dict) -> Dict:
+        with self._lock:
+            blocks = list(self.blocks.get(parent_id, []))
+        start = int(query.get('start_cursor') or 0)
+        size = int(query.get('page_size') or 100)
+        more = start + size < len(blocks)
+        return {
+            "object": "list",
+            "results": blocks[start:start + size],
+            "has_more": more,
+            "next_cursor": str(start + size) if more else None
+        }
+
+    def _update_block(self, block_id: str, body: Dict, delete: bool) -> Tuple[int, Dict, Dict]:
+        with self._lock:
+            for parent_id, blocks in self.blocks.items():
+                for block in blocks:
+                    if block['id'] != block_id:
+                        continue
+                    if delete:
+                        blocks.remove(block)
+                        return 200, dict(block, archived=True), {}
+                    block_type = block['type']
+                    block[block_type].update(body.get(block_type, {}))
+                    for item in block[block_type].get('rich_text', []):
+                        item['plain_text'] = item['text']['content']
+                    return 200, block, {}
+        return self._not_found()
+
+    def _query(self, database_id: str, body: Dict) -> Dict:
+        with self._lock:
+            pages = [
+                page for page in self.pages.values()
+                if page['parent'].get('database_id') == database_id and self._matches(page, body.get('filter'))
+            ]
+        start = int(body.get('start_cursor') or 0)
+        size = int(body.get('page_size') or 100)
+        more = start + size < len(pages)
+        return {
+            "object": "list",
+            "results": pages[start:start + size],
+            "has_more": more,
+            "next_cursor": str(start + size) if more else None
+        }
+
+    def _matches(self, page: Dict, condition: Optional[Dict]) -> bool:
+        if not condition:
+            return True
+        if 'or' in condition:
+            return any(self._matches(page, c) for c in condition['or'])
+        if 'and' in condition:
+            return all(self._matches(page, c) for c in condition['and'])
+        if 'timestamp' in condition:
+            return page['last_edited_time'] >= condition['last_edited_time'].get('on_or_after', '')
+
+        prop = page['properties'].get(condition['property'])
+        if prop is None:
+            return False
+        prop_type = prop['type']
+        test = next(v for k, v in condition.items() if k != 'property')
+        value = prop.get(prop_type)
+        if prop_type in ('title', 'rich_text'):
+            value = ''.join(item['plain_text'] for item in value)
+        elif prop_type == 'select':
+            value = (value or {}).get('name')
+        if 'equals' in test:
+            return value == test['equals']
+        if 'contains' in test:
+            return value is not None and str(test['contains']) in str(value)
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        status, payload, headers = self.server.notion.handle(self.command, url.path, query, body)
+
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeNotionServer:
+    """Serves a FakeNotion over HTTP on a local port in a background thread."""
+
+    def __init__(self, notion: FakeNotion, host: str = '127.0.0.1', port: int = 0):
+        self.notion = notion
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.notion = notion
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL to use as NOTION_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeNotionServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-notion", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,321 @@
+"""Benchmark the backend against a local Notion stand-in.
+
+Starts a FakeNotion HTTP server, points the backend at it (NOTION_BASE_URL),
+serves the Flask app (or the ASGI app) on a local port and drives the save,
+check and update endpoints at a fixed concurrency.
+
+Run from packages/backend:
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios create,check --requests 500 --concurrency 16 \\
+        --latency 0.1 --output results/$(git rev-parse --short HEAD).json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from .fake_notion import FakeNotion, FakeNotionServer
+
+JOBS_DATABASE_ID = 'bench-job-applications'
+COMPANIES_DATABASE_ID = 'bench-companies'
+SCENARIOS = ('create', 'check', 'update')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def posting(index: int, company_count: int, run_id: int) -> Dict:
+    """Build a job posting payload with a unique LinkedIn job ID."""
+    return {
+        "position": f"Software Engineer {index}",
+        "company": f"Company {index % company_count}",
+        "posting_url": f"https://www.linkedin.com/jobs/view/{run_id + index}",
+        "origin": "LinkedIn",
+        "match": "high",
+        "work_arrangement": "remote",
+        "job_description": f"Job description {index}. " * 20
+    }
+
+
+def seed_postings(notion: FakeNotion, count: int, company_count: int) -> List[Tuple[str, Dict]]:
+    """Store postings directly in the fake workspace for the check and update scenarios."""
+    seeded = []
+    for index in range(count):
+        data = posting(index, company_count, run_id=1_000_000_000)
+        page = notion.add_page(JOBS_DATABASE_ID, {
+            "Position": {"title": [{"text": {"content": data['position']}}]},
+            "Posting URL": {"url": data['posting_url']},
+            "LinkedIn Job ID": {"number": int(data['posting_url'].rsplit('/', 1)[-1])}
+        })
+        seeded.append((page['id'], data))
+    return seeded
+
+
+def build_requests(scenario: str, count: int, company_count: int,
+                   seeded: List[Tuple[str, Dict]]) -> List[Tuple[str, str, Optional[Dict]]]:
+    """Return (method, path, json) for every request of a scenario."""
+    if scenario == 'create':
+        run_id = 2_000_000_000 + int(time.time()) % 100_000 * 1000
+        return [('POST', '/api/job-postings', posting(i, company_count, run_id)) for i in range(count)]
+    if scenario == 'check':
+        # Alternate between saved and unknown postings
+        requests = []
+        for i in range(count):
+            url = seeded[i % len(seeded)][1]['posting_url'] if i % 2 == 0 \
+                else f"https://www.linkedin.com/jobs/view/{3_000_000_000 + i}"
+            requests.append(('GET', f'/api/job-postings/check?posting_url={url}', None))
+        return requests
+    if scenario == 'update':
+        requests = []
+        for i in range(count):
+            page_id, data = seeded[i % len(seeded)]
+            requests.append(('POST', '/api/job-postings', dict(
+                data,
+                page_id=page_id,
+                match=('low', 'medium', 'high')[i % 3],
+                job_description=f"Updated description {i}. " * 20
+            )))
+        return requests
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def run_scenario(base_url: str, notion: FakeNotion, scenario: str,
+                 requests: List[Tuple[str, str, Optional[Dict]]], concurrency: int) -> Dict:
+    """Send the requests with a fixed number of concurrent clients and summarize them."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    before = notion.snapshot()
+
+    with httpx.Client(base_url=base_url, timeout=120,
+                      limits=httpx.Limits(max_connections=concurrency)) as client:
+        def send(item):
+            method, path, body = item
+            started = time.perf_counter()
+            try:
+                status = client.request(method, path, json=body).status_code
+            except httpx.HTTPError:
+                status = 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send, requests))
+        duration = time.perf_counter() - started
+
+    after = notion.snapshot()
+    calls = {
+        endpoint: count - before['calls'].get(endpoint, 0)
+        for endpoint, count in after['calls'].items()
+        if count - before['calls'].get(endpoint, 0)
+    }
+    latencies.sort()
+    total_calls = after['total_calls'] - before['total_calls']
+    return {
+        "scenario": scenario,
+        "requests": len(requests),
+        "concurrency": concurrency,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(len(requests) / duration, 2) if duration else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2)
+        },
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "notion_calls_per_request": round(total_calls / len(requests), 2),
+        "notion_calls": calls,
+        "notion_rate_limited": after['rate_limited'] - before['rate_limited'],
+        "notion_injected_errors": after['injected_errors'] - before['injected_errors']
+    }
+
+
+def configure_environment(args: argparse.Namespace, notion_url: str) -> None:
+    """Point the backend configuration at the fake Notion server."""
+    os.environ.update({
+        "NOTION_API_KEY": "secret_benchmark",
+        "NOTION_DATABASE_JOB_APPLICATIONS_ID": JOBS_DATABASE_ID,
+        "NOTION_DATABASE_COMPANIES_ID": COMPANIES_DATABASE_ID,
+        "NOTION_BASE_URL": notion_url,
+        "NOTION_RATE_LIMIT_PER_SECOND": str(args.client_rate_limit),
+        "NOTION_RATE_LIMIT_BURST": str(max(1.0, args.client_rate_limit)),
+        "NOTION_RATE_LIMIT_STATE_PATH": "",
+        "POSTING_INDEX_ENABLED": str(not args.no_index),
+        "ASYNC_SAVES_ENABLED": "False",
+        "FLASK_DEBUG": "False"
+    })
+
+
+def serve_app(kind: str) -> Tuple[str, Callable[[], None]]:
+    """Serve the backend on a free local port.
+
+    Returns:
+        Tuple of (base_url, stop)
+    """
+    if kind == 'asgi':
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config as HypercornConfig
+        from src.asgi_app import create_asgi_app
+
+        # Hypercorn does not report the port it bound, so pick a free one up front
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        config = HypercornConfig()
+        config.bind = [f'127.0.0.1:{port}']
+        config.loglevel = 'WARNING'
+        app = create_asgi_app()
+        loop = asyncio.new_event_loop()
+        shutdown = asyncio.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(serve(app, config, shutdown_trigger=shutdown.wait))
+
+        threading.Thread(target=run, name="asgi-server", daemon=True).start()
+        return f"http://127.0.0.1:{port}", lambda: loop.call_soon_threadsafe(shutdown.set)
+
+    from werkzeug.serving import make_server
+    from src.app import create_app, start_background_tasks
+
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    start_background_tasks()
+    threading.Thread(target=server.serve_forever, name="wsgi-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+def wait_until_ready(base_url: str, timeout: float = 60) -> bool:
+    """Wait for the readiness probe (schema check and, if enabled, the posting index)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = httpx.get(f"{base_url}/api/health/ready", timeout=5)
+            body = response.json()
+            index = body.get('posting_index')
+            if response.status_code == 200 and (index is None or index['ready']):
+                return True
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, if run inside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict]) -> None:
+    header = f"{'scenario':<10}{'reqs':>6}{'conc':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}" \
+             f"{'p99 ms':>10}{'notion/req':>12}  statuses"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        latency = r['latency_ms']
+        print(f"{r['scenario']:<10}{r['requests']:>6}{r['concurrency']:>6}{r['throughput_rps']:>10}"
+              f"{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}"
+              f"{r['notion_calls_per_request']:>12}  {r['status_codes']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="Comma separated scenarios to run (create, check, update)")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients")
+    parser.add_argument('--companies', type=int, default=20, help="Distinct companies in the generated postings")
+    parser.add_argument('--seed-postings', type=int, default=200,
+                        help="Postings stored in the fake workspace before the run")
+    parser.add_argument('--latency', type=float, default=0.05, help="Fake Notion latency per call, in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency per call, in seconds")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Fake Notion requests per second before answering 429 (0 = unlimited)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of fake Notion calls answered with 503")
+    parser.add_argument('--client-rate-limit', type=float, default=0.0,
+                        help="Backend NOTION_RATE_LIMIT_PER_SECOND (0 = unthrottled)")
+    parser.add_argument('--no-index', action='store_true', help="Disable the posting index")
+    parser.add_argument('--app', choices=('wsgi', 'asgi'), default='wsgi',
+                        help="Serve the Flask app (wsgi) or the Quart app (asgi)")
+    parser.add_argument('--verbose', action='store_true', help="Keep the backend's INFO logging")
+    parser.add_argument('--output', help="Write machine-readable results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            print(f"Unknown scenario: {name}", file=sys.stderr)
+            return 2
+
+    notion = FakeNotion(latency=args.latency, jitter=args.jitter,
+                        rate_limit=args.rate_limit, error_rate=args.error_rate)
+    seeded = seed_postings(notion, args.seed_postings, args.companies)
+    fake_server = FakeNotionServer(notion).start()
+    configure_environment(args, fake_server.base_url)
+
+    base_url, stop = serve_app(args.app)
+    if not args.verbose:
+        # Per-request INFO logging would dominate the measurement
+        logging.getLogger().setLevel(logging.WARNING)
+    try:
+        if not wait_until_ready(base_url):
+            print("Backend did not become ready", file=sys.stderr)
+            return 1
+
+        results = []
+        for scenario in scenarios:
+            requests = build_requests(scenario, args.requests, args.companies, seeded)
+            results.append(run_scenario(base_url, notion, scenario, requests, args.concurrency))
+    finally:
+        stop()
+        fake_server.stop()
+
+    print_results(results)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "results": results
+    }
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""One structured log line per HTTP request."""
+from flask.sansio.app import App
+import logging
+import time
+
+from ..services.throttled_client import CallCounter, count_calls
+from .request_hooks import add_request_hooks
+
+# Not sampled: one record per request is the point of the access log
+access_logger = logging.getLogger('src.access')
+
+
+def log_request(method: str, route: str, path: str, status: int, started: float,
+                counter: CallCounter) -> None:
+    """Log a finished request with its latency and the Notion calls it made.
+
+    Args:
+        method: HTTP method
+        route: Matched URL rule ('unmatched' if none)
+        path: Request path
+        status: Response status code
+        started: time.perf_counter() when the request started
+        counter: Notion calls counted for the request
+    """
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    access_logger.info(
+        f"{method} {path} {status} {duration_ms}ms notion_calls={counter.count}",
+        extra={
+            "method": method,
+            "route": route,
+            "path": path,
+            "status": status,
+            "duration_ms": duration_ms,
+            "notion_calls": counter.count
+        }
+    )
+
+
+def init_app(app: App) -> None:
+    """Write an access log line for every request handled by the Flask or Quart app."""
+    def start_access_log(g, request):
+        g.access_started = time.perf_counter()
+        g.notion_calls = count_calls()
+
+    def record_access_status(g, request, response):
+        g.access_status = response.status_code
+
+    def write_access_log(g, request):
+        started = g.pop('access_started', None)
+        if started is None:
+            return None
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        log_request(request.method, route, request.path, g.pop('access_status', 500),
+                    started, g.pop('notion_calls'))
+        return None
+
+    add_request_hooks(app, before=start_access_log, after=record_access_status, teardown=write_access_log)
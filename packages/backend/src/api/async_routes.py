@@ -0,0 +1,438 @@
+"""API endpoint definitions for the async (ASGI) app.
+
+Mirrors routes.py on top of AsyncNotionService: every request handler is a
+coroutine, so requests waiting on Notion hold no worker thread.
+"""
+from notion_client.errors import APIResponseError
+from quart import Blueprint, Response, request, jsonify, make_response
+from typing import Callable, Dict, Optional
+import asyncio
+import functools
+import logging
+import time
+
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.factory import build_async_notion_service, build_idempotency_store
+from ..services.idempotency import REPLAY, STARTED, request_fingerprint
+from ..services.save_queue import SaveQueue
+from ..services.tracing import record_span
+from ..api.payloads import (batch_item_created, batch_item_error, batch_item_unexpected,
+                            check_batch_body, check_body, check_cache_control, check_error,
+                            duplicate_body, fail_batch_items, health_body, idempotency_key_valid,
+                            idempotency_rejection, job_posting_fields, known_duplicate, parse_batch,
+                            parse_check_batch, parse_search, queued_body, queued_save_failure,
+                            queued_save_result, readiness_body, replay_headers, retry_after_headers,
+                            save_error, saved_body, search_body, split_duplicates, status_response,
+                            summarize_batch, unavailable_error)
+from ..api.request_tracing import debug_access_error, trace_store
+from ..api.validators import validate_job_posting
+from ..config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+async_api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+# Initialize Notion service
+notion_service = build_async_notion_service()
+
+# Event loop serving the app, used by save queue worker threads
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _save_queued(data: Dict) -> Dict:
+    """Save a journaled job posting to Notion (see routes._process_queued_save)."""
+    page_id_to_update = data.get('page_id')
+    try:
+        if page_id_to_update is None:
+            return queued_save_result(*await notion_service.create_job_posting_if_new(**job_posting_fields(data)))
+        return queued_save_result(await notion_service.update_job_posting(page_id=page_id_to_update,
+                                                                          **job_posting_fields(data)))
+    except APIResponseError as e:
+        failure = queued_save_failure(e)
+        if failure is None:
+            raise
+        return failure
+
+
+def _process_queued_save(data: Dict) -> Dict:
+    """Run a queued save on the app's event loop (called from a save queue worker)."""
+    if _loop is None:
+        raise RuntimeError("ASGI app is not serving yet")
+    return asyncio.run_coroutine_threadsafe(_save_queued(data), _loop).result()
+
+
+# Optional write-behind queue for asynchronous saves
+save_queue = SaveQueue(
+    path=Config.ASYNC_SAVES_JOURNAL_PATH,
+    process=_process_queued_save,
+    workers=Config.ASYNC_SAVES_WORKERS,
+    max_attempts=Config.ASYNC_SAVES_MAX_ATTEMPTS,
+    lease=Config.ASYNC_SAVES_LEASE_SECONDS
+) if Config.ASYNC_SAVES_ENABLED else None
+
+
+@async_api_bp.before_app_serving
+async def start_background_tasks():
+    """Start background workers once the event loop is running."""
+    global _loop
+    _loop = asyncio.get_running_loop()
+    notion_service.start_background_tasks()
+    if save_queue:
+        save_queue.start()
+
+
+@async_api_bp.after_app_serving
+async def stop_background_tasks():
+    """Stop background workers and close pooled connections."""
+    if save_queue:
+        save_queue.stop()
+    await notion_service.aclose()
+
+
+# Responses to requests sent with an Idempotency-Key header
+idempotency_store = build_idempotency_store(asynchronous=True)
+
+
+async def _store_call(fn: Callable, *args) -> None:
+    """Call complete or abandon on the store, in a worker thread if it writes a file."""
+    if idempotency_store.blocking:
+        await asyncio.to_thread(fn, *args)
+    else:
+        fn(*args)
+
+
+def idempotent(view: Callable) -> Callable:
+    """Run a view at most once per Idempotency-Key (see routes.idempotent).
+
+    The view runs in its own task, so a client that disconnects (and
+    retries) does not cancel the save the retry is waiting for.
+    """
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if idempotency_store is None or key is None or request.method == 'OPTIONS':
+            return await view(*args, **kwargs)
+        if not idempotency_key_valid(key):
+            body, status, headers = idempotency_rejection(None)
+            return jsonify(body), status, headers
+
+        fingerprint = request_fingerprint(request.method, request.path, await request.get_data())
+        outcome, stored = await idempotency_store.begin(key, fingerprint)
+        if outcome == REPLAY:
+            status, data, headers = stored
+            logger.info("Replaying stored response for Idempotency-Key %s", key)
+            return Response(data, status=status, headers=replay_headers(headers), mimetype='application/json')
+        if outcome != STARTED:
+            logger.warning(f"Idempotency-Key {key} rejected: {outcome}")
+            body, status, headers = idempotency_rejection(outcome)
+            return jsonify(body), status, headers
+
+        async def run():
+            try:
+                response = await make_response(await view(*args, **kwargs))
+            except BaseException:
+                await _store_call(idempotency_store.abandon, key)
+                raise
+            await _store_call(idempotency_store.complete, key, response.status_code, await response.get_data())
+            return response
+
+        return await asyncio.shield(asyncio.ensure_future(run()))
+    return wrapper
+
+
+@async_api_bp.errorhandler(CircuitOpenError)
+async def circuit_open(e: CircuitOpenError):
+    """Fail fast with 503 and Retry-After while the Notion circuit breaker is open."""
+    body, status = unavailable_error(e)
+    return jsonify(body), status, retry_after_headers(body)
+
+
+@async_api_bp.route('/job-postings/check', methods=['GET', 'OPTIONS'])
+async def check_job_posting():
+    """Check if a job posting already exists in Notion database.
+
+    Same contract as GET /api/job-postings/check in routes.py.
+    """
+    logger.info("=== Received request to /api/job-postings/check ===")
+
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    posting_url = request.args.get('posting_url')
+
+    if not posting_url:
+        logger.warning("Missing posting_url parameter")
+        return jsonify({"error": "posting_url parameter is required"}), 400
+
+    logger.info("Checking if job exists: %s", posting_url)
+
+    try:
+        existing_page_id = await notion_service.check_duplicate(posting_url)
+
+        if existing_page_id:
+            logger.info("Job exists with page ID: %s", existing_page_id)
+        else:
+            logger.info("Job does not exist")
+        response = jsonify(check_body(existing_page_id))
+
+        response.headers['Cache-Control'] = check_cache_control(
+            existing_page_id is not None, Config.CHECK_CACHE_MAX_AGE_SECONDS
+        )
+        await response.add_etag()
+        return await response.make_conditional(request)
+
+    except APIResponseError as e:
+        logger.error(f"Notion API error during check: {e.code} - {str(e)}")
+        body, status, headers = check_error(e)
+        return jsonify(body), status, headers
+    except Exception as e:
+        logger.error(f"Unexpected error during check: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@async_api_bp.route('/job-postings', methods=['POST', 'OPTIONS'])
+@idempotent
+async def create_job_posting():
+    """Create or update job posting in Notion database.
+
+    Same contract as POST /api/job-postings in routes.py, including
+    "Prefer: respond-async" when async saves are enabled and the
+    "Idempotency-Key" header.
+    """
+    logger.info("=== Received request to /api/job-postings ===")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Request headers: {dict(request.headers)}")
+
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    data = await request.get_json()
+    logger.info("Received job posting request: %s at %s",
+                data.get('position', 'N/A') if data else 'NO DATA',
+                data.get('company', 'N/A') if data else 'NO DATA')
+
+    validation_started = time.perf_counter()
+    is_valid, error_msg = validate_job_posting(data)
+    record_span('validate_job_posting', validation_started)
+    if not is_valid:
+        logger.warning(f"Validation failed: {error_msg}")
+        return jsonify({"error": error_msg}), 400
+
+    page_id_to_update = data.get('page_id')
+    is_update = page_id_to_update is not None
+
+    if save_queue and 'respond-async' in request.headers.get('Prefer', ''):
+        # Reject known duplicates up front when the index can answer from memory
+        existing_page_id = known_duplicate(notion_service.posting_index, data)
+        if existing_page_id:
+            return jsonify(duplicate_body(existing_page_id)), 409
+
+        # The journal is a SQLite file; keep its writes off the event loop
+        job_id = await asyncio.to_thread(save_queue.submit, data)
+        logger.info("Queued job posting save: %s", job_id)
+        body, status = queued_body(job_id)
+        return jsonify(body), status
+
+    try:
+        if is_update:
+            logger.info(f"Updating existing Notion page: {page_id_to_update}")
+            page = await notion_service.update_job_posting(
+                page_id=page_id_to_update,
+                **job_posting_fields(data)
+            )
+        else:
+            logger.info("Creating new Notion page")
+            # Duplicate check runs alongside the company lookup
+            page, existing_page_id = await notion_service.create_job_posting_if_new(**job_posting_fields(data))
+            if existing_page_id:
+                logger.warning(f"Duplicate job posting detected: {data['posting_url']}")
+                return jsonify(duplicate_body(existing_page_id)), 409
+
+        logger.info(f"Successfully {'updated' if is_update else 'created'} Notion page: {page['id']}")
+        body, status = saved_body(page, data, is_update)
+        return jsonify(body), status
+
+    except APIResponseError as e:
+        logger.error(f"Notion API error: {e.code} - {str(e)}")
+
+        body, status = save_error(e)
+        return jsonify(body), status, retry_after_headers(body)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@async_api_bp.route('/job-postings/check-batch', methods=['POST', 'OPTIONS'])
+async def check_job_postings_batch():
+    """Check which of many job postings already exist (see routes.check_job_postings_batch)."""
+    logger.info("=== Received request to /api/job-postings/check-batch ===")
+
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    error_msg, posting_urls = parse_check_batch(await request.get_json(silent=True), Config.BATCH_MAX_SIZE)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+
+    logger.info(f"Checking {len(posting_urls)} job postings")
+
+    try:
+        existing = await notion_service.check_duplicates(posting_urls)
+        return jsonify(check_batch_body(existing)), 200
+    except APIResponseError as e:
+        logger.error(f"Notion API error during batch check: {e.code} - {str(e)}")
+        body, status, headers = check_error(e)
+        return jsonify(body), status, headers
+    except Exception as e:
+        logger.error(f"Unexpected error during batch check: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@async_api_bp.route('/job-postings/search', methods=['GET', 'OPTIONS'])
+async def search_job_postings():
+    """Search saved job postings (see routes.search_job_postings)."""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    if not notion_service.search_index:
+        return jsonify({"error": "Search is not enabled"}), 404
+
+    error_msg, params = parse_search(request.args)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+
+    started = time.perf_counter()
+    # SQLite calls block; keep them off the event loop
+    results, total = await asyncio.to_thread(notion_service.search_index.search, **params)
+    return jsonify(search_body(results, total, started)), 200
+
+
+@async_api_bp.route('/job-postings/status/<job_id>', methods=['GET'])
+async def job_posting_status(job_id):
+    """Report the progress of an asynchronous save (see routes.job_posting_status)."""
+    saved = await asyncio.to_thread(save_queue.get, job_id) if save_queue else None
+    body, status = status_response(save_queue is not None, saved)
+    return jsonify(body), status
+
+
+@async_api_bp.route('/job-postings/batch', methods=['POST', 'OPTIONS'])
+async def create_job_postings_batch():
+    """Create many job postings in one request.
+
+    Same contract as POST /api/job-postings/batch in routes.py; at most
+    BATCH_MAX_WORKERS postings are checked or saved at a time.
+    """
+    logger.info("=== Received request to /api/job-postings/batch ===")
+
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    data = await request.get_json(silent=True)
+
+    error_msg, results, to_create = parse_batch(data, Config.BATCH_MAX_SIZE)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+
+    logger.info(f"Received batch of {len(results)} job postings")
+
+    semaphore = asyncio.Semaphore(Config.BATCH_MAX_WORKERS)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    # Dedupe against Notion with a few combined queries; if they fail the
+    # postings cannot be known to be new, so they fail instead of being created
+    try:
+        existing = await notion_service.check_duplicates([posting['posting_url'] for _, posting in to_create])
+        pending = split_duplicates(to_create, results, existing)
+    except APIResponseError as e:
+        logger.error("Notion API error checking batch duplicates: %s - %s", e.code, e)
+        fail_batch_items(to_create, results, e)
+        pending = []
+
+    # Resolve each distinct company once so page creation hits the company cache
+    companies = {posting['company'] for _, posting in pending}
+    await asyncio.gather(*(bounded(notion_service.find_or_create_company(company)) for company in companies))
+
+    async def create(index, posting):
+        try:
+            return batch_item_created(index, await notion_service.create_job_posting(**job_posting_fields(posting)))
+        except APIResponseError as e:
+            logger.error(f"Notion API error in batch item {index}: {e.code} - {str(e)}")
+            return batch_item_error(index, e)
+        except Exception as e:
+            logger.error(f"Unexpected error in batch item {index}: {str(e)}")
+            return batch_item_unexpected(index)
+
+    for result in await asyncio.gather(*(bounded(create(index, posting)) for index, posting in pending)):
+        results[result['index']] = result
+
+    summary = summarize_batch(data['job_postings'], results)
+    logger.info(f"Batch finished: {summary['created']} created, "
+                f"{summary['duplicates']} duplicates, {summary['failed']} failed")
+    return jsonify(summary), 200
+
+
+@async_api_bp.route('/debug/traces', methods=['GET'])
+async def list_traces():
+    """List the newest stored request traces.
+    
+    Requires the X-Debug-Trace header when TRACING_TOKEN is set.
+    
+    Returns:
+        200: {"traces": [{"request_id": "...", "path": "...", "duration_ms": 12.3, ...}]}
+        403/404: {"error": "..."}
+    """
+    error = debug_access_error(request.headers)
+    if error:
+        return jsonify(error[0]), error[1]
+    return jsonify({"traces": await asyncio.to_thread(trace_store.recent)}), 200
+
+
+@async_api_bp.route('/debug/traces/<request_id>', methods=['GET'])
+async def get_trace(request_id):
+    """Return the trace (and profile summary) stored for a request ID.
+    
+    Returns:
+        200: {"request_id": "...", "spans": [...], "profile": {...} or absent, ...}
+        403/404: {"error": "..."}
+    """
+    error = debug_access_error(request.headers)
+    if error:
+        return jsonify(error[0]), error[1]
+    trace = await asyncio.to_thread(trace_store.load, request_id)
+    if trace is None:
+        return jsonify({"error": "Unknown request ID"}), 404
+    return jsonify(trace), 200
+
+
+@async_api_bp.route('/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint, served from the cached database validation."""
+    # Only the very first call runs the (blocking) validation; keep it off the loop
+    check = await asyncio.to_thread(notion_service.schema_check.result, wait=True)
+
+    if not check['valid']:
+        logger.error(f"Health check failed: {check['error']}")
+
+    body, status = health_body(check, notion_service.async_client.stats())
+    return jsonify(body), status
+
+
+@async_api_bp.route('/health/live', methods=['GET'])
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests (no Notion access)."""
+    return jsonify({"status": "alive"}), 200
+
+
+@async_api_bp.route('/health/ready', methods=['GET'])
+async def readiness_check():
+    """Readiness probe: the last database validation passed and is not stale."""
+    # Mirror and save queue counts are SQLite queries; keep them off the event loop
+    body, status = readiness_body(
+        notion_service,
+        await asyncio.to_thread(notion_service.mirror.stats) if notion_service.mirror else None,
+        await asyncio.to_thread(save_queue.pending_count) if save_queue else None
+    )
+    return jsonify(body), status
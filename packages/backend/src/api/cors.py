@@ -0,0 +1,25 @@
+"""Open CORS policy for the Flask and Quart apps (development setting)."""
+from flask.sansio.app import App
+from flask_cors import CORS
+
+from .request_hooks import add_request_hooks, is_flask
+
+ALLOWED_METHODS = 'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+
+
+def add_cors_headers(g, request, response) -> None:
+    """Allow any origin, echoing the headers a preflight asks for (flask_cors defaults)."""
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = ALLOWED_METHODS
+        requested_headers = request.headers.get('Access-Control-Request-Headers')
+        if requested_headers:
+            response.headers['Access-Control-Allow-Headers'] = requested_headers
+
+
+def init_app(app: App) -> None:
+    """Allow cross-origin requests from any origin."""
+    if is_flask(app):
+        CORS(app)
+    else:
+        add_request_hooks(app, after=add_cors_headers)
@@ -0,0 +1,126 @@
+"""HTTP request metrics and the /metrics endpoint."""
+from flask.sansio.app import App
+from typing import Optional, Union
+import time
+
+from ..services.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from ..services.metrics import CONTENT_TYPE, REGISTRY
+from ..services.async_notion_service import AsyncNotionService
+from ..services.notion_service import NotionService
+from ..services.save_queue import SaveQueue
+from .request_hooks import add_blocking_route, add_request_hooks
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'Time spent handling an HTTP request',
+    ['method', 'route', 'status']
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being handled'
+)
+CACHE_HITS = REGISTRY.counter('cache_hits_total', 'Lookups answered from an in-memory cache', ['cache'])
+CACHE_MISSES = REGISTRY.counter('cache_misses_total', 'Lookups that fell through to Notion', ['cache'])
+CACHE_HIT_RATIO = REGISTRY.gauge('cache_hit_ratio', 'Share of lookups answered from memory', ['cache'])
+CACHE_ENTRIES = REGISTRY.gauge('cache_entries', 'Entries held by an in-memory cache', ['cache'])
+COALESCED_IN_FLIGHT = REGISTRY.gauge(
+    'company_lookups_in_flight',
+    'Company lookups currently running (concurrent callers share one)'
+)
+SAVE_QUEUE_PENDING = REGISTRY.gauge('save_queue_pending', 'Queued saves not yet finished')
+NOTION_CIRCUIT_STATE = REGISTRY.gauge(
+    'notion_circuit_state',
+    'Notion circuit breaker state (0 closed, 1 half-open, 2 open)'
+)
+NOTION_CIRCUIT_REJECTED = REGISTRY.counter(
+    'notion_circuit_rejected_calls_total',
+    'Notion calls failed fast by the circuit breaker since startup'
+)
+MIRROR_SYNC_LAG = REGISTRY.gauge(
+    'mirror_sync_lag_seconds',
+    'Seconds since the last successful mirror sync of a database started',
+    ['database']
+)
+MIRROR_PAGES = REGISTRY.gauge('mirror_pages', 'Pages held by the local mirror', ['database'])
+
+
+# Values of notion_circuit_state
+CIRCUIT_STATES = (CLOSED, HALF_OPEN, OPEN)
+
+
+def observe_request(method: str, route: str, status: int, started: float) -> None:
+    """Record the latency of a finished HTTP request."""
+    HTTP_REQUEST_SECONDS.labels(method, route, status).observe(time.perf_counter() - started)
+
+
+def register_service_metrics(notion_service: Union[NotionService, AsyncNotionService],
+                             save_queue: Optional[SaveQueue] = None) -> None:
+    """Expose the service's cache and queue statistics on /metrics.
+
+    Cache hits and misses are counted by the caches since startup, so they
+    are copied into counters. Calling this again (another create_app() in
+    the same process) replaces the earlier service's collector.
+    """
+    def collect():
+        caches = {
+            "company": notion_service.company_cache.stats(),
+            "page_state": notion_service.page_state_cache.stats(),
+            "check_not_found": notion_service.not_found_cache.stats()
+        }
+        if notion_service.posting_index:
+            caches["posting_index"] = notion_service.posting_index.stats()
+        if notion_service.mirror:
+            mirror = notion_service.mirror.stats()
+            names = {
+                notion_service.database_id: 'job_applications',
+                notion_service.companies_database_id: 'companies'
+            }
+            for database_id, database in mirror['databases'].items():
+                name = names.get(database_id, database_id)
+                MIRROR_PAGES.labels(name).set(database['pages'])
+                if database['lag_seconds'] is not None:
+                    MIRROR_SYNC_LAG.labels(name).set(database['lag_seconds'])
+            caches["mirror"] = dict(mirror, entries=sum(d['pages'] for d in mirror['databases'].values()))
+        for name, stats in caches.items():
+            lookups = stats['hits'] + stats['misses']
+            CACHE_HITS.labels(name).set(stats['hits'])
+            CACHE_MISSES.labels(name).set(stats['misses'])
+            CACHE_HIT_RATIO.labels(name).set(stats['hits'] / lookups if lookups else 0)
+            CACHE_ENTRIES.labels(name).set(stats['entries'])
+        COALESCED_IN_FLIGHT.set(notion_service.company_lookups_in_flight())
+        breaker = notion_service.client.breaker
+        if breaker:
+            NOTION_CIRCUIT_STATE.set(CIRCUIT_STATES.index(breaker.state))
+            NOTION_CIRCUIT_REJECTED.labels().set(breaker.rejected)
+        if save_queue:
+            SAVE_QUEUE_PENDING.set(save_queue.pending_count())
+
+    REGISTRY.register_collector('notion_service', collect)
+
+
+def init_app(app: App) -> None:
+    """Record request metrics for the Flask or Quart app and serve them on GET /metrics."""
+    def start_timer(g, request):
+        g.metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    def record_status(g, request, response):
+        g.metrics_status = response.status_code
+
+    def record_request(g, request):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return None
+        HTTP_IN_FLIGHT.dec()
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe_request(request.method, route, g.pop('metrics_status', 500), started)
+        return None
+
+    add_request_hooks(app, before=start_timer, after=record_status, teardown=record_request)
+
+    def metrics():
+        """Prometheus metrics endpoint."""
+        # Collectors read the mirror and save queue (SQLite), so Quart serves this from a worker thread
+        return REGISTRY.render(), 200, {'Content-Type': CONTENT_TYPE}
+
+    add_blocking_route(app, '/metrics', metrics)
@@ -0,0 +1,449 @@
+"""Request parsing and response building shared by the Flask and ASGI routes."""
+from notion_client.errors import APIResponseError
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import time
+
+from ..services.circuit_breaker import CIRCUIT_OPEN
+from ..services.idempotency import IN_PROGRESS, MAX_KEY_LENGTH, MISMATCH
+from ..services.linkedin import extract_linkedin_job_id
+from ..services.throttled_client import retry_after_seconds
+from .validators import validate_job_posting
+
+# Notion error codes a queued save cannot recover from by retrying
+PERMANENT_ERROR_CODES = ('unauthorized', 'restricted_resource', 'object_not_found', 'validation_error')
+
+# Most results returned by one search request
+SEARCH_MAX_LIMIT = 100
+
+
+def job_posting_fields(data: Dict) -> Dict:
+    """Extract NotionService job posting arguments from a validated payload."""
+    return {
+        "position": data['position'],
+        "company": data['company'],
+        "posting_url": data['posting_url'],
+        "origin": data['origin'],
+        "match": data.get('match'),
+        "work_arrangement": data.get('work_arrangement'),
+        "demand": data.get('demand'),
+        "budget": data.get('budget'),
+        "job_description": data.get('job_description'),
+        "city": data.get('city'),
+        "country": data.get('country')
+    }
+
+
+def notion_page_url(page_id: str) -> str:
+    """Construct the Notion URL of a page from its ID."""
+    return f"https://www.notion.so/{page_id.replace('-', '')}"
+
+
+def duplicate_body(existing_page_id: str) -> Dict:
+    """Build the 409 response body for a posting that is already saved."""
+    return {
+        "error": "Job posting already saved",
+        "duplicate_field": "posting_url",
+        "existing_page_id": existing_page_id,
+        "existing_page_url": notion_page_url(existing_page_id)
+    }
+
+
+def check_body(existing_page_id: Optional[str]) -> Dict:
+    """Build the response body of a single existence check."""
+    if existing_page_id:
+        return {"exists": True, "page_id": existing_page_id, "page_url": notion_page_url(existing_page_id)}
+    return {"exists": False}
+
+
+def check_cache_control(exists: bool, max_age: int) -> str:
+    """Build the Cache-Control header of a check response.
+
+    A saved posting stays saved, so clients may reuse the answer for
+    max_age seconds. "Not saved" can change with the next save, so clients
+    revalidate it every time (cheap: the ETag usually matches and the
+    answer comes from the server's not-found cache).
+    """
+    if exists and max_age > 0:
+        return f"private, max-age={max_age}"
+    return "private, no-cache"
+
+
+def unavailable_error(e: APIResponseError) -> Tuple[Dict, int]:
+    """Build the 503 for a request failed fast by the open circuit breaker.
+
+    The body carries "retry_after"; callers echo it in a Retry-After header.
+    """
+    return {
+        "error": "Notion is temporarily unavailable",
+        "retry_after": int(retry_after_seconds(e) or 1)
+    }, 503
+
+
+def retry_after_headers(body: Dict) -> Dict[str, str]:
+    """Return the Retry-After header echoing the "retry_after" of an error body, if any."""
+    return {'Retry-After': str(body['retry_after'])} if 'retry_after' in body else {}
+
+
+def check_error(e: APIResponseError) -> Tuple[Dict, int, Dict[str, str]]:
+    """Map a Notion error raised by an existence check to a response body, status and headers."""
+    if e.code == CIRCUIT_OPEN:
+        body, status = unavailable_error(e)
+    else:
+        body, status = {"error": "Failed to check job existence", "details": str(e)}, 500
+    return body, status, retry_after_headers(body)
+
+
+def save_error(e: APIResponseError) -> Tuple[Dict, int]:
+    """Map a Notion error raised while saving a posting to a response body and status.
+
+    429 and 503 bodies carry "retry_after"; callers echo it in a Retry-After header.
+    """
+    if e.code == CIRCUIT_OPEN:
+        return unavailable_error(e)
+    elif e.code == 'unauthorized':
+        return {"error": "Notion authentication failed"}, 401
+    elif e.code == 'object_not_found':
+        return {"error": "Notion database not found"}, 404
+    elif e.code == 'rate_limited':
+        return {
+            "error": "Rate limit exceeded",
+            "retry_after": int(retry_after_seconds(e) or 60)
+        }, 429
+    else:
+        return {"error": "Internal server error", "details": str(e)}, 500
+
+
+def idempotency_error(outcome: Optional[str]) -> Tuple[Dict, int]:
+    """Map an Idempotency-Key that cannot be used to a response body and status.
+
+    Args:
+        outcome: MISMATCH or IN_PROGRESS from IdempotencyStore.begin, or
+            None for a key that is too long
+    """
+    if outcome == MISMATCH:
+        return {"error": "Idempotency-Key was already used for a different request"}, 422
+    if outcome == IN_PROGRESS:
+        return {"error": "A request with this Idempotency-Key is still in progress"}, 409
+    return {"error": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, 400
+
+
+def idempotency_key_valid(key: str) -> bool:
+    """Return whether an Idempotency-Key header value can be used."""
+    return 0 < len(key) <= MAX_KEY_LENGTH
+
+
+def idempotency_rejection(outcome: Optional[str]) -> Tuple[Dict, int, Dict[str, str]]:
+    """Build the response to a request whose Idempotency-Key cannot be used (see idempotency_error).
+
+    A key still in progress gets Retry-After: 1.
+    """
+    body, status = idempotency_error(outcome)
+    return body, status, {'Retry-After': '1'} if outcome == IN_PROGRESS else {}
+
+
+def replay_headers(stored_headers: Dict[str, str]) -> Dict[str, str]:
+    """Return the headers of a replayed idempotent response."""
+    return {**stored_headers, 'Idempotent-Replayed': 'true'}
+
+
+def saved_body(page: Dict, data: Dict, is_update: bool) -> Tuple[Dict, int]:
+    """Build the response to a job posting saved synchronously."""
+    body = {
+        "message": "Job posting updated successfully" if is_update else "Job posting saved successfully",
+        "notion_page_id": page['id'],
+        "notion_page_url": page['url'],
+        "job_data": data
+    }
+    if is_update:
+        # Blocks that could not be written are listed instead of failing the update
+        body["description_report"] = page['description_report']
+    return body, 200 if is_update else 201
+
+
+def queued_body(job_id: str) -> Tuple[Dict, int]:
+    """Build the 202 response to a save accepted into the save queue."""
+    return {
+        "message": "Job posting queued",
+        "job_id": job_id,
+        "status_url": f"/api/job-postings/status/{job_id}"
+    }, 202
+
+
+def known_duplicate(posting_index: Any, data: Dict) -> Optional[str]:
+    """Return the page of a posting the warm posting index knows is saved.
+
+    Lets a save be rejected as a duplicate before it is queued. Updates,
+    URLs without a job ID and cold indexes return None.
+    """
+    linkedin_job_id = extract_linkedin_job_id(data['posting_url'])
+    if data.get('page_id') is not None or linkedin_job_id is None or not posting_index:
+        return None
+    answered, existing_page_id = posting_index.lookup(linkedin_job_id)
+    return existing_page_id if answered else None
+
+
+def queued_save_result(page: Optional[Dict], existing_page_id: Optional[str] = None) -> Dict:
+    """Build the save queue result of a journaled save."""
+    if existing_page_id:
+        return {
+            "state": "duplicate",
+            "existing_page_id": existing_page_id,
+            "existing_page_url": notion_page_url(existing_page_id)
+        }
+    return {
+        "state": "completed",
+        "notion_page_id": page['id'],
+        "notion_page_url": page['url']
+    }
+
+
+def queued_save_failure(e: APIResponseError) -> Optional[Dict]:
+    """Return the 'failed' result of a journaled save retrying cannot fix, None if it can be retried."""
+    if e.code in PERMANENT_ERROR_CODES:
+        return {"state": "failed", "error": f"{e.code}: {str(e)}"}
+    return None
+
+
+def status_response(queue_enabled: bool, status: Optional[Dict]) -> Tuple[Dict, int]:
+    """Build the response to a save queue status lookup."""
+    if not queue_enabled:
+        return {"error": "Async saves are not enabled"}, 404
+    if status is None:
+        return {"error": "Unknown job ID"}, 404
+    return status, 200
+
+
+def batch_item_created(index: int, page: Dict) -> Dict:
+    """Build the result of a batch posting saved as a new page."""
+    return {"index": index, "status": 201, "notion_page_id": page['id'], "notion_page_url": page['url']}
+
+
+def batch_item_unexpected(index: int) -> Dict:
+    """Build the result of a batch posting whose save failed with an unexpected error."""
+    return {"index": index, "status": 500, "error": "Internal server error"}
+
+
+def batch_item_error(index: int, e: APIResponseError) -> Dict:
+    """Build the result of a batch posting whose save failed with a Notion error."""
+    result = {"index": index, "status": 500, "error": str(e)}
+    if e.code == 'rate_limited':
+        result.update(status=429, retry_after=int(retry_after_seconds(e) or 60))
+    elif e.code == CIRCUIT_OPEN:
+        result.update(status=503, retry_after=int(retry_after_seconds(e) or 1))
+    return result
+
+
+def parse_batch(data: Any, max_size: int) -> Tuple[Optional[str], List[Optional[Dict]], List[Tuple[int, Dict]]]:
+    """Validate a batch request and dedupe postings within it.
+
+    Args:
+        data: Parsed JSON body of the batch request
+        max_size: Maximum number of postings allowed in one batch
+
+    Returns:
+        Tuple of (error_message, results, to_create). error_message is set
+        when the batch itself is malformed. results holds the final result
+        of every posting rejected here and None for the rest; to_create
+        lists the (index, posting) pairs still to be checked and saved.
+    """
+    postings = data.get('job_postings') if isinstance(data, dict) else None
+
+    if not isinstance(postings, list) or not postings:
+        return "job_postings must be a non-empty list", [], []
+    if len(postings) > max_size:
+        return f"job_postings must contain {max_size} items or less", [], []
+
+    results: List[Optional[Dict]] = [None] * len(postings)
+    to_create = []
+    seen_postings = {}
+
+    for index, posting in enumerate(postings):
+        if not isinstance(posting, dict):
+            results[index] = {"index": index, "status": 400, "error": "job posting must be an object"}
+            continue
+
+        is_valid, error_msg = validate_job_posting(posting)
+        if not is_valid:
+            results[index] = {"index": index, "status": 400, "error": error_msg}
+            continue
+
+        # Same LinkedIn job under different URLs counts as a repeat
+        posting_key = extract_linkedin_job_id(posting['posting_url']) or posting['posting_url']
+        if posting_key in seen_postings:
+            results[index] = {
+                "index": index,
+                "status": 409,
+                "error": "Job posting repeated in batch",
+                "duplicate_of_index": seen_postings[posting_key]
+            }
+            continue
+
+        seen_postings[posting_key] = index
+        to_create.append((index, posting))
+
+    return None, results, to_create
+
+
+def fail_batch_items(to_create: List[Tuple[int, Dict]], results: List[Optional[Dict]],
+                     e: APIResponseError) -> None:
+    """Fail every posting still to be created with a Notion error (see batch_item_error)."""
+    for index, _ in to_create:
+        results[index] = batch_item_error(index, e)
+
+
+def split_duplicates(to_create: List[Tuple[int, Dict]], results: List[Optional[Dict]],
+                     existing: Dict[str, Optional[str]]) -> List[Tuple[int, Dict]]:
+    """Report the batch postings already saved in Notion as duplicates.
+
+    Args:
+        to_create: (index, posting) pairs returned by parse_batch
+        results: Batch results, filled in place for the duplicates
+        existing: Map of posting URL to existing page ID from check_duplicates
+
+    Returns:
+        The (index, posting) pairs still to be created
+    """
+    pending = []
+    for index, posting in to_create:
+        existing_page_id = existing.get(posting['posting_url'])
+        if existing_page_id:
+            results[index] = {"index": index, "status": 409, **duplicate_body(existing_page_id)}
+        else:
+            pending.append((index, posting))
+    return pending
+
+
+def parse_check_batch(data: Any, max_size: int) -> Tuple[Optional[str], List[str]]:
+    """Validate a batch existence check request.
+
+    Args:
+        data: Parsed JSON body ({"posting_urls": [...]})
+        max_size: Maximum number of URLs allowed in one request
+
+    Returns:
+        Tuple of (error_message, posting_urls)
+    """
+    posting_urls = data.get('posting_urls') if isinstance(data, dict) else None
+
+    if not isinstance(posting_urls, list) or not posting_urls \
+            or not all(isinstance(url, str) and url.strip() for url in posting_urls):
+        return "posting_urls must be a non-empty list of URLs", []
+    if len(posting_urls) > max_size:
+        return f"posting_urls must contain {max_size} items or less", []
+    return None, posting_urls
+
+
+def check_batch_body(existing: Dict[str, Optional[str]]) -> Dict:
+    """Build the check-batch response body from a map of URL to existing page ID."""
+    return {
+        "results": {
+            posting_url: {"exists": True, "page_id": page_id, "page_url": notion_page_url(page_id)}
+            if page_id else {"exists": False}
+            for posting_url, page_id in existing.items()
+        },
+        "saved": sum(1 for page_id in existing.values() if page_id)
+    }
+
+
+def parse_search(args: Mapping[str, str]) -> Tuple[Optional[str], Dict]:
+    """Validate the query string of a search request.
+
+    Args:
+        args: Query parameters (q, match, work_arrangement, country,
+            budget_min, budget_max, limit, offset)
+
+    Returns:
+        Tuple of (error_message, SearchIndex.search arguments)
+    """
+    params: Dict[str, Any] = {
+        "query": args.get('q') or None,
+        "match": args.get('match') or None,
+        "work_arrangement": args.get('work_arrangement') or None,
+        "country": args.get('country') or None
+    }
+    if params['match'] and params['match'] not in ('low', 'medium', 'high'):
+        return "match must be one of: low, medium, high", {}
+    if params['work_arrangement'] and params['work_arrangement'] not in ('remote', 'hybrid', 'on-site'):
+        return "work_arrangement must be one of: remote, hybrid, on-site", {}
+
+    for name in ('budget_min', 'budget_max'):
+        value = args.get(name)
+        try:
+            params[name] = float(value) if value not in (None, '') else None
+        except ValueError:
+            return f"{name} must be a number", {}
+
+    try:
+        params['limit'] = int(args.get('limit') or 20)
+        params['offset'] = int(args.get('offset') or 0)
+    except ValueError:
+        return "limit and offset must be integers", {}
+    if not 1 <= params['limit'] <= SEARCH_MAX_LIMIT:
+        return f"limit must be between 1 and {SEARCH_MAX_LIMIT}", {}
+    if params['offset'] < 0:
+        return "offset must not be negative", {}
+
+    return None, params
+
+
+def search_body(results: List[Dict], total: int, started: float) -> Dict:
+    """Build the search response body; started is time.perf_counter() before the search."""
+    return {
+        "results": results,
+        "total": total,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def health_body(check: Dict, client_stats: Dict) -> Tuple[Dict, int]:
+    """Build the health check response from the cached database validation."""
+    body = {
+        "status": "healthy" if check['valid'] else "unhealthy",
+        "notion_connected": bool(check['valid']),
+        "database_validated": bool(check['valid']),
+        "checked_seconds_ago": check['age_seconds'],
+        "notion_client": client_stats
+    }
+    if not check['valid']:
+        body["error"] = check['error']
+    return body, 200 if check['valid'] else 500
+
+
+def readiness_body(notion_service: Any, mirror_stats: Optional[Dict],
+                   save_queue_pending: Optional[int]) -> Tuple[Dict, int]:
+    """Build the readiness probe response: ready while the last validation passed and is fresh.
+
+    Args:
+        notion_service: NotionService or AsyncNotionService
+        mirror_stats: notion_service.mirror.stats(), read by the caller (a SQLite query)
+        save_queue_pending: Pending saves, or None when async saves are disabled
+    """
+    check = notion_service.schema_check.result()
+    ready = bool(check['valid']) and not check['stale']
+    breaker = notion_service.client.breaker
+
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "schema_check": check,
+        "posting_index": notion_service.posting_index.stats() if notion_service.posting_index else None,
+        "mirror": mirror_stats,
+        "snapshot": notion_service.snapshot.stats() if notion_service.snapshot else None,
+        "circuit_breaker": breaker.stats() if breaker else None
+    }
+    if save_queue_pending is not None:
+        body["save_queue_pending"] = save_queue_pending
+    return body, 200 if ready else 503
+
+
+def summarize_batch(postings: List[Any], results: List[Dict]) -> Dict:
+    """Build the batch response body from the per-posting results."""
+    for index, posting in enumerate(postings):
+        if isinstance(posting, dict) and 'posting_url' in posting:
+            results[index]["posting_url"] = posting['posting_url']
+
+    return {
+        "results": results,
+        "created": sum(1 for r in results if r['status'] == 201),
+        "duplicates": sum(1 for r in results if r['status'] == 409),
+        "failed": sum(1 for r in results if r['status'] not in (201, 409))
+    }
@@ -0,0 +1,101 @@
+"""Request hooks and routes registered the same way on the Flask and Quart apps.
+
+Hooks are plain functions of the framework's request context (g, request).
+On the Flask app they run as they are. On the Quart app they are wrapped in
+coroutines so they run on the event loop without a thread per call, and
+the blocking work they hand back (file or SQLite writes) runs in a worker
+thread instead.
+"""
+from flask import Flask
+from flask.sansio.app import App
+from typing import Any, Callable, Optional, Tuple
+import asyncio
+
+# Deferred blocking work returned by a teardown hook
+Blocking = Optional[Callable[[], Any]]
+
+
+def is_flask(app: App) -> bool:
+    """Return True for the Flask app, False for the Quart app."""
+    return isinstance(app, Flask)
+
+
+def request_context(app: App) -> Tuple[Any, Any]:
+    """Return the g and request proxies of the app's framework."""
+    if is_flask(app):
+        from flask import g, request
+    else:
+        from quart import g, request
+    return g, request
+
+
+def add_request_hooks(app: App,
+                      before: Optional[Callable[[Any, Any], None]] = None,
+                      after: Optional[Callable[[Any, Any, Any], None]] = None,
+                      teardown: Optional[Callable[[Any, Any], Blocking]] = None) -> None:
+    """Register hooks that run for every request of a Flask or Quart app.
+
+    Args:
+        app: Flask or Quart app
+        before: Called as before(g, request) when a request starts
+        after: Called as after(g, request, response) with the response
+            about to be sent (it may change its headers)
+        teardown: Called as teardown(g, request) once the request is done;
+            may return a callable doing blocking IO, which Flask calls right
+            away and Quart runs in a worker thread
+    """
+    g, request = request_context(app)
+
+    if is_flask(app):
+        if before:
+            @app.before_request
+            def before_hook():
+                before(g, request)
+
+        if after:
+            @app.after_request
+            def after_hook(response):
+                after(g, request, response)
+                return response
+
+        if teardown:
+            @app.teardown_request
+            def teardown_hook(error=None):
+                blocking = teardown(g, request)
+                if blocking is not None:
+                    blocking()
+        return
+
+    if before:
+        @app.before_request
+        async def before_hook():
+            before(g, request)
+
+    if after:
+        @app.after_request
+        async def after_hook(response):
+            after(g, request, response)
+            return response
+
+    if teardown:
+        @app.teardown_request
+        async def teardown_hook(error=None):
+            blocking = teardown(g, request)
+            if blocking is not None:
+                await asyncio.to_thread(blocking)
+
+
+def add_blocking_route(app: App, rule: str, view: Callable[[], Tuple[Any, int, dict]]) -> None:
+    """Serve GET rule with a view that blocks (reads SQLite or files).
+
+    The view returns (body, status, headers). Quart runs it in a worker
+    thread so the event loop keeps serving other requests.
+    """
+    if is_flask(app):
+        app.add_url_rule(rule, view.__name__, view, methods=['GET'])
+        return
+
+    async def async_view():
+        return await asyncio.to_thread(view)
+
+    app.add_url_rule(rule, view.__name__, async_view, methods=['GET'])
@@ -0,0 +1,131 @@
+"""Opt-in request tracing and profiling for the Flask and Quart apps.
+
+A request is traced when TRACING_ENABLED is set, or when it carries the
+X-Debug-Trace header with TRACING_TOKEN. Traced requests get a
+server-generated X-Request-ID response header; their trace is served by
+GET /api/debug/traces/<request_id> to callers sending the token.
+"""
+from flask.sansio.app import App
+from typing import Callable, Dict, Mapping, Optional, Tuple
+import cProfile
+import hmac
+import logging
+import random
+import uuid
+
+from ..config.settings import Config
+from ..services.tracing import REQUEST_ID_PATTERN, TraceStore, end_trace, start_trace
+from .request_hooks import add_request_hooks, is_flask
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = 'X-Debug-Trace'
+PROFILE_HEADER = 'X-Debug-Profile'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+
+def tracing_available() -> bool:
+    """Return whether any request can be traced."""
+    return Config.TRACING_ENABLED or bool(Config.TRACING_TOKEN)
+
+
+trace_store = TraceStore(Config.TRACES_DIR, Config.TRACES_MAX_FILES) if tracing_available() else None
+
+
+def is_authorized(headers: Mapping[str, str]) -> bool:
+    """Return True if the request carries the tracing token."""
+    token = headers.get(TRACE_HEADER, '')
+    return bool(Config.TRACING_TOKEN) and hmac.compare_digest(token, Config.TRACING_TOKEN)
+
+
+def should_trace(headers: Mapping[str, str]) -> bool:
+    """Return True if a request is traced."""
+    return Config.TRACING_ENABLED or is_authorized(headers)
+
+
+def should_profile(headers: Mapping[str, str]) -> bool:
+    """Return True if a traced request also gets a CPU profile.
+
+    Authorized requests ask for one with X-Debug-Profile: true; otherwise a
+    TRACE_PROFILE_SAMPLE_RATE share of traced requests is profiled.
+    """
+    if headers.get(PROFILE_HEADER, '').lower() == 'true' and is_authorized(headers):
+        return True
+    return random.random() < Config.TRACE_PROFILE_SAMPLE_RATE
+
+
+def request_id() -> str:
+    """Return a new trace ID.
+
+    Trace IDs name the trace files, so they are always generated here: a
+    caller-chosen ID could overwrite another request's trace.
+    """
+    return uuid.uuid4().hex
+
+
+def client_request_id(headers: Mapping[str, str]) -> Optional[str]:
+    """Return the caller's X-Request-ID, kept in the trace for correlation only."""
+    incoming = headers.get(REQUEST_ID_HEADER, '')
+    return incoming if REQUEST_ID_PATTERN.match(incoming) else None
+
+
+def debug_access_error(headers: Mapping[str, str]) -> Optional[Tuple[Dict, int]]:
+    """Check access to the trace endpoints.
+
+    Returns:
+        (error body, status) if access is denied, None otherwise
+    """
+    if trace_store is None:
+        return {"error": "Request tracing is not enabled"}, 404
+    # Traces hold request paths and timings, so they are never served without the token
+    if not Config.TRACING_TOKEN:
+        return {"error": "Set TRACING_TOKEN to read traces"}, 403
+    if not is_authorized(headers):
+        return {"error": f"Missing or invalid {TRACE_HEADER} header"}, 403
+    return None
+
+
+def init_app(app: App) -> None:
+    """Trace requests handled by the Flask or Quart app.
+
+    Only the Flask app takes CPU profiles: cProfile profiles a whole
+    thread, and on the Quart app every request interleaves on the event
+    loop thread, so a profile could not be attributed to one request.
+    """
+    profiling = is_flask(app)
+
+    def start_request_trace(g, request):
+        if not should_trace(request.headers):
+            return
+        g.trace = start_trace(request_id(), request.method, request.path,
+                              client_request_id(request.headers))
+        if profiling and should_profile(request.headers):
+            # cProfile follows the request thread, so only work done on it is profiled
+            g.trace_profile = cProfile.Profile()
+            g.trace_profile.enable()
+
+    def add_request_id(g, request, response):
+        trace = g.get('trace')
+        if trace is not None:
+            g.trace_status = response.status_code
+            response.headers[REQUEST_ID_HEADER] = trace.request_id
+
+    def save_request_trace(g, request) -> Optional[Callable[[], None]]:
+        trace = g.pop('trace', None)
+        if trace is None:
+            return None
+        end_trace(trace)
+        profile = g.pop('trace_profile', None)
+        if profile is not None:
+            profile.disable()
+        data = trace.to_dict(g.pop('trace_status', 500))
+
+        def save():
+            try:
+                trace_store.save(data, profile)
+            except OSError as e:
+                logger.warning(f"Could not save trace {trace.request_id}: {e}")
+
+        return save
+
+    add_request_hooks(app, before=start_request_trace, after=add_request_id, teardown=save_request_trace)
@@ -1,9 +1,26 @@
 """API endpoint definitions."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, make_response
 from notion_client.errors import APIResponseError
+from typing import Callable, Dict
+import functools
 import logging
+import time
 
-from ..services.notion_service import NotionService
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.factory import build_idempotency_store, build_notion_service
+from ..services.idempotency import REPLAY, STARTED, request_fingerprint
+from ..services.save_queue import SaveQueue
+from ..services.throttled_client import ContextExecutor
+from ..services.tracing import record_span
+from ..api.payloads import (batch_item_created, batch_item_error, batch_item_unexpected,
+                            check_batch_body, check_body, check_cache_control, check_error,
+                            duplicate_body, fail_batch_items, health_body, idempotency_key_valid,
+                            idempotency_rejection, job_posting_fields, known_duplicate, parse_batch,
+                            parse_check_batch, parse_search, queued_body, queued_save_failure,
+                            queued_save_result, readiness_body, replay_headers, retry_after_headers,
+                            save_error, saved_body, search_body, split_duplicates, status_response,
+                            summarize_batch, unavailable_error)
+from ..api.request_tracing import debug_access_error, trace_store
 from ..api.validators import validate_job_posting
 from ..config.settings import Config
 
@@ -12,11 +29,85 @@ logger = logging.getLogger(__name__)
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 # Initialize Notion service
-notion_service = NotionService(
-    api_key=str(Config.NOTION_API_KEY),
-    database_id=str(Config.NOTION_DATABASE_JOB_APPLICATIONS_ID),
-    companies_database_id=Config.NOTION_DATABASE_COMPANIES_ID
-)
+notion_service = build_notion_service()
+
+
+def _process_queued_save(data: Dict) -> Dict:
+    """Save a journaled job posting to Notion (runs on a save queue worker).
+    
+    Errors that retrying cannot fix are returned as a 'failed' result;
+    anything else is raised so the queue retries the entry.
+    """
+    page_id_to_update = data.get('page_id')
+    try:
+        if page_id_to_update is None:
+            return queued_save_result(*notion_service.create_job_posting_if_new(**job_posting_fields(data)))
+        return queued_save_result(notion_service.update_job_posting(page_id=page_id_to_update,
+                                                                    **job_posting_fields(data)))
+    except APIResponseError as e:
+        failure = queued_save_failure(e)
+        if failure is None:
+            raise
+        return failure
+
+
+# Optional write-behind queue for asynchronous saves
+save_queue = SaveQueue(
+    path=Config.ASYNC_SAVES_JOURNAL_PATH,
+    process=_process_queued_save,
+    workers=Config.ASYNC_SAVES_WORKERS,
+    max_attempts=Config.ASYNC_SAVES_MAX_ATTEMPTS,
+    lease=Config.ASYNC_SAVES_LEASE_SECONDS
+) if Config.ASYNC_SAVES_ENABLED else None
+
+
+# Responses to requests sent with an Idempotency-Key header
+idempotency_store = build_idempotency_store()
+
+
+def idempotent(view: Callable) -> Callable:
+    """Run a view at most once per Idempotency-Key.
+    
+    A repeat of a finished request gets the stored response (marked with an
+    "Idempotent-Replayed: true" header) without calling Notion; a repeat
+    arriving while the first request is still running waits for it. Server
+    errors and 429s are not stored, so those can be retried with the same key.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if idempotency_store is None or key is None or request.method == 'OPTIONS':
+            return view(*args, **kwargs)
+        if not idempotency_key_valid(key):
+            body, status, headers = idempotency_rejection(None)
+            return jsonify(body), status, headers
+        
+        fingerprint = request_fingerprint(request.method, request.path, request.get_data())
+        outcome, stored = idempotency_store.begin(key, fingerprint)
+        if outcome == REPLAY:
+            status, data, headers = stored
+            logger.info("Replaying stored response for Idempotency-Key %s", key)
+            return Response(data, status=status, headers=replay_headers(headers), mimetype='application/json')
+        if outcome != STARTED:
+            logger.warning(f"Idempotency-Key {key} rejected: {outcome}")
+            body, status, headers = idempotency_rejection(outcome)
+            return jsonify(body), status, headers
+        
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            idempotency_store.abandon(key)
+            raise
+        idempotency_store.complete(key, response.status_code, response.get_data())
+        return response
+    return wrapper
+
+
+@api_bp.errorhandler(CircuitOpenError)
+def circuit_open(e: CircuitOpenError):
+    """Fail fast with 503 and Retry-After while the Notion circuit breaker is open."""
+    body, status = unavailable_error(e)
+    return jsonify(body), status, retry_after_headers(body)
 
 
 @api_bp.route('/job-postings/check', methods=['GET', 'OPTIONS'])
@@ -29,6 +120,7 @@ def check_job_posting():
     Returns:
         200: {"exists": true, "page_id": "...", "page_url": "..."}
         200: {"exists": false}
+        304: (empty) when If-None-Match holds the ETag of the current answer
         400: {"error": "posting_url parameter is required"}
     """
     logger.info("=== Received request to /api/job-postings/check ===")
@@ -44,35 +136,36 @@ def check_job_posting():
         logger.warning("Missing posting_url parameter")
         return jsonify({"error": "posting_url parameter is required"}), 400
     
-    logger.info(f"Checking if job exists: {posting_url}")
+    logger.info("Checking if job exists: %s", posting_url)
     
     try:
         # Check for duplicate
         existing_page_id = notion_service.check_duplicate(posting_url)
         
         if existing_page_id:
-            # Construct Notion page URL
-            page_url = f"https://www.notion.so/{existing_page_id.replace('-', '')}"
-            logger.info(f"Job exists with page ID: {existing_page_id}")
-            
-            return jsonify({
-                "exists": True,
-                "page_id": existing_page_id,
-                "page_url": page_url
-            }), 200
+            logger.info("Job exists with page ID: %s", existing_page_id)
         else:
             logger.info("Job does not exist")
-            return jsonify({"exists": False}), 200
+        response = jsonify(check_body(existing_page_id))
+        
+        # Conditional requests with a matching If-None-Match get a bodiless 304
+        response.headers['Cache-Control'] = check_cache_control(
+            existing_page_id is not None, Config.CHECK_CACHE_MAX_AGE_SECONDS
+        )
+        response.add_etag()
+        return response.make_conditional(request)
             
     except APIResponseError as e:
         logger.error(f"Notion API error during check: {e.code} - {str(e)}")
-        return jsonify({"error": "Failed to check job existence", "details": str(e)}), 500
+        body, status, headers = check_error(e)
+        return jsonify(body), status, headers
     except Exception as e:
         logger.error(f"Unexpected error during check: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
 @api_bp.route('/job-postings', methods=['POST', 'OPTIONS'])
+@idempotent
 def create_job_posting():
     """Create or update job posting in Notion database.
     
@@ -91,10 +184,18 @@ def create_job_posting():
         "country": "United States",  # optional
         "page_id": "existing-page-id"  # optional, for updates
     }
+    
+    When async saves are enabled, requests sent with a
+    "Prefer: respond-async" header are journaled and answered with
+    202 {"job_id": "...", "status_url": "..."}; the save then runs in the
+    background (see GET /api/job-postings/status/<job_id>).
+    
+    Requests sent with an "Idempotency-Key" header are saved at most once;
+    retries with the same key get the first response (see idempotent).
     """
     logger.info("=== Received request to /api/job-postings ===")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request headers: {dict(request.headers)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Request headers: {dict(request.headers)}")
     
     # Handle OPTIONS request for CORS preflight
     if request.method == 'OPTIONS':
@@ -102,10 +203,14 @@ def create_job_posting():
         return '', 204
     
     data = request.get_json()
-    logger.info(f"Received job posting request: {data.get('position', 'N/A') if data else 'NO DATA'} at {data.get('company', 'N/A') if data else 'NO DATA'}")
+    logger.info("Received job posting request: %s at %s",
+                data.get('position', 'N/A') if data else 'NO DATA',
+                data.get('company', 'N/A') if data else 'NO DATA')
     
     # Validate request
+    validation_started = time.perf_counter()
     is_valid, error_msg = validate_job_posting(data)
+    record_span('validate_job_posting', validation_started)
     if not is_valid:
         logger.warning(f"Validation failed: {error_msg}")
         return jsonify({"error": error_msg}), 400
@@ -114,18 +219,16 @@ def create_job_posting():
     page_id_to_update = data.get('page_id')
     is_update = page_id_to_update is not None
     
-    if not is_update:
-        # Check for duplicate only when creating
-        existing_page_id = notion_service.check_duplicate(data['posting_url'])
+    if save_queue and 'respond-async' in request.headers.get('Prefer', ''):
+        # Reject known duplicates up front when the index can answer from memory
+        existing_page_id = known_duplicate(notion_service.posting_index, data)
         if existing_page_id:
-            page_url = f"https://www.notion.so/{existing_page_id.replace('-', '')}"
-            logger.warning(f"Duplicate job posting detected: {data['posting_url']}")
-            return jsonify({
-                "error": "Job posting already saved",
-                "duplicate_field": "posting_url",
-                "existing_page_id": existing_page_id,
-                "existing_page_url": page_url
-            }), 409
+            return jsonify(duplicate_body(existing_page_id)), 409
+        
+        job_id = save_queue.submit(data)
+        logger.info("Queued job posting save: %s", job_id)
+        body, status = queued_body(job_id)
+        return jsonify(body), status
     
     # Create or update page in Notion
     try:
@@ -133,84 +236,251 @@ def create_job_posting():
             logger.info(f"Updating existing Notion page: {page_id_to_update}")
             page = notion_service.update_job_posting(
                 page_id=page_id_to_update,
-                position=data['position'],
-                company=data['company'],
-                posting_url=data['posting_url'],
-                origin=data['origin'],
-                match=data.get('match'),
-                work_arrangement=data.get('work_arrangement'),
-                demand=data.get('demand'),
-                budget=data.get('budget'),
-                job_description=data.get('job_description'),
-                city=data.get('city'),
-                country=data.get('country')
+                **job_posting_fields(data)
             )
-            message = "Job posting updated successfully"
         else:
             logger.info("Creating new Notion page")
-            page = notion_service.create_job_posting(
-                position=data['position'],
-                company=data['company'],
-                posting_url=data['posting_url'],
-                origin=data['origin'],
-                match=data.get('match'),
-                work_arrangement=data.get('work_arrangement'),
-                demand=data.get('demand'),
-                budget=data.get('budget'),
-                job_description=data.get('job_description'),
-                city=data.get('city'),
-                country=data.get('country')
-            )
-            message = "Job posting saved successfully"
+            # Duplicate check runs alongside the company lookup
+            page, existing_page_id = notion_service.create_job_posting_if_new(**job_posting_fields(data))
+            if existing_page_id:
+                logger.warning(f"Duplicate job posting detected: {data['posting_url']}")
+                return jsonify(duplicate_body(existing_page_id)), 409
         
-        page_id = page['id']
-        page_url = page['url']
-        
-        logger.info(f"Successfully {'updated' if is_update else 'created'} Notion page: {page_id}")
-        return jsonify({
-            "message": message,
-            "notion_page_id": page_id,
-            "notion_page_url": page_url,
-            "job_data": data
-        }), 200 if is_update else 201
+        logger.info(f"Successfully {'updated' if is_update else 'created'} Notion page: {page['id']}")
+        body, status = saved_body(page, data, is_update)
+        return jsonify(body), status
         
     except APIResponseError as e:
         logger.error(f"Notion API error: {e.code} - {str(e)}")
         
-        if e.code == 'unauthorized':
-            return jsonify({"error": "Notion authentication failed"}), 401
-        elif e.code == 'object_not_found':
-            return jsonify({"error": "Notion database not found"}), 404
-        elif e.code == 'rate_limited':
-            return jsonify({
-                "error": "Rate limit exceeded",
-                "retry_after": 60
-            }), 429
-        else:
-            return jsonify({"error": "Internal server error", "details": str(e)}), 500
+        body, status = save_error(e)
+        return jsonify(body), status, retry_after_headers(body)
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+@api_bp.route('/job-postings/check-batch', methods=['POST', 'OPTIONS'])
+def check_job_postings_batch():
+    """Check which of many job postings already exist in Notion database.
+    
+    Meant for badging every card of a LinkedIn search results page in one
+    round trip. Postings the posting index or mirror know are answered
+    locally; the rest share a few combined Notion queries.
+    
+    Request body:
+        {"posting_urls": ["https://www.linkedin.com/jobs/view/...", ...]}
+    
+    Returns:
+        200: {"results": {"<posting_url>": {"exists": true, "page_id": "...", "page_url": "..."},
+                          "<posting_url>": {"exists": false}}, "saved": 1}
+        400: {"error": "..."}
+    """
+    logger.info("=== Received request to /api/job-postings/check-batch ===")
+    
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    error_msg, posting_urls = parse_check_batch(request.get_json(silent=True), Config.BATCH_MAX_SIZE)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+    
+    logger.info(f"Checking {len(posting_urls)} job postings")
+    
+    try:
+        existing = notion_service.check_duplicates(posting_urls)
+        return jsonify(check_batch_body(existing)), 200
+    except APIResponseError as e:
+        logger.error(f"Notion API error during batch check: {e.code} - {str(e)}")
+        body, status, headers = check_error(e)
+        return jsonify(body), status, headers
+    except Exception as e:
+        logger.error(f"Unexpected error during batch check: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@api_bp.route('/job-postings/search', methods=['GET', 'OPTIONS'])
+def search_job_postings():
+    """Search saved job postings by keyword, served from the local search index.
+    
+    Query parameters:
+        q: Keywords matched against position, company and description
+            (all must match; word* matches a prefix)
+        match, work_arrangement, country: Exact filters
+        budget_min, budget_max: Budget range
+        limit: Results per page (default 20, at most 100)
+        offset: Results to skip
+    
+    Returns:
+        200: {"results": [{"page_id": "...", "position": "...", "score": 1.2,
+              "snippet": "...", ...}], "total": 42, "took_ms": 1.3}
+        400: {"error": "..."}
+        404: {"error": "Search is not enabled"}
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    if not notion_service.search_index:
+        return jsonify({"error": "Search is not enabled"}), 404
+    
+    error_msg, params = parse_search(request.args)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+    
+    started = time.perf_counter()
+    results, total = notion_service.search_index.search(**params)
+    return jsonify(search_body(results, total, started)), 200
+
+
+@api_bp.route('/job-postings/status/<job_id>', methods=['GET'])
+def job_posting_status(job_id):
+    """Report the progress of an asynchronous save.
+    
+    Returns:
+        200: {"job_id": "...", "state": "queued|processing|completed|duplicate|failed",
+              "attempts": 1, "result": {...}, "error": null, ...}
+        404: {"error": "..."}
+    """
+    body, status = status_response(save_queue is not None, save_queue.get(job_id) if save_queue else None)
+    return jsonify(body), status
+
+
+@api_bp.route('/job-postings/batch', methods=['POST', 'OPTIONS'])
+def create_job_postings_batch():
+    """Create many job postings in one request.
+    
+    Every posting is validated with the same rules as POST /api/job-postings.
+    Postings repeated within the batch or already saved in Notion are reported
+    as duplicates, each distinct company is resolved once, and pages are
+    created concurrently by a bounded worker pool.
+    
+    Expected JSON:
+    {
+        "job_postings": [{...}, {...}]  # same fields as POST /api/job-postings
+    }
+    
+    Returns:
+        200: {"results": [{"index": 0, "status": 201, ...}, ...],
+              "created": n, "duplicates": n, "failed": n}
+        400: {"error": "..."} when the batch itself is malformed
+    """
+    logger.info("=== Received request to /api/job-postings/batch ===")
+    
+    # Handle OPTIONS request for CORS preflight
+    if request.method == 'OPTIONS':
+        logger.info("Handling OPTIONS preflight request")
+        return '', 204
+    
+    data = request.get_json(silent=True)
+    
+    # Validate and dedupe within the batch
+    error_msg, results, to_create = parse_batch(data, Config.BATCH_MAX_SIZE)
+    if error_msg:
+        return jsonify({"error": error_msg}), 400
+    
+    logger.info(f"Received batch of {len(results)} job postings")
+    
+    # Dedupe against Notion with a few combined queries; if they fail the
+    # postings cannot be known to be new, so they fail instead of being created
+    try:
+        existing = notion_service.check_duplicates([posting['posting_url'] for _, posting in to_create])
+        pending = split_duplicates(to_create, results, existing)
+    except APIResponseError as e:
+        logger.error("Notion API error checking batch duplicates: %s - %s", e.code, e)
+        fail_batch_items(to_create, results, e)
+        pending = []
+
+    with ContextExecutor(max_workers=Config.BATCH_MAX_WORKERS) as executor:
+        # Resolve each distinct company once so page creation hits the company cache
+        companies = {posting['company'] for _, posting in pending}
+        list(executor.map(notion_service.find_or_create_company, companies))
+        
+        def create(item):
+            index, posting = item
+            try:
+                return batch_item_created(index, notion_service.create_job_posting(**job_posting_fields(posting)))
+            except APIResponseError as e:
+                logger.error(f"Notion API error in batch item {index}: {e.code} - {str(e)}")
+                return batch_item_error(index, e)
+            except Exception as e:
+                logger.error(f"Unexpected error in batch item {index}: {str(e)}")
+                return batch_item_unexpected(index)
+        
+        for result in executor.map(create, pending):
+            results[result['index']] = result
+    
+    summary = summarize_batch(data['job_postings'], results)
+    logger.info(f"Batch finished: {summary['created']} created, "
+                f"{summary['duplicates']} duplicates, {summary['failed']} failed")
+    return jsonify(summary), 200
+
+
+@api_bp.route('/debug/traces', methods=['GET'])
+def list_traces():
+    """List the newest stored request traces.
+    
+    Requires the X-Debug-Trace header when TRACING_TOKEN is set.
+    
+    Returns:
+        200: {"traces": [{"request_id": "...", "path": "...", "duration_ms": 12.3, ...}]}
+        403/404: {"error": "..."}
+    """
+    error = debug_access_error(request.headers)
+    if error:
+        return jsonify(error[0]), error[1]
+    return jsonify({"traces": trace_store.recent()}), 200
+
+
+@api_bp.route('/debug/traces/<request_id>', methods=['GET'])
+def get_trace(request_id):
+    """Return the trace (and profile summary) stored for a request ID.
+    
+    Returns:
+        200: {"request_id": "...", "spans": [...], "profile": {...} or absent, ...}
+        403/404: {"error": "..."}
+    """
+    error = debug_access_error(request.headers)
+    if error:
+        return jsonify(error[0]), error[1]
+    trace = trace_store.load(request_id)
+    if trace is None:
+        return jsonify({"error": "Unknown request ID"}), 404
+    return jsonify(trace), 200
+
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
-    logger.info("Health check requested")
-    is_valid, error_msg = notion_service.validate_database()
-    
-    if is_valid:
-        logger.info("Health check passed")
-        return jsonify({
-            "status": "healthy",
-            "notion_connected": True,
-            "database_validated": True
-        }), 200
-    else:
-        logger.error(f"Health check failed: {error_msg}")
-        return jsonify({
-            "status": "unhealthy",
-            "notion_connected": False,
-            "database_validated": False,
-            "error": error_msg
-        }), 500
+    """Health check endpoint.
+    
+    Served from the cached database validation (refreshed in the
+    background), so probes do not spend Notion quota.
+    """
+    logger.debug("Health check requested")
+    check = notion_service.schema_check.result(wait=True)
+    if not check['valid']:
+        logger.error(f"Health check failed: {check['error']}")
+    
+    body, status = health_body(check, notion_service.client.stats())
+    return jsonify(body), status
+
+
+@api_bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving requests (no Notion access)."""
+    return jsonify({"status": "alive"}), 200
+
+
+@api_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: the last database validation passed and is not stale.
+    
+    Returns:
+        200: {"status": "ready", "schema_check": {...}, ...}
+        503: {"status": "not_ready", "schema_check": {...}, ...}
+    """
+    body, status = readiness_body(
+        notion_service,
+        notion_service.mirror.stats() if notion_service.mirror else None,
+        save_queue.pending_count() if save_queue else None
+    )
+    return jsonify(body), status
@@ -6,6 +6,9 @@ LINKEDIN_URL_PATTERN = re.compile(
     r'^https://www\.linkedin\.com/jobs/(view|collections)/.+$'
 )
 
+# Optional fields that must be strings when present (null means not given)
+OPTIONAL_TEXT_FIELDS = ('match', 'work_arrangement', 'demand', 'city', 'country', 'job_description')
+
 
 def validate_job_posting(data: Dict) -> tuple[bool, Optional[str]]:
     """Validate job posting request data.
@@ -16,16 +19,27 @@ def validate_job_posting(data: Dict) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
+    if not isinstance(data, dict):
+        return False, "job posting must be an object"
+    
     # Check required fields
     required_fields = ['position', 'company', 'posting_url', 'origin']
     for field in required_fields:
         if field not in data:
             return False, f"{field} is required"
         
+        # Imported rows and API payloads may carry numbers, lists or null
+        if not isinstance(data[field], str):
+            return False, f"{field} must be a string"
+        
         # Check for empty strings
-        if isinstance(data[field], str) and not data[field].strip():
+        if not data[field].strip():
             return False, f"{field} cannot be empty"
     
+    for field in OPTIONAL_TEXT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return False, f"{field} must be a string"
+    
     # Validate position length
     if len(data['position']) > 500:
         return False, "position must be 500 characters or less"
@@ -1,10 +1,38 @@
 """Flask application factory."""
 from flask import Flask
-from flask_cors import CORS
 import logging
+import threading
 
 from .config.settings import Config
-from .api.routes import api_bp
+from .logging_setup import configure_logging
+from .api import access_log, cors, metrics, request_tracing
+from .api.routes import api_bp, notion_service, save_queue
+from .cli import backfill_search_index_command, sync_mirror_command
+from .importer import import_postings_command
+
+_background_lock = threading.Lock()
+_background_started = False
+
+
+def start_background_tasks() -> None:
+    """Start the background workers: schema check, posting index build, mirror sync,
+    company preload, cache snapshots and the save queue.
+    
+    Only a serving process needs them, so create_app() does not start them
+    (flask CLI commands would otherwise build the whole index). wsgi.py
+    starts them before serving; under any other server the first request
+    does. Later calls do nothing.
+    """
+    global _background_started
+    if _background_started:
+        return
+    with _background_lock:
+        if _background_started:
+            return
+        notion_service.start_background_tasks()
+        if save_queue:
+            save_queue.start()
+        _background_started = True
 
 
 def create_app():
@@ -14,10 +42,7 @@ def create_app():
         Flask: Configured Flask application instance
     """
     # Configure logging
-    logging.basicConfig(
-        level=logging.DEBUG if Config.FLASK_DEBUG else logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    configure_logging()
     
     logger = logging.getLogger(__name__)
     
@@ -36,11 +61,32 @@ def create_app():
     app.config['DEBUG'] = Config.FLASK_DEBUG
     
     # Configure CORS - open for development
-    CORS(app)
+    cors.init_app(app)
     
     # Register blueprints
     app.register_blueprint(api_bp)
     
+    # flask import-postings / sync-mirror / backfill-search-index
+    app.cli.add_command(import_postings_command)
+    app.cli.add_command(sync_mirror_command)
+    app.cli.add_command(backfill_search_index_command)
+    
+    # One structured log line per request (route, status, latency, Notion calls)
+    if Config.ACCESS_LOG_ENABLED:
+        access_log.init_app(app)
+    
+    # Opt-in request traces served on GET /api/debug/traces/<request_id>
+    if request_tracing.tracing_available():
+        request_tracing.init_app(app)
+    
+    # Prometheus metrics on GET /metrics
+    if Config.METRICS_ENABLED:
+        metrics.init_app(app)
+        metrics.register_service_metrics(notion_service, save_queue)
+    
+    # Background workers start with the first request unless the server started them already
+    app.before_request(start_background_tasks)
+    
     logger.info("✓ Flask application created successfully")
     
     return app
@@ -0,0 +1,60 @@
+"""Quart (ASGI) application factory.
+
+Alternative to the Flask app in app.py that serves the same /api routes
+with async handlers backed by AsyncNotionService.
+"""
+from quart import Quart
+import logging
+
+from .config.settings import Config
+from .logging_setup import configure_logging
+
+
+def create_asgi_app():
+    """Application factory for the async app.
+    
+    Returns:
+        Quart: Configured Quart application instance
+    """
+    # Configure logging
+    configure_logging()
+    
+    logger = logging.getLogger(__name__)
+    
+    # Validate configuration on startup
+    try:
+        Config.validate()
+        logger.info("✓ Configuration validated successfully")
+    except ValueError as e:
+        logger.error(f"✗ Configuration error: {e}")
+        raise
+    
+    # Imported after validation: importing the routes builds the Notion service
+    from .api import access_log, cors, metrics, request_tracing
+    from .api.async_routes import async_api_bp, notion_service, save_queue
+    
+    app = Quart(__name__)
+    app.config['DEBUG'] = Config.FLASK_DEBUG
+    
+    # Configure CORS - open for development
+    cors.init_app(app)
+    
+    # Register blueprints (background workers start when serving begins)
+    app.register_blueprint(async_api_bp)
+    
+    # One structured log line per request (route, status, latency, Notion calls)
+    if Config.ACCESS_LOG_ENABLED:
+        access_log.init_app(app)
+    
+    # Opt-in request traces served on GET /api/debug/traces/<request_id>
+    if request_tracing.tracing_available():
+        request_tracing.init_app(app)
+    
+    # Prometheus metrics on GET /metrics
+    if Config.METRICS_ENABLED:
+        metrics.init_app(app)
+        metrics.register_service_metrics(notion_service, save_queue)
+    
+    logger.info("✓ Quart application created successfully")
+    
+    return app
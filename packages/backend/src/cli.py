@@ -0,0 +1,37 @@
+"""Flask CLI commands for maintenance tasks.
+
+Run with:
+    flask --app wsgi sync-mirror
+    flask --app wsgi backfill-search-index
+"""
+import json
+
+import click
+
+
+@click.command('sync-mirror')
+@click.option('--full', is_flag=True, help="Re-read every page and drop pages deleted in Notion")
+def sync_mirror_command(full):
+    """Sync the local Notion mirror once and print its state."""
+    from .api.routes import notion_service
+
+    if not notion_service.mirror:
+        raise click.ClickException("The mirror is disabled; set MIRROR_ENABLED=True")
+
+    databases = notion_service.mirror.sync(full=full)
+    click.echo(json.dumps(databases, indent=2))
+    if any(database['last_error'] for database in databases.values()):
+        raise SystemExit(1)
+
+
+@click.command('backfill-search-index')
+@click.option('--reindex', is_flag=True, help="Re-read postings that are already indexed")
+def backfill_search_index_command(reindex):
+    """Index job postings saved before the search index was enabled."""
+    from .api.routes import notion_service
+
+    if not notion_service.search_index:
+        raise click.ClickException("Search is disabled; set SEARCH_INDEX_ENABLED=True")
+
+    indexed = notion_service.backfill_search_index(reindex=reindex)
+    click.echo(f"Indexed {indexed} postings ({notion_service.search_index.count()} in the index)")
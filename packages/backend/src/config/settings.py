@@ -14,10 +14,123 @@ class Config:
     NOTION_DATABASE_COMPANIES_ID = os.getenv('NOTION_DATABASE_COMPANIES_ID')
     NOTION_DATABASE_PEOPLE_ID = os.getenv('NOTION_DATABASE_PEOPLE_ID')
     NOTION_DATABASE_RESOURCES_ID = os.getenv('NOTION_DATABASE_RESOURCES_ID')
+    # API endpoint (override to point the backend at a local stand-in, e.g. for benchmarks)
+    NOTION_BASE_URL = os.getenv('NOTION_BASE_URL', 'https://api.notion.com')
+    
+    # Number property storing the LinkedIn job ID (used only if the database has it)
+    NOTION_JOB_ID_PROPERTY = os.getenv('NOTION_JOB_ID_PROPERTY', 'LinkedIn Job ID')
     
     # Notion Template Pages
     NOTION_TEMPLATE_JOB_APPLICATION_ID = os.getenv('NOTION_TEMPLATE_JOB_APPLICATION_ID')
     
+    # Notion rate limiting - Notion allows ~3 requests/second per integration.
+    # Set NOTION_RATE_LIMIT_STATE_PATH to share the limit between worker processes.
+    NOTION_RATE_LIMIT_PER_SECOND = float(os.getenv('NOTION_RATE_LIMIT_PER_SECOND', 3))
+    NOTION_RATE_LIMIT_BURST = float(os.getenv('NOTION_RATE_LIMIT_BURST', 3))
+    NOTION_RATE_LIMIT_STATE_PATH = os.getenv('NOTION_RATE_LIMIT_STATE_PATH')
+    NOTION_MAX_RETRIES = int(os.getenv('NOTION_MAX_RETRIES', 5))
+    # Worker threads for independent Notion calls within one request (e.g. block deletes)
+    NOTION_MAX_CONCURRENCY = int(os.getenv('NOTION_MAX_CONCURRENCY', 4))
+    
+    # HTTP transport for Notion calls (one pooled keep-alive client per process)
+    NOTION_HTTP_MAX_CONNECTIONS = int(os.getenv('NOTION_HTTP_MAX_CONNECTIONS', 20))
+    NOTION_HTTP_MAX_KEEPALIVE = int(os.getenv('NOTION_HTTP_MAX_KEEPALIVE', 10))
+    NOTION_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('NOTION_HTTP_KEEPALIVE_EXPIRY', 60))
+    NOTION_HTTP_CONNECT_TIMEOUT = float(os.getenv('NOTION_HTTP_CONNECT_TIMEOUT', 5))
+    NOTION_HTTP_READ_TIMEOUT = float(os.getenv('NOTION_HTTP_READ_TIMEOUT', 30))
+    NOTION_HTTP2 = os.getenv('NOTION_HTTP2', 'False') == 'True'
+    
+    # Posting URL index (answers duplicate checks from memory)
+    POSTING_INDEX_ENABLED = os.getenv('POSTING_INDEX_ENABLED', 'True') == 'True'
+    POSTING_INDEX_REFRESH_SECONDS = int(os.getenv('POSTING_INDEX_REFRESH_SECONDS', 300))
+    POSTING_INDEX_MAX_STALENESS_SECONDS = int(os.getenv('POSTING_INDEX_MAX_STALENESS_SECONDS', 900))
+    
+    # Local SQLite mirror of both databases (serves duplicate checks and company lookups)
+    MIRROR_ENABLED = os.getenv('MIRROR_ENABLED', 'False') == 'True'
+    MIRROR_PATH = os.getenv('MIRROR_PATH', 'notion_mirror.db')
+    MIRROR_SYNC_INTERVAL_SECONDS = int(os.getenv('MIRROR_SYNC_INTERVAL_SECONDS', 60))
+    MIRROR_MAX_LAG_SECONDS = int(os.getenv('MIRROR_MAX_LAG_SECONDS', 300))
+    MIRROR_FULL_SYNC_INTERVAL_SECONDS = int(os.getenv('MIRROR_FULL_SYNC_INTERVAL_SECONDS', 86400))
+    
+    # Snapshots of the posting index, company cache and schema check, restored on
+    # startup so a restarted worker only fetches what changed since
+    CACHE_SNAPSHOT_ENABLED = os.getenv('CACHE_SNAPSHOT_ENABLED', 'False') == 'True'
+    CACHE_SNAPSHOT_PATH = os.getenv('CACHE_SNAPSHOT_PATH', 'cache_snapshot.db')
+    CACHE_SNAPSHOT_INTERVAL_SECONDS = int(os.getenv('CACHE_SNAPSHOT_INTERVAL_SECONDS', 300))
+    CACHE_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv('CACHE_SNAPSHOT_MAX_AGE_SECONDS', 86400))
+    
+    # Full-text search over saved postings (GET /api/job-postings/search)
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'False') == 'True'
+    SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'search_index.db')
+    
+    # Duplicate checks - "not saved" answers are reused for a short time (cleared
+    # when the posting is created); clients may cache "saved" answers for
+    # CHECK_CACHE_MAX_AGE_SECONDS (Cache-Control)
+    CHECK_NOT_FOUND_CACHE_SIZE = int(os.getenv('CHECK_NOT_FOUND_CACHE_SIZE', 1000))
+    CHECK_NOT_FOUND_CACHE_TTL_SECONDS = int(os.getenv('CHECK_NOT_FOUND_CACHE_TTL_SECONDS', 30))
+    CHECK_CACHE_MAX_AGE_SECONDS = int(os.getenv('CHECK_CACHE_MAX_AGE_SECONDS', 60))
+    
+    # Company name -> page ID cache (LRU)
+    COMPANY_CACHE_SIZE = int(os.getenv('COMPANY_CACHE_SIZE', 1000))
+    
+    # Page state cache used to send only changed properties on updates
+    PAGE_CACHE_SIZE = int(os.getenv('PAGE_CACHE_SIZE', 500))
+    PAGE_CACHE_TTL_SECONDS = int(os.getenv('PAGE_CACHE_TTL_SECONDS', 300))
+    
+    # Health checks - database validation is cached and refreshed in the background
+    HEALTH_CHECK_INTERVAL_SECONDS = int(os.getenv('HEALTH_CHECK_INTERVAL_SECONDS', 60))
+    HEALTH_CHECK_MAX_AGE_SECONDS = int(os.getenv('HEALTH_CHECK_MAX_AGE_SECONDS', 300))
+    
+    # Batch saves
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 300))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+    
+    # Asynchronous saves (write-behind journal drained by background workers)
+    ASYNC_SAVES_ENABLED = os.getenv('ASYNC_SAVES_ENABLED', 'False') == 'True'
+    ASYNC_SAVES_JOURNAL_PATH = os.getenv('ASYNC_SAVES_JOURNAL_PATH', 'save_journal.db')
+    ASYNC_SAVES_WORKERS = int(os.getenv('ASYNC_SAVES_WORKERS', 2))
+    ASYNC_SAVES_MAX_ATTEMPTS = int(os.getenv('ASYNC_SAVES_MAX_ATTEMPTS', 5))
+    ASYNC_SAVES_LEASE_SECONDS = float(os.getenv('ASYNC_SAVES_LEASE_SECONDS', 300))
+    
+    # Circuit breaker: after CIRCUIT_BREAKER_FAILURE_RATE of at least
+    # CIRCUIT_BREAKER_MIN_CALLS Notion calls in the window failed (5xx,
+    # timeouts, connection errors), calls fail fast with 503 for
+    # CIRCUIT_BREAKER_OPEN_SECONDS, then trial calls probe for recovery
+    CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'True') == 'True'
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', 0.5))
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', 10))
+    CIRCUIT_BREAKER_WINDOW_SECONDS = float(os.getenv('CIRCUIT_BREAKER_WINDOW_SECONDS', 30))
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', 30))
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.getenv('CIRCUIT_BREAKER_HALF_OPEN_CALLS', 1))
+    
+    # Idempotency-Key support on POST /api/job-postings (responses replayed to retries)
+    IDEMPOTENCY_ENABLED = os.getenv('IDEMPOTENCY_ENABLED', 'True') == 'True'
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 1000))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 60))
+    # SQLite file sharing the keys between worker processes (in memory if unset)
+    IDEMPOTENCY_STATE_PATH = os.getenv('IDEMPOTENCY_STATE_PATH')
+    
+    # Logging (set LOG_LEVEL=DEBUG for request headers and other debug output)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # text or json
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'False') == 'True'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+    ACCESS_LOG_ENABLED = os.getenv('ACCESS_LOG_ENABLED', 'True') == 'True'
+    
+    # Request tracing: spans per NotionService method and Notion call, stored in
+    # TRACES_DIR. Every request is traced with TRACING_ENABLED; otherwise only
+    # requests sending X-Debug-Trace: <TRACING_TOKEN>.
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False') == 'True'
+    TRACING_TOKEN = os.getenv('TRACING_TOKEN', '')
+    TRACES_DIR = os.getenv('TRACES_DIR', 'traces')
+    TRACES_MAX_FILES = int(os.getenv('TRACES_MAX_FILES', 200))
+    TRACE_PROFILE_SAMPLE_RATE = float(os.getenv('TRACE_PROFILE_SAMPLE_RATE', 0.0))
+    
+    # Prometheus metrics on GET /metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+    
     # Flask
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True') == 'True'
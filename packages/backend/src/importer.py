@@ -0,0 +1,299 @@
+"""Bulk import of job postings from JSONL or CSV files.
+
+Run through the Flask CLI:
+    flask --app wsgi import-postings postings.jsonl
+    flask --app wsgi import-postings postings.csv --workers 4 --errors failed.jsonl
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Set, TextIO, Tuple
+import csv
+import json
+import logging
+import os
+import threading
+import time
+
+import click
+from notion_client.errors import APIResponseError
+
+from .api.payloads import job_posting_fields
+from .api.validators import validate_job_posting
+from .config.settings import Config
+from .services.linkedin import extract_linkedin_job_id
+from .services.notion_service import NotionService
+
+logger = logging.getLogger(__name__)
+
+
+def read_jsonl(f: TextIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Stream postings from a JSON Lines file.
+
+    Yields:
+        Tuples of (line_number, posting, error); blank lines are skipped
+    """
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            posting = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(posting, dict):
+            yield number, None, "job posting must be an object"
+            continue
+        yield number, posting, None
+
+
+def read_csv(f: TextIO) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Stream postings from a CSV file with a header row of field names.
+
+    Empty cells are left out and budget is converted to a number when it
+    parses as one (otherwise validation reports it).
+
+    Yields:
+        Tuples of (row_number, posting, error); row 1 is the first data row
+    """
+    for number, row in enumerate(csv.DictReader(f), start=1):
+        posting = {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and isinstance(value, str) and value.strip()
+        }
+        if 'budget' in posting:
+            try:
+                posting['budget'] = float(posting['budget'])
+            except ValueError:
+                pass
+        yield number, posting, None
+
+
+class ImportCheckpoint:
+    """Resume point of an import, saved as a small JSON file next to the input.
+
+    Rows finish out of order, so the checkpoint records the last row up to
+    which every row has finished. A resumed run starts after it; rows past
+    it that had already been saved are found by the duplicate check.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.row = 0
+
+    def load(self) -> bool:
+        """Load a previous checkpoint for the same source file.
+
+        Returns:
+            True if there was one to resume from
+        """
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get('source') != self.source:
+            raise click.ClickException(
+                f"Checkpoint {self.path} belongs to {state.get('source')}; "
+                f"pass --restart or a different --checkpoint"
+            )
+        self.row = state['row']
+        return True
+
+    def save(self, row: int) -> None:
+        """Atomically record that every row up to and including row has finished."""
+        self.row = row
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({
+                "source": self.source,
+                "row": row,
+                "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            }, f)
+        os.replace(temp_path, self.path)
+
+
+class BulkImporter:
+    """Saves a stream of postings to Notion through a bounded worker pool.
+
+    The Notion client's rate limiter paces the workers, and at most two
+    postings per worker are read ahead, so memory use does not grow with
+    the size of the input. Postings that fail validation, repeat an earlier
+    row or already exist in Notion are skipped; failed rows are written to
+    the error report as JSON Lines that can be imported again.
+    """
+
+    def __init__(self, service: NotionService, workers: int,
+                 checkpoint: ImportCheckpoint, errors: Optional[TextIO] = None,
+                 checkpoint_interval: float = 5.0):
+        """Initialize the importer.
+
+        Args:
+            service: Notion service used to save the postings
+            workers: Postings saved concurrently
+            checkpoint: Where progress is recorded
+            errors: File receiving one JSON line per rejected or failed row
+            checkpoint_interval: Seconds between checkpoint writes
+        """
+        self.service = service
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.errors = errors
+        self.checkpoint_interval = checkpoint_interval
+
+        self.counts = {"created": 0, "duplicates": 0, "invalid": 0, "failed": 0}
+        self.error_reasons: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._seen: Set = set()
+        self._started: deque = deque()
+        self._finished: Set[int] = set()
+        self._watermark = checkpoint.row
+
+    def run(self, rows: Iterator[Tuple[int, Optional[Dict], Optional[str]]]) -> Dict:
+        """Import rows, resuming after the checkpoint.
+
+        Returns:
+            Counts for this run plus "rows", "seconds" and "rows_per_second"
+        """
+        resume_after = self.checkpoint.row
+        started = time.monotonic()
+        last_checkpoint = started
+        interrupted = False
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="import") as executor:
+            try:
+                for number, posting, error in rows:
+                    if number <= resume_after:
+                        continue
+                    with self._lock:
+                        self._started.append(number)
+                    if error is None:
+                        error = self._validate(posting)
+                    if error:
+                        self._finish(number, 'invalid', posting, error)
+                    elif self._repeated(posting):
+                        self._finish(number, 'duplicates')
+                    else:
+                        self._slots.acquire()
+                        future = executor.submit(self._save, posting)
+                        future.add_done_callback(lambda f, n=number, p=posting: self._saved(f, n, p))
+
+                    if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                        self._save_checkpoint()
+                        last_checkpoint = time.monotonic()
+            except KeyboardInterrupt:
+                interrupted = True
+                logger.warning("Import interrupted, waiting for in-flight postings")
+
+        self._save_checkpoint()
+        elapsed = time.monotonic() - started
+        rows_done = sum(self.counts.values())
+        return dict(
+            self.counts,
+            rows=rows_done,
+            interrupted=interrupted,
+            seconds=round(elapsed, 2),
+            rows_per_second=round(rows_done / elapsed, 2) if elapsed else 0.0
+        )
+
+    @staticmethod
+    def _validate(posting: Dict) -> Optional[str]:
+        is_valid, error_msg = validate_job_posting(posting)
+        return None if is_valid else error_msg
+
+    def _repeated(self, posting: Dict) -> bool:
+        """Return whether an earlier row of this run has the same posting."""
+        # Same LinkedIn job under different URLs counts as a repeat
+        posting_key = extract_linkedin_job_id(posting['posting_url']) or posting['posting_url']
+        with self._lock:
+            if posting_key in self._seen:
+                return True
+            self._seen.add(posting_key)
+        return False
+
+    def _save(self, posting: Dict) -> Optional[str]:
+        """Save a posting unless it exists; returns the existing page ID if it does."""
+        page, existing_page_id = self.service.create_job_posting_if_new(**job_posting_fields(posting))
+        return existing_page_id
+
+    def _saved(self, future: Future, number: int, posting: Dict) -> None:
+        self._slots.release()
+        try:
+            existing_page_id = future.result()
+        except APIResponseError as e:
+            self._finish(number, 'failed', posting, f"{e.code}: {str(e)}")
+        except Exception as e:
+            self._finish(number, 'failed', posting, str(e))
+        else:
+            self._finish(number, 'duplicates' if existing_page_id else 'created')
+
+    def _finish(self, number: int, outcome: str, posting: Optional[Dict] = None,
+                error: Optional[str] = None) -> None:
+        """Count a finished row and advance the contiguous watermark."""
+        with self._lock:
+            self.counts[outcome] += 1
+            if error:
+                reason = error.split(':', 1)[0] if outcome == 'failed' else error
+                self.error_reasons[reason] = self.error_reasons.get(reason, 0) + 1
+                if self.errors:
+                    self.errors.write(json.dumps(dict(posting or {}, _row=number, _error=error)) + '\n')
+            self._finished.add(number)
+            while self._started and self._started[0] in self._finished:
+                self._watermark = self._started.popleft()
+                self._finished.discard(self._watermark)
+
+    def _save_checkpoint(self) -> None:
+        with self._lock:
+            if self.errors:
+                self.errors.flush()
+            self.checkpoint.save(self._watermark)
+
+
+@click.command('import-postings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['jsonl', 'csv']),
+              help="Input format (default: from the file extension)")
+@click.option('--workers', type=int, default=Config.BATCH_MAX_WORKERS, show_default=True,
+              help="Postings saved concurrently")
+@click.option('--checkpoint', 'checkpoint_path', type=click.Path(dir_okay=False),
+              help="Checkpoint file (default: PATH.checkpoint)")
+@click.option('--restart', is_flag=True, help="Ignore an existing checkpoint and start from the first row")
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False),
+              help="Append rejected and failed rows to this JSON Lines file")
+def import_postings_command(path, file_format, workers, checkpoint_path, restart, errors_path):
+    """Import job postings from a JSONL or CSV file into Notion."""
+    from .api.routes import notion_service
+
+    file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    checkpoint = ImportCheckpoint(checkpoint_path or f"{path}.checkpoint", path)
+    if not restart and checkpoint.load():
+        click.echo(f"Resuming after row {checkpoint.row} ({checkpoint.path})")
+
+    errors = open(errors_path, 'a') if errors_path else None
+    try:
+        with open(path, newline='' if file_format == 'csv' else None, encoding='utf-8') as f:
+            rows = read_csv(f) if file_format == 'csv' else read_jsonl(f)
+            importer = BulkImporter(notion_service, max(1, workers), checkpoint, errors)
+            summary = importer.run(rows)
+    finally:
+        if errors:
+            errors.close()
+
+    click.echo(
+        f"Processed {summary['rows']} rows in {summary['seconds']}s "
+        f"({summary['rows_per_second']} rows/s): {summary['created']} created, "
+        f"{summary['duplicates']} duplicates, {summary['invalid']} invalid, {summary['failed']} failed"
+    )
+    if importer.error_reasons:
+        click.echo("Errors:")
+        for reason, count in sorted(importer.error_reasons.items(), key=lambda item: -item[1]):
+            click.echo(f"  {count:>6}  {reason}")
+        if errors_path:
+            click.echo(f"Rejected and failed rows written to {errors_path}")
+    if summary['interrupted']:
+        click.echo(f"Interrupted; run again to resume after row {checkpoint.row}")
+        raise SystemExit(130)
+    if summary['failed']:
+        raise SystemExit(1)
@@ -0,0 +1,126 @@
+"""Logging configuration shared by the Flask and Quart apps."""
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
+import atexit
+import json
+import logging
+import queue
+import random
+
+from .config.settings import Config
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Loggers whose INFO records are sampled with LOG_SAMPLE_RATE (per-request chatter)
+SAMPLED_LOGGERS = ('src.api',)
+
+# LogRecord attributes that are not extra fields passed by the caller
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Fields passed with extra= become top-level keys, so structured records
+    (like the access log) can be queried without parsing the message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a share of the INFO (and lower) records of some loggers.
+
+    Warnings and errors always pass, as does everything from other loggers.
+    """
+
+    def __init__(self, rate: float, prefixes: Tuple[str, ...] = SAMPLED_LOGGERS):
+        """Initialize the filter.
+
+        Args:
+            rate: Share of matching records kept (0 to 1)
+            prefixes: Logger names (and their children) that are sampled
+        """
+        super().__init__()
+        self.rate = rate
+        self.prefixes = prefixes
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        if not any(record.name == p or record.name.startswith(p + '.') for p in self.prefixes):
+            return True
+        return random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller.
+
+    Only the message is rendered on the calling thread; formatting and
+    writing happen on the listener thread. When the queue is full the
+    record is dropped and counted instead of waiting for the writer.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now: args may be mutated after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Set up the root logger from Config.
+
+    Like logging.basicConfig, does nothing if the root logger already has
+    handlers (e.g. when a second app is created in the same process).
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    level = Config.LOG_LEVEL.upper() or 'INFO'
+    root.setLevel(level)
+
+    handler = logging.StreamHandler()
+    if Config.LOG_FORMAT == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    if Config.LOG_ASYNC:
+        log_queue: queue.Queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        # Flushes records still queued at exit
+        atexit.register(_listener.stop)
+        handler = DroppingQueueHandler(log_queue)
+
+    if Config.LOG_SAMPLE_RATE < 1:
+        handler.addFilter(SamplingFilter(Config.LOG_SAMPLE_RATE))
+    root.addHandler(handler)
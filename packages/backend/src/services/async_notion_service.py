@@ -0,0 +1,513 @@
+"""Async Notion operations for the ASGI app."""
+from notion_client.errors import APIResponseError
+from notion_client.helpers import async_collect_paginated_api
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+import httpx
+
+from .description_blocks import (batch_blocks, block_report_summary, delete_error, description_blocks,
+                                 diff_blocks, log_block_failures, new_block_report, plan_description,
+                                 record_block_outcomes)
+from .linkedin import extract_linkedin_job_id
+from .notion_payloads import (
+    batched_duplicate_filters, changed_properties, company_filter, company_page_data,
+    description_batches, description_hash, duplicate_filter, job_posting_page_data, posting_key
+)
+from .notion_service import NotionService
+from .singleflight import AsyncSingleFlight
+from .circuit_breaker import CircuitOpenError
+from .throttled_client import AsyncThrottledClient
+from .tracing import trace_methods
+
+logger = logging.getLogger(__name__)
+
+
+@trace_methods
+class AsyncNotionService:
+    """Request-path Notion operations as coroutines, on top of a NotionService.
+
+    check_duplicate(s), find_or_create_company, create_job_posting(_if_new)
+    and update_job_posting await notion_client.AsyncClient, so one event loop
+    can keep hundreds of saves and checks waiting on Notion without a thread
+    per request. Requests are built and responses read with the helpers in
+    notion_payloads, like NotionService does.
+
+    The wrapped NotionService owns the caches, posting index, mirror, search
+    index and snapshots, and runs the background work (schema check, index
+    refresh, mirror sync, company preload) on its sync client in daemon
+    threads. Both clients draw from the same token bucket and circuit
+    breaker, so together they stay within one rate limit. Mirror and search
+    index reads and writes are SQLite calls, so they run in worker threads
+    (asyncio.to_thread) instead of on the event loop.
+    """
+
+    def __init__(self, service: NotionService,
+                 async_http_client: Optional[httpx.AsyncClient] = None,
+                 timeout: Optional[httpx.Timeout] = None,
+                 max_concurrency: int = 4):
+        """Initialize the service.
+
+        Args:
+            service: NotionService holding the shared state and background workers
+            async_http_client: Shared pooled async HTTP client (see
+                http_transport.build_async_http_client); a default
+                httpx.AsyncClient is created if omitted
+            timeout: Connect/read timeouts applied to the async HTTP client
+            max_concurrency: Block updates and deletes run at once within one operation
+        """
+        self.service = service
+        self.async_client = AsyncThrottledClient(
+            bucket=service.client.bucket,
+            max_retries=service.client.max_retries,
+            timeout=timeout,
+            breaker=service.client.breaker,
+            client=async_http_client,
+            auth=service.client.options.auth,
+            base_url=service.client.options.base_url
+        )
+        # Shared with the wrapped service (health, readiness and metrics read them)
+        self.client = service.client
+        self.database_id = service.database_id
+        self.companies_database_id = service.companies_database_id
+        self.posting_index = service.posting_index
+        self.mirror = service.mirror
+        self.search_index = service.search_index
+        self.snapshot = service.snapshot
+        self.schema_check = service.schema_check
+        self.company_cache = service.company_cache
+        self.page_state_cache = service.page_state_cache
+        self.not_found_cache = service.not_found_cache
+
+        self._company_flight = AsyncSingleFlight()
+        self._duplicate_flight = AsyncSingleFlight()
+        self._block_semaphore = asyncio.Semaphore(max_concurrency)
+
+    def start_background_tasks(self) -> None:
+        """Start the wrapped service's background workers."""
+        self.service.start_background_tasks()
+
+    async def aclose(self) -> None:
+        """Stop background workers and close both HTTP clients."""
+        self.service.close()
+        await self.async_client.aclose()
+
+    def company_lookups_in_flight(self) -> int:
+        """Return the number of distinct company lookups currently running."""
+        return self.service.company_lookups_in_flight() + self._company_flight.in_flight()
+
+    async def check_duplicate(self, posting_url: str, fresh: bool = False) -> Optional[str]:
+        """Check if job posting already exists in database (see NotionService.check_duplicate).
+
+        Args:
+            posting_url: LinkedIn job posting URL
+            fresh: Skip cached "not saved" answers (used before creating a page)
+
+        Returns:
+            Existing page ID if duplicate found, None otherwise
+        """
+        job_id = extract_linkedin_job_id(posting_url)
+
+        if job_id is not None and self.posting_index:
+            answered, page_id = self.posting_index.lookup(job_id)
+            if answered:
+                return page_id
+
+        if self.mirror:
+            answered, page_id = await asyncio.to_thread(
+                self.mirror.find_posting, self.database_id, job_id, posting_url
+            )
+            if answered:
+                return page_id
+
+        key = posting_key(posting_url, job_id)
+        if not fresh and self.not_found_cache.get(key):
+            return None
+
+        try:
+            return await self._duplicate_flight.do(
+                key,
+                lambda: self._query_duplicate(posting_url, job_id)
+            )
+        except CircuitOpenError:
+            # Notion is down: "not saved" would be a guess, so the caller gets the 503
+            raise
+        except APIResponseError as e:
+            logger.error(f"Error checking for duplicates: {e}")
+            return None
+
+    async def _query_duplicate(self, posting_url: str, job_id: Optional[int]) -> Optional[str]:
+        """Query the database for a posting and cache a "not saved" answer."""
+        creations = self.service.creations
+        response = await self.async_client.databases.query(
+            database_id=self.database_id,
+            filter=duplicate_filter(posting_url, job_id, self.service.available_job_id_property)
+        )
+        page_id = self.service.select_duplicate(response.get('results', []), job_id)
+        self.service.remember_not_found(posting_url, job_id, page_id, creations)
+        return page_id
+
+    async def check_duplicates(self, posting_urls: List[str]) -> Dict[str, Optional[str]]:
+        """Check many postings at once (see NotionService.check_duplicates).
+
+        Args:
+            posting_urls: LinkedIn job posting URLs
+
+        Returns:
+            Map of every posting URL to its existing page ID (None if not saved)
+        """
+        results, pending = await asyncio.to_thread(self.service.check_duplicates_locally, posting_urls)
+        for found in await asyncio.gather(*(
+            self._query_duplicates(filter_, postings)
+            for filter_, postings in batched_duplicate_filters(
+                pending, self.service.available_job_id_property
+            )
+        )):
+            results.update(found)
+        return results
+
+    async def _query_duplicates(self, filter_: Dict,
+                                postings: Dict[str, Optional[int]]) -> Dict[str, Optional[str]]:
+        """Run one combined duplicate query (following pagination) and match its results."""
+        pages = await async_collect_paginated_api(
+            self.async_client.databases.query,
+            database_id=self.database_id,
+            filter=filter_,
+            page_size=100
+        )
+        return self.service.match_duplicates(pages, postings)
+
+    async def find_or_create_company(self, company_name: str) -> Optional[str]:
+        """Find existing company or create new one in Companies database.
+
+        Concurrent lookups for the same uncached name await one shared
+        query/create.
+
+        Args:
+            company_name: Name of the company
+
+        Returns:
+            Company page ID if successful, None otherwise
+        """
+        if not self.companies_database_id:
+            logger.warning("Companies database ID not configured, skipping company lookup")
+            return None
+
+        company_id = self.company_cache.get(company_name)
+        if company_id:
+            return company_id
+
+        return await self._company_flight.do(
+            company_name,
+            lambda: self._find_or_create_company(company_name)
+        )
+
+    async def _find_or_create_company(self, company_name: str) -> Optional[str]:
+        """Query the Companies database and create the company if missing."""
+        try:
+            return await self._find_company(company_name) or await self._create_company(company_name)
+        except CircuitOpenError:
+            # Notion is down: saving without the company would hide that, so the caller gets the 503
+            raise
+        except APIResponseError as e:
+            logger.error(f"Error finding/creating company: {e}")
+            return None
+
+    async def _find_company(self, company_name: str) -> Optional[str]:
+        """Look up a company by name without creating it (cache, mirror, then Notion)."""
+        company_id = self.company_cache.get(company_name)
+        if company_id:
+            return company_id
+
+        if self.mirror:
+            answered, company_id = await asyncio.to_thread(self.service.find_company_in_mirror, company_name)
+            if answered:
+                return company_id
+
+        response = await self.async_client.databases.query(
+            database_id=self.companies_database_id,
+            filter=company_filter(company_name)
+        )
+
+        return self.service.remember_found_company(company_name, response)
+
+    async def _create_company(self, company_name: str) -> str:
+        """Create a company page (callers have checked it does not exist)."""
+        logger.info(f"Creating new company: {company_name}")
+
+        new_company = await self.async_client.pages.create(
+            **company_page_data(self.companies_database_id, company_name)
+        )
+
+        logger.info(f"Created new company: {company_name} (ID: {new_company['id']})")
+        return await asyncio.to_thread(self.service.remember_company, company_name, new_company)
+
+    async def _resolve_company(self, company_name: str,
+                               lookup: Optional["asyncio.Task"]) -> Optional[str]:
+        """Finish a company lookup started with _find_company, creating the company if missing."""
+        if lookup is None:
+            return await self.find_or_create_company(company_name)
+        try:
+            company_id = await lookup
+        except CircuitOpenError:
+            raise
+        except APIResponseError as e:
+            logger.error(f"Error finding company: {e}")
+            return await self.find_or_create_company(company_name)
+        if company_id:
+            return company_id
+
+        async def create():
+            try:
+                return self.company_cache.get(company_name) or await self._create_company(company_name)
+            except CircuitOpenError:
+                raise
+            except APIResponseError as e:
+                logger.error(f"Error creating company: {e}")
+                return None
+
+        return await self._company_flight.do(company_name, create)
+
+    async def _get_page_state(self, page_id: str) -> Dict:
+        """Return the cached state of a page, retrieving it from Notion on a miss."""
+        state = self.page_state_cache.get(page_id)
+        if state is None:
+            page = await self.async_client.pages.retrieve(page_id=page_id)
+            state = await asyncio.to_thread(self.service.remember_page, page)
+        return state
+
+    async def create_job_posting(self, position: str, company: str,
+                                 posting_url: str, origin: str = 'LinkedIn',
+                                 match: Optional[str] = None,
+                                 work_arrangement: Optional[str] = None,
+                                 demand: Optional[str] = None,
+                                 budget: Optional[float] = None,
+                                 job_description: Optional[str] = None,
+                                 city: Optional[str] = None,
+                                 country: Optional[str] = None) -> Dict:
+        """Create new job posting entry in Notion database.
+
+        Takes the same arguments as NotionService.create_job_posting.
+
+        Returns:
+            Created page object from Notion API
+        """
+        company_id = await self.find_or_create_company(company)
+
+        return await self._create_job_posting_page(
+            company_id, position, company, posting_url, match, work_arrangement,
+            demand, budget, job_description, city, country
+        )
+
+    async def create_job_posting_if_new(self, position: str, company: str,
+                                        posting_url: str, origin: str = 'LinkedIn',
+                                        match: Optional[str] = None,
+                                        work_arrangement: Optional[str] = None,
+                                        demand: Optional[str] = None,
+                                        budget: Optional[float] = None,
+                                        job_description: Optional[str] = None,
+                                        city: Optional[str] = None,
+                                        country: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """Check for a duplicate and create the job posting if there is none.
+
+        The company lookup runs as a task alongside the duplicate check and
+        is cancelled when a duplicate is found (or the request itself is
+        cancelled); see NotionService.create_job_posting_if_new.
+
+        Returns:
+            Tuple of (created_page, existing_page_id); exactly one is set
+        """
+        company_lookup = None
+        if self.companies_database_id and not self.company_cache.get(company):
+            company_lookup = asyncio.create_task(self._find_company(company))
+
+        try:
+            existing_page_id = await self.check_duplicate(posting_url, fresh=True)
+        except BaseException:
+            if company_lookup:
+                company_lookup.cancel()
+            raise
+        if existing_page_id:
+            if company_lookup:
+                company_lookup.cancel()
+            return None, existing_page_id
+
+        company_id = await self._resolve_company(company, company_lookup)
+
+        page = await self._create_job_posting_page(
+            company_id, position, company, posting_url, match, work_arrangement,
+            demand, budget, job_description, city, country
+        )
+        return page, None
+
+    async def _create_job_posting_page(self, company_id: Optional[str], position: str, company: str,
+                                       posting_url: str, match: Optional[str],
+                                       work_arrangement: Optional[str], demand: Optional[str],
+                                       budget: Optional[float], job_description: Optional[str],
+                                       city: Optional[str], country: Optional[str]) -> Dict:
+        """Create the job posting page once its company has been resolved."""
+        properties = self.service.posting_properties(company_id, position, posting_url, match,
+                                                     work_arrangement, demand, budget, city, country)
+
+        logger.info(f"Creating Notion page for: {position} at {company}")
+
+        batches = description_batches(job_description)
+        try:
+            response = await self.async_client.pages.create(
+                **job_posting_page_data(self.database_id, properties, batches[0] if batches else None)
+            )
+            complete = await self._append_description_overflow(response['id'], batches[1:])
+            # Mirror and search index writes are SQLite calls
+            await asyncio.to_thread(self.service.record_created, response, position, company, posting_url,
+                                    match, work_arrangement, country, budget, job_description, complete)
+            return response
+        except APIResponseError as e:
+            logger.error(f"Error creating Notion page: {e}")
+            raise
+
+    async def list_child_blocks(self, block_id: str) -> List[Dict]:
+        """Return every child block of a block or page, following pagination."""
+        return await async_collect_paginated_api(
+            self.async_client.blocks.children.list,
+            block_id=block_id,
+            page_size=100
+        )
+
+    async def _append_blocks(self, parent_id: str, batches: List[List[Dict]]) -> List[str]:
+        """Append batches of blocks in order, one call per batch; returns the new block IDs."""
+        block_ids = []
+        for batch in batches:
+            response = await self.async_client.blocks.children.append(block_id=parent_id, children=batch)
+            block_ids.extend(block['id'] for block in response.get('results', []))
+        return block_ids
+
+    async def _append_description_overflow(self, page_id: str, batches: List[List[Dict]]) -> bool:
+        """Append the description blocks that did not fit in pages.create (see NotionService)."""
+        if not batches:
+            return True
+        try:
+            await self._append_blocks(page_id, batches)
+            return True
+        except APIResponseError as e:
+            logger.error(f"Page {page_id} created but appending its description failed: {e}")
+            return False
+
+    async def replace_blocks(self, parent_id: str, blocks: List[Dict]) -> Dict:
+        """Make blocks the children of a page or block (see NotionService.replace_blocks).
+
+        Updates and deletes run concurrently, at most max_concurrency at a
+        time; Notion errors are reported rather than raised.
+
+        Returns:
+            Report of the replacement, as for NotionService.replace_blocks
+        """
+        updates, deletes, appends = diff_blocks(await self.list_child_blocks(parent_id), blocks)
+        report = new_block_report()
+        if not (updates or deletes or appends):
+            return report
+
+        async def update(block_id, arguments):
+            async with self._block_semaphore:
+                try:
+                    await self.async_client.blocks.update(block_id=block_id, **arguments)
+                    return block_id, None
+                except APIResponseError as e:
+                    return block_id, str(e)
+
+        async def delete(block_id):
+            async with self._block_semaphore:
+                try:
+                    await self.async_client.blocks.delete(block_id=block_id)
+                    return block_id, None
+                except APIResponseError as e:
+                    return block_id, delete_error(e)
+
+        record_block_outcomes(report, 'update', await asyncio.gather(
+            *(update(block_id, arguments) for block_id, arguments in updates)
+        ))
+        record_block_outcomes(report, 'delete', await asyncio.gather(*(delete(block_id) for block_id in deletes)))
+        for batch in batch_blocks(appends):
+            try:
+                response = await self.async_client.blocks.children.append(block_id=parent_id, children=batch)
+            except APIResponseError as e:
+                report["failed"].append({"block_id": parent_id, "operation": "append", "error": str(e)})
+                break
+            report["appended"].extend(block['id'] for block in response.get('results', []))
+
+        log_block_failures(report)
+        return report
+
+    async def _write_description(self, page_id: str, job_description: str) -> Dict:
+        """Make the page content the job description (see NotionService._write_description).
+
+        Returns:
+            Report of the block replacement
+        """
+        report = await self.replace_blocks(page_id, description_blocks(plan_description(job_description)))
+        logger.info(f"Job description written: {block_report_summary(report)}")
+        return report
+
+    async def update_job_posting(self, page_id: str, position: str, company: str,
+                                 posting_url: str, origin: str = 'LinkedIn',
+                                 match: Optional[str] = None,
+                                 work_arrangement: Optional[str] = None,
+                                 demand: Optional[str] = None,
+                                 budget: Optional[float] = None,
+                                 job_description: Optional[str] = None,
+                                 city: Optional[str] = None,
+                                 country: Optional[str] = None) -> Dict:
+        """Update existing job posting entry in Notion database.
+
+        Takes the same arguments as NotionService.update_job_posting and
+        likewise only sends changed properties and rewrites the description
+        when its hash changed.
+
+        Returns:
+            Updated page object from Notion API (id and url at least), with
+            "description_report" as for NotionService.update_job_posting
+        """
+        company_id = await self.find_or_create_company(company)
+
+        properties = self.service.posting_properties(company_id, position, posting_url, match,
+                                                     work_arrangement, demand, budget, city, country)
+
+        logger.info(f"Updating Notion page: {page_id}")
+
+        try:
+            state = await self._get_page_state(page_id)
+            changed = changed_properties(properties, state)
+
+            if changed:
+                logger.info(f"Updating properties: {', '.join(changed)}")
+                response = await self.async_client.pages.update(
+                    page_id=page_id,
+                    properties=changed
+                )
+                state = await asyncio.to_thread(self.service.remember_page, response)
+            else:
+                logger.info("Properties unchanged, skipping page update")
+                response = {"id": state['id'], "url": state['url']}
+
+            report = None
+            if job_description:
+                new_hash = description_hash(job_description)
+                if new_hash == state.get('description_hash'):
+                    logger.info("Job description unchanged, skipping block rewrite")
+                else:
+                    report = await self._write_description(page_id, job_description)
+                    # A partly written description is rewritten by the next update
+                    state['description_hash'] = None if report['failed'] else new_hash
+
+            if self.search_index:
+                await asyncio.to_thread(self.service.record_updated, response, position, company,
+                                        posting_url, match, work_arrangement, country, budget,
+                                        job_description)
+            else:
+                self.service.record_updated(response, position, company, posting_url, match,
+                                            work_arrangement, country, budget, job_description)
+
+            return {**response, "description_report": report}
+        except APIResponseError as e:
+            logger.error(f"Error updating Notion page: {e}")
+            raise
@@ -0,0 +1,103 @@
+"""Periodically refreshed, cached result of a slow check."""
+from typing import Callable, Dict, Optional
+import logging
+import threading
+import time
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundCheck:
+    """Caches the result of a (is_valid, error_message) check function.
+
+    A daemon thread re-runs the check every interval seconds so readers get
+    the last result instantly instead of waiting on Notion. Results older
+    than max_age are reported as stale.
+    """
+
+    def __init__(self, check: Callable[[], tuple[bool, Optional[str]]],
+                 interval: float = 60, max_age: float = 300):
+        """Initialize without a result.
+
+        Args:
+            check: Function returning (is_valid, error_message)
+            interval: Seconds between background refreshes
+            max_age: Seconds after which a result is considered stale
+        """
+        self._check = check
+        self.interval = interval
+        self.max_age = max_age
+        self._flight = SingleFlight()
+        self._result: Optional[tuple[bool, Optional[str]]] = None
+        self._checked_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> tuple[bool, Optional[str]]:
+        """Run the check now (concurrent callers share one run) and cache the result."""
+        return self._flight.do('check', self._run_check)
+
+    def _run_check(self) -> tuple[bool, Optional[str]]:
+        try:
+            result = self._check()
+        except Exception as e:
+            logger.error(f"Background check failed: {e}")
+            result = (False, str(e))
+        self._result = result
+        self._checked_at = time.monotonic()
+        return result
+
+    def restore(self, result: tuple[bool, Optional[str]], age: float) -> None:
+        """Seed the cached result (e.g. from a snapshot) until the next run replaces it.
+
+        Args:
+            result: (is_valid, error_message) of an earlier run
+            age: Seconds since that run, so staleness is reported correctly
+        """
+        if self._result is None:
+            self._result = result
+            self._checked_at = time.monotonic() - age
+
+    def result(self, wait: bool = False) -> Dict:
+        """Return the cached result.
+
+        Args:
+            wait: Run the check synchronously if there is no result yet
+
+        Returns:
+            {"valid": bool | None, "error": str | None,
+             "age_seconds": float | None, "stale": bool}
+        """
+        if self._result is None and wait:
+            self.refresh()
+
+        checked_at = self._checked_at
+        if self._result is None or checked_at is None:
+            return {"valid": None, "error": "Check has not completed yet", "age_seconds": None, "stale": True}
+
+        is_valid, error = self._result
+        age = time.monotonic() - checked_at
+        return {
+            "valid": is_valid,
+            "error": error,
+            "age_seconds": round(age, 3),
+            "stale": age > self.max_age
+        }
+
+    def start(self) -> None:
+        """Run the check now and keep refreshing it in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="background-check", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
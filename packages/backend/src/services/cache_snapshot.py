@@ -0,0 +1,142 @@
+"""On-disk snapshots of the in-memory caches, used to warm up after a restart."""
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+
+def notion_timestamp(epoch: float) -> str:
+    """Format a Unix time as a Notion filter timestamp, rounded down to the minute.
+
+    Notion stores last_edited_time with minute precision, so a delta query
+    from this timestamp re-reads the boundary minute instead of missing it.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:00.000Z', time.gmtime(epoch))
+
+
+class CacheSnapshot:
+    """SQLite file holding the posting index, company cache and schema check.
+
+    Each save replaces the previous snapshot in one transaction, so readers
+    (including other worker processes) see either the old or the new one.
+    A snapshot records the databases it was taken from and the wall-clock
+    time the state was captured; callers reconcile pages edited since then.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the snapshot file.
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (job_id INTEGER PRIMARY KEY, page_id TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS companies ("
+            "position INTEGER PRIMARY KEY, name TEXT NOT NULL, page_id TEXT NOT NULL)"
+        )
+        self.last_saved_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+
+    def save(self, databases: Dict[str, Optional[str]], taken_at: float,
+             postings: Optional[Dict[int, str]], companies: List[Tuple[str, str]],
+             schema: Optional[Dict]) -> None:
+        """Replace the snapshot.
+
+        Args:
+            databases: IDs of the databases the state belongs to
+            taken_at: Unix time the state was captured
+            postings: Job ID -> page ID entries of a ready posting index, or
+                None to keep the postings of the previous snapshot (and its
+                capture time for them)
+            companies: (name, page_id) in least to most recently used order
+            schema: Last database validation (valid, error, job_id_property_available)
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                meta = {
+                    "version": str(SNAPSHOT_VERSION),
+                    "databases": json.dumps(databases, sort_keys=True),
+                    "companies_taken_at": repr(taken_at),
+                    "schema": json.dumps(schema)
+                }
+                if postings is not None:
+                    self._conn.execute("DELETE FROM postings")
+                    self._conn.executemany(
+                        "INSERT INTO postings (job_id, page_id) VALUES (?, ?)", postings.items()
+                    )
+                    meta["postings_taken_at"] = repr(taken_at)
+                self._conn.execute("DELETE FROM companies")
+                self._conn.executemany(
+                    "INSERT INTO companies (position, name, page_id) VALUES (?, ?, ?)",
+                    ((position, name, page_id) for position, (name, page_id) in enumerate(companies))
+                )
+                self._conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    meta.items()
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.last_saved_at = time.time()
+        self.last_duration = time.monotonic() - started
+
+    def load(self, databases: Dict[str, Optional[str]]) -> Optional[Dict]:
+        """Read the snapshot if it was taken from the same databases.
+
+        Returns:
+            {"postings": {job_id: page_id} or None, "postings_taken_at": float or None,
+             "companies": [(name, page_id), ...], "companies_taken_at": float,
+             "schema": dict or None}, or None if there is no usable snapshot
+        """
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            if meta.get('version') != str(SNAPSHOT_VERSION):
+                return None
+            if json.loads(meta.get('databases', 'null')) != databases:
+                logger.info("Ignoring cache snapshot taken from different databases")
+                return None
+            postings_taken_at = meta.get('postings_taken_at')
+            postings = None
+            if postings_taken_at is not None:
+                postings = dict(self._conn.execute("SELECT job_id, page_id FROM postings").fetchall())
+            companies = self._conn.execute(
+                "SELECT name, page_id FROM companies ORDER BY position"
+            ).fetchall()
+        return {
+            "postings": postings,
+            "postings_taken_at": float(postings_taken_at) if postings_taken_at else None,
+            "companies": [tuple(row) for row in companies],
+            "companies_taken_at": float(meta['companies_taken_at']),
+            "schema": json.loads(meta['schema'])
+        }
+
+    def stats(self) -> Dict:
+        """Return when the snapshot was last written by this process and how long it took."""
+        return {
+            "path": self.path,
+            "last_saved_seconds_ago": (
+                None if self.last_saved_at is None else round(time.time() - self.last_saved_at, 3)
+            ),
+            "last_duration_seconds": (
+                None if self.last_duration is None else round(self.last_duration, 3)
+            )
+        }
@@ -0,0 +1,195 @@
+"""Circuit breaker that fails Notion calls fast while Notion is unavailable."""
+from collections import deque
+from notion_client.errors import APIResponseError, HTTPResponseError, RequestTimeoutError
+from typing import Deque, Dict, Optional, Tuple
+import logging
+import math
+import threading
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# APIResponseError code of calls rejected by an open breaker
+CIRCUIT_OPEN = 'circuit_open'
+
+
+class CircuitOpenError(APIResponseError):
+    """Raised instead of calling Notion while the circuit is open.
+
+    It is an APIResponseError (status 503, code 'circuit_open', with a
+    Retry-After header) so callers' existing Notion error handling applies.
+    """
+
+    def __init__(self, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        response = httpx.Response(503, headers={'Retry-After': str(self.retry_after)})
+        super().__init__(
+            response,
+            f"Notion is unavailable (circuit open), retry in {self.retry_after}s",
+            CIRCUIT_OPEN  # type: ignore[arg-type]
+        )
+
+
+def is_outage(error: Optional[BaseException]) -> Optional[bool]:
+    """Classify the outcome of a Notion call for the breaker.
+
+    Returns:
+        True for timeouts, connection errors and 5xx responses, False when
+        Notion answered (including 4xx and 429), None when the call did not
+        finish for another reason (e.g. it was cancelled)
+    """
+    if error is None:
+        return False
+    if isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, HTTPResponseError):
+        return error.status >= 500
+    return None
+
+
+class CircuitBreaker:
+    """Tracks the failure rate of Notion calls and stops them during outages.
+
+    Closed: calls go through and their outcomes are kept for window seconds.
+    Once at least minimum_calls finished in the window and failure_rate of
+    them failed, the breaker opens. Open: calls are rejected with
+    CircuitOpenError for open_seconds. Half-open: up to half_open_calls
+    trial calls go through (others are still rejected); if they all succeed
+    the breaker closes, and the first failure opens it again.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, minimum_calls: int = 10,
+                 window: float = 30.0, open_seconds: float = 30.0, half_open_calls: int = 1):
+        """Initialize a closed breaker.
+
+        Args:
+            failure_rate: Share of failed calls in the window that opens the breaker
+            minimum_calls: Calls needed in the window before it can open
+            window: Seconds of call outcomes considered
+            open_seconds: Seconds calls are rejected before trial calls are let through
+            half_open_calls: Successful trial calls needed to close again
+        """
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self.state = CLOSED
+        self._open_until = 0.0
+        self._opened_at: Optional[float] = None
+        self._trials = 0
+        self._trial_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def admit(self) -> bool:
+        """Let a call through or reject it.
+
+        Returns:
+            True if the call is a half-open trial (report it as such to record())
+
+        Raises:
+            CircuitOpenError: While the breaker is open, or half-open with all
+                trial calls in flight
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    self.rejected += 1
+                    raise CircuitOpenError(self._open_until - now)
+                self.state = HALF_OPEN
+                self._trials = 0
+                self._trial_successes = 0
+                logger.info("Notion circuit half-open, sending trial calls")
+            if self._trials >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(1)
+            self._trials += 1
+            return True
+
+    def record(self, trial: bool, failed: Optional[bool]) -> None:
+        """Record the outcome of an admitted call.
+
+        Args:
+            trial: Return value of admit() for the call
+            failed: is_outage() of the call's error
+        """
+        with self._lock:
+            now = time.monotonic()
+            if trial:
+                if self.state != HALF_OPEN:
+                    return
+                self._trials -= 1
+                if failed:
+                    self._open(now, "trial call failed")
+                elif failed is False:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self.state = CLOSED
+                        self._outcomes.clear()
+                        self._failures = 0
+                        logger.info("Notion circuit closed, Notion calls resumed")
+                return
+
+            # Calls admitted before the breaker opened do not count afterwards
+            if failed is None or self.state != CLOSED:
+                return
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            self._prune(now)
+            calls = len(self._outcomes)
+            if calls >= self.minimum_calls and self._failures / calls >= self.failure_rate:
+                self._open(now, f"{self._failures}/{calls} calls failed in the last {self.window:.0f}s")
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self._open_until = now + self.open_seconds
+        self._opened_at = time.time()
+        self.times_opened += 1
+        logger.warning(f"Notion circuit opened ({reason}), failing fast for {self.open_seconds:.0f}s")
+
+    def is_open(self) -> bool:
+        """Return True while calls are being rejected without a trial."""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() < self._open_until
+
+    def stats(self) -> Dict:
+        """Return the state, recent failure rate and rejection counters."""
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._outcomes)
+            retry_after = None
+            if self.state == OPEN:
+                retry_after = max(0.0, round(self._open_until - time.monotonic(), 3))
+            return {
+                "state": self.state,
+                "calls_in_window": calls,
+                "failures_in_window": self._failures,
+                "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "retry_after_seconds": retry_after,
+                "opened_seconds_ago": (
+                    None if self._opened_at is None or self.state == CLOSED
+                    else round(time.time() - self._opened_at, 3)
+                ),
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected
+            }
@@ -0,0 +1,63 @@
+"""LRU cache of company name to Notion page ID."""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import threading
+
+
+class CompanyCache:
+    """Bounded, thread-safe map of company names to Companies database page IDs.
+
+    Least recently used entries are evicted once the cache holds max_size
+    companies. Only positive results are cached: a miss always means "ask
+    Notion", never "the company does not exist".
+    """
+
+    def __init__(self, max_size: int = 1000):
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of companies kept in memory
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, company_name: str) -> Optional[str]:
+        """Return the cached page ID for a company, or None on a miss."""
+        with self._lock:
+            company_id = self._entries.get(company_name)
+            if company_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(company_name)
+            self.hits += 1
+            return company_id
+
+    def put(self, company_name: str, company_id: str) -> None:
+        """Store a company page ID, evicting the least recently used entry if full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[company_name] = company_id
+            self._entries.move_to_end(company_name)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def items(self) -> List[Tuple[str, str]]:
+        """Return (company_name, page_id) pairs from least to most recently used."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Return size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,199 @@
+"""Layout of job descriptions as Notion blocks within the API's size limits."""
+from notion_client.errors import APIResponseError
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import re
+
+# Notion request limits
+MAX_TEXT_LENGTH = 2000            # characters (UTF-16 code units) per rich_text item
+MAX_RICH_TEXT_ITEMS = 100         # rich_text items per block
+MAX_BLOCKS_PER_REQUEST = 100      # children per pages.create / blocks.children.append
+MAX_REQUEST_BYTES = 450_000       # body size per request (Notion allows 500KB)
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_ICON_URL = "https://www.notion.so/icons/description_gray.svg"
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n\s*')
+
+
+def _utf16_length(char: str) -> int:
+    return 2 if ord(char) > 0xFFFF else 1
+
+
+def split_text(text: str, limit: int = MAX_TEXT_LENGTH) -> List[str]:
+    """Split text into pieces of at most limit UTF-16 code units.
+
+    Notion counts string length like JavaScript, so characters outside the
+    Basic Multilingual Plane (e.g. emoji) count twice and are never split.
+    """
+    if len(text) * 2 <= limit:
+        return [text] if text else []
+    pieces = []
+    start = 0
+    length = 0
+    for index, char in enumerate(text):
+        size = _utf16_length(char)
+        if length + size > limit:
+            pieces.append(text[start:index])
+            start, length = index, 0
+        length += size
+    pieces.append(text[start:])
+    return pieces
+
+
+def plan_description(job_description: str) -> List[str]:
+    """Return the text of each block a description is written as.
+
+    Paragraphs (separated by blank lines) get a block each. When there are
+    more paragraphs than fit in one request, neighbouring paragraphs share
+    a block (still separated by a blank line) so the description is written
+    with a single call. A block never holds more than
+    MAX_RICH_TEXT_ITEMS * MAX_TEXT_LENGTH characters.
+    """
+    paragraphs = [p.strip() for p in _PARAGRAPH_BREAK.split(job_description.strip()) if p.strip()]
+    if len(paragraphs) > MAX_BLOCKS_PER_REQUEST:
+        # Group by cumulative length so each of at most 100 blocks holds a similar share
+        total = sum(len(p) for p in paragraphs)
+        groups: List[List[str]] = []
+        group_index = -1
+        position = 0
+        for paragraph in paragraphs:
+            index = position * MAX_BLOCKS_PER_REQUEST // total
+            if index != group_index:
+                groups.append([])
+                group_index = index
+            groups[-1].append(paragraph)
+            position += len(paragraph)
+        paragraphs = ['\n\n'.join(group) for group in groups]
+
+    block_capacity = MAX_RICH_TEXT_ITEMS * MAX_TEXT_LENGTH
+    texts = []
+    for paragraph in paragraphs:
+        pieces = split_text(paragraph, block_capacity)
+        texts.extend(pieces)
+    return texts
+
+
+def rich_text(text: str) -> List[Dict]:
+    """Build the rich_text items holding text."""
+    return [{"type": "text", "text": {"content": piece}} for piece in split_text(text)]
+
+
+def description_blocks(texts: List[str]) -> List[Dict]:
+    """Build the blocks for planned description texts.
+
+    The first block is the description callout; the rest are paragraphs.
+    """
+    blocks = []
+    for index, text in enumerate(texts):
+        if index == 0:
+            blocks.append({
+                "object": "block",
+                "type": "callout",
+                "callout": {
+                    "rich_text": rich_text(text),
+                    "icon": {
+                        "type": "external",
+                        "external": {
+                            "url": DESCRIPTION_ICON_URL
+                        }
+                    },
+                    "color": "default"
+                }
+            })
+        else:
+            blocks.append({
+                "object": "block",
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": rich_text(text)
+                }
+            })
+    return blocks
+
+
+def block_text(block: Dict) -> str:
+    """Return the plain text of a callout or paragraph block."""
+    content = block.get(block.get('type'), {}) or {}
+    return ''.join(
+        item.get('plain_text') or item.get('text', {}).get('content', '')
+        for item in content.get('rich_text', [])
+    )
+
+
+def diff_blocks(existing: List[Dict], blocks: List[Dict]) -> Tuple[List[Tuple[str, Dict]], List[str], List[Dict]]:
+    """Plan the calls that turn a page's current children into blocks.
+
+    Children are compared position by position. While the block types line
+    up, a child whose text differs is updated in place and an unchanged one
+    is left alone. From the first position where they do not (e.g. a block
+    added in Notion, or a child with children of its own) the remaining
+    children are deleted and the remaining blocks appended, since Notion
+    appends at the end of the page.
+
+    Returns:
+        (updates, deletes, appends): (block_id, blocks.update arguments) for
+        each changed block, IDs of the children to delete, and the blocks
+        to append in order
+    """
+    kept = 0
+    for current, block in zip(existing, blocks):
+        if current.get('type') != block['type'] or current.get('has_children'):
+            break
+        kept += 1
+
+    updates = []
+    for current, block in zip(existing[:kept], blocks[:kept]):
+        if block_text(current) != block_text(block):
+            block_type = block['type']
+            updates.append((current['id'], {block_type: {"rich_text": block[block_type]['rich_text']}}))
+    return updates, [current['id'] for current in existing[kept:]], blocks[kept:]
+
+
+def new_block_report() -> Dict:
+    """Return an empty report of a block replacement (see NotionService.replace_blocks)."""
+    return {"updated": [], "deleted": [], "appended": [], "failed": []}
+
+
+def record_block_outcomes(report: Dict, operation: str,
+                          outcomes: Iterable[Tuple[str, Optional[str]]]) -> None:
+    """Add the (block_id, error) outcomes of 'update' or 'delete' calls to a replacement report."""
+    done = report["updated" if operation == 'update' else "deleted"]
+    for block_id, error in outcomes:
+        if error is None:
+            done.append(block_id)
+        else:
+            report["failed"].append({"block_id": block_id, "operation": operation, "error": error})
+
+
+def delete_error(e: APIResponseError) -> Optional[str]:
+    """Return the error of a failed block delete, None if the block was already gone."""
+    return None if e.code == 'object_not_found' else str(e)
+
+
+def block_report_summary(report: Dict) -> str:
+    """Summarize a replacement report in one line for the logs."""
+    return (f"{len(report['updated'])} block(s) updated, {len(report['deleted'])} deleted, "
+            f"{len(report['appended'])} appended, {len(report['failed'])} failed")
+
+
+def log_block_failures(report: Dict) -> None:
+    """Log a warning for every failed call of a replacement report."""
+    for failure in report["failed"]:
+        logger.warning(f"Could not {failure['operation']} block {failure['block_id']}: {failure['error']}")
+
+
+def batch_blocks(blocks: List[Dict]) -> List[List[Dict]]:
+    """Split blocks into request-sized batches (block count and body size)."""
+    batches: List[List[Dict]] = []
+    size = 0
+    for block in blocks:
+        block_size = len(json.dumps(block))
+        if not batches or len(batches[-1]) >= MAX_BLOCKS_PER_REQUEST or size + block_size > MAX_REQUEST_BYTES:
+            batches.append([])
+            size = 0
+        batches[-1].append(block)
+        size += block_size
+    return batches
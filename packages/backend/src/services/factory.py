@@ -0,0 +1,136 @@
+"""Build Notion services from application configuration."""
+from typing import Dict, Optional
+
+from ..config.settings import Config
+from .async_notion_service import AsyncNotionService
+from .circuit_breaker import CircuitBreaker
+from .http_transport import build_async_http_client, build_http_client, build_timeout
+from .idempotency import AsyncIdempotencyStore, AsyncSharedIdempotencyStore, IdempotencyStore, SharedIdempotencyStore
+from .notion_service import NotionService
+from .rate_limiter import SharedTokenBucket, TokenBucket
+
+
+def build_rate_limiter() -> TokenBucket:
+    """Create the token bucket throttling Notion calls.
+
+    Uses a SQLite-backed bucket shared between processes when
+    NOTION_RATE_LIMIT_STATE_PATH is set, otherwise an in-process bucket.
+    """
+    if Config.NOTION_RATE_LIMIT_STATE_PATH:
+        return SharedTokenBucket(
+            path=Config.NOTION_RATE_LIMIT_STATE_PATH,
+            rate=Config.NOTION_RATE_LIMIT_PER_SECOND,
+            capacity=Config.NOTION_RATE_LIMIT_BURST
+        )
+    return TokenBucket(
+        rate=Config.NOTION_RATE_LIMIT_PER_SECOND,
+        capacity=Config.NOTION_RATE_LIMIT_BURST
+    )
+
+
+def build_idempotency_store(asynchronous: bool = False) -> Optional[IdempotencyStore]:
+    """Create the store of Idempotency-Key responses, or None if idempotency keys are disabled.
+
+    Uses a SQLite-backed store shared between processes when
+    IDEMPOTENCY_STATE_PATH is set, otherwise an in-process store.
+
+    Args:
+        asynchronous: Build the variant awaited by the ASGI app
+    """
+    if not Config.IDEMPOTENCY_ENABLED:
+        return None
+    options = dict(
+        max_size=Config.IDEMPOTENCY_CACHE_SIZE,
+        ttl=Config.IDEMPOTENCY_TTL_SECONDS,
+        wait_timeout=Config.IDEMPOTENCY_WAIT_SECONDS
+    )
+    if Config.IDEMPOTENCY_STATE_PATH:
+        store_class = AsyncSharedIdempotencyStore if asynchronous else SharedIdempotencyStore
+        return store_class(path=Config.IDEMPOTENCY_STATE_PATH, **options)
+    return (AsyncIdempotencyStore if asynchronous else IdempotencyStore)(**options)
+
+
+def build_circuit_breaker() -> Optional[CircuitBreaker]:
+    """Create the circuit breaker for Notion calls, or None if it is disabled."""
+    if not Config.CIRCUIT_BREAKER_ENABLED:
+        return None
+    return CircuitBreaker(
+        failure_rate=Config.CIRCUIT_BREAKER_FAILURE_RATE,
+        minimum_calls=Config.CIRCUIT_BREAKER_MIN_CALLS,
+        window=Config.CIRCUIT_BREAKER_WINDOW_SECONDS,
+        open_seconds=Config.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_calls=Config.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+    )
+
+
+def _http_options() -> Dict:
+    return {
+        "max_connections": Config.NOTION_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": Config.NOTION_HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry": Config.NOTION_HTTP_KEEPALIVE_EXPIRY,
+        "connect_timeout": Config.NOTION_HTTP_CONNECT_TIMEOUT,
+        "read_timeout": Config.NOTION_HTTP_READ_TIMEOUT,
+        "http2": Config.NOTION_HTTP2
+    }
+
+
+def _service_options() -> Dict:
+    """Return the NotionService constructor arguments taken from Config."""
+    return {
+        "api_key": str(Config.NOTION_API_KEY),
+        "database_id": str(Config.NOTION_DATABASE_JOB_APPLICATIONS_ID),
+        "companies_database_id": Config.NOTION_DATABASE_COMPANIES_ID,
+        "use_posting_index": Config.POSTING_INDEX_ENABLED,
+        "index_refresh_interval": Config.POSTING_INDEX_REFRESH_SECONDS,
+        "index_max_staleness": Config.POSTING_INDEX_MAX_STALENESS_SECONDS,
+        "company_cache_size": Config.COMPANY_CACHE_SIZE,
+        "rate_limiter": build_rate_limiter(),
+        "max_retries": Config.NOTION_MAX_RETRIES,
+        "job_id_property": Config.NOTION_JOB_ID_PROPERTY,
+        "page_cache_size": Config.PAGE_CACHE_SIZE,
+        "page_cache_ttl": Config.PAGE_CACHE_TTL_SECONDS,
+        "max_concurrency": Config.NOTION_MAX_CONCURRENCY,
+        "schema_check_interval": Config.HEALTH_CHECK_INTERVAL_SECONDS,
+        "schema_check_max_age": Config.HEALTH_CHECK_MAX_AGE_SECONDS,
+        "http_client": build_http_client(**_http_options()),
+        "timeout": build_timeout(Config.NOTION_HTTP_CONNECT_TIMEOUT, Config.NOTION_HTTP_READ_TIMEOUT),
+        "base_url": Config.NOTION_BASE_URL,
+        "mirror_path": Config.MIRROR_PATH if Config.MIRROR_ENABLED else None,
+        "mirror_sync_interval": Config.MIRROR_SYNC_INTERVAL_SECONDS,
+        "mirror_max_lag": Config.MIRROR_MAX_LAG_SECONDS,
+        "mirror_full_sync_interval": Config.MIRROR_FULL_SYNC_INTERVAL_SECONDS,
+        "search_index_path": Config.SEARCH_INDEX_PATH if Config.SEARCH_INDEX_ENABLED else None,
+        "not_found_cache_size": Config.CHECK_NOT_FOUND_CACHE_SIZE,
+        "not_found_cache_ttl": Config.CHECK_NOT_FOUND_CACHE_TTL_SECONDS,
+        "snapshot_path": Config.CACHE_SNAPSHOT_PATH if Config.CACHE_SNAPSHOT_ENABLED else None,
+        "snapshot_interval": Config.CACHE_SNAPSHOT_INTERVAL_SECONDS,
+        "snapshot_max_age": Config.CACHE_SNAPSHOT_MAX_AGE_SECONDS,
+        "circuit_breaker": build_circuit_breaker()
+    }
+
+
+def build_notion_service() -> NotionService:
+    """Create the NotionService used by the Flask app.
+
+    Returns:
+        Configured NotionService
+    """
+    return NotionService(**_service_options())
+
+
+def build_async_notion_service() -> AsyncNotionService:
+    """Create the AsyncNotionService used by the ASGI app.
+
+    It wraps a NotionService configured like the Flask app's, which runs the
+    background workers.
+
+    Returns:
+        Configured AsyncNotionService
+    """
+    options = _service_options()
+    return AsyncNotionService(
+        NotionService(**options),
+        async_http_client=build_async_http_client(**_http_options()),
+        timeout=options['timeout'],
+        max_concurrency=options['max_concurrency']
+    )
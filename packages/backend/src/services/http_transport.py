@@ -0,0 +1,114 @@
+"""Tuned, shared HTTP transport for Notion API calls."""
+from typing import Dict, Optional, Union
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """Return True if the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client(max_connections: int = 20,
+                      max_keepalive_connections: int = 10,
+                      keepalive_expiry: float = 60.0,
+                      connect_timeout: float = 5.0,
+                      read_timeout: float = 30.0,
+                      http2: bool = False) -> httpx.Client:
+    """Create a pooled keep-alive httpx client to share between Notion calls.
+
+    One client per process is shared by every request thread, so warm
+    connections (and their TLS sessions) are reused instead of paying a new
+    handshake on cold calls.
+
+    Args:
+        max_connections: Maximum open connections (size it for request threads
+            plus background workers)
+        max_keepalive_connections: Idle connections kept open for reuse
+        keepalive_expiry: Seconds an idle connection is kept open
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds to wait for response data
+        http2: Use HTTP/2 when the h2 package is installed
+
+    Returns:
+        Configured httpx.Client
+    """
+    return httpx.Client(**_client_options(
+        max_connections, max_keepalive_connections, keepalive_expiry,
+        connect_timeout, read_timeout, http2
+    ))
+
+
+def build_async_http_client(max_connections: int = 100,
+                            max_keepalive_connections: int = 20,
+                            keepalive_expiry: float = 60.0,
+                            connect_timeout: float = 5.0,
+                            read_timeout: float = 30.0,
+                            http2: bool = False) -> httpx.AsyncClient:
+    """Create a pooled keep-alive httpx.AsyncClient for the async service.
+
+    Takes the same arguments as build_http_client. The pool is shared by
+    every coroutine in the event loop, so max_connections (not a thread
+    count) bounds how many Notion calls are on the wire at once.
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    return httpx.AsyncClient(**_client_options(
+        max_connections, max_keepalive_connections, keepalive_expiry,
+        connect_timeout, read_timeout, http2
+    ))
+
+
+def _client_options(max_connections: int, max_keepalive_connections: int,
+                    keepalive_expiry: float, connect_timeout: float,
+                    read_timeout: float, http2: bool) -> Dict:
+    """Build the httpx client arguments shared by the sync and async clients."""
+    if http2 and not http2_available():
+        logger.warning("NOTION_HTTP2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        ),
+        "timeout": build_timeout(connect_timeout, read_timeout),
+        "http2": http2
+    }
+
+
+def build_timeout(connect_timeout: float, read_timeout: float) -> httpx.Timeout:
+    """Build the timeout used for Notion calls (write/pool share the read timeout)."""
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def pool_stats(client: Union[httpx.Client, httpx.AsyncClient]) -> Optional[Dict]:
+    """Return connection pool statistics for an httpx client.
+
+    Relies on httpcore's connection pool, so it returns None for transports
+    without one (e.g. mock transports in tests).
+    """
+    pool = getattr(getattr(client, '_transport', None), '_pool', None)
+    if pool is None or not hasattr(pool, 'connections'):
+        return None
+
+    connections = list(pool.connections)
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+        "http2": sum(1 for connection in connections if 'HTTP/2' in connection.info()),
+        "waiting_requests": len(getattr(pool, '_requests', [])),
+        "max_connections": getattr(pool, '_max_connections', None),
+        "max_keepalive_connections": getattr(pool, '_max_keepalive_connections', None)
+    }
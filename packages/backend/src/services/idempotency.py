@@ -0,0 +1,344 @@
+"""Stored responses for requests sent with an Idempotency-Key header."""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Longest Idempotency-Key value accepted
+MAX_KEY_LENGTH = 255
+
+# Outcomes of IdempotencyStore.begin
+STARTED = 'started'          # caller runs the request and reports it with complete() or abandon()
+REPLAY = 'replay'            # a stored response is returned
+MISMATCH = 'mismatch'        # the key was used for a different request
+IN_PROGRESS = 'in_progress'  # the first request did not finish within the wait timeout
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """Identify a request so a reused key with a different payload is detected."""
+    digest = hashlib.sha256()
+    digest.update(f"{method} {path}\n".encode('utf-8'))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def is_replayable(status: int) -> bool:
+    """Return whether a response is final for its key.
+
+    Server errors and 429s are not stored, so retrying with the same key
+    runs the request again.
+    """
+    return status < 500 and status != 429
+
+
+class _Entry:
+    """A request for a key: in progress until response is set."""
+
+    def __init__(self, fingerprint: str, done: Any):
+        self.fingerprint = fingerprint
+        self.done = done
+        self.response: Optional[Tuple[int, bytes, Dict[str, str]]] = None
+        self.expires = float('inf')
+
+
+class IdempotencyStore:
+    """Bounded, TTL-evicted map of idempotency keys to their responses.
+
+    The first request for a key runs and its response is stored for ttl
+    seconds. Repeats of that request get the stored response without running
+    again; repeats arriving while it is still running wait for it. Only
+    completed entries count towards max_size and are evicted (least recently
+    used first), so an in-progress request always keeps its key.
+    """
+
+    # complete() and abandon() write the store file, so async callers run them in a thread
+    blocking = False
+
+    def __init__(self, max_size: int = 1000, ttl: float = 86400, wait_timeout: float = 60):
+        """Initialize an empty store.
+
+        Args:
+            max_size: Maximum number of completed responses kept in memory
+            ttl: Seconds a completed response is replayed
+            wait_timeout: Seconds a repeat waits for the request in progress
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.replays = 0
+        self.mismatches = 0
+
+    def _new_event(self) -> Any:
+        return threading.Event()
+
+    def _claim(self, key: str, fingerprint: str) -> Tuple[str, _Entry]:
+        """Start a request for key or return the entry it has to wait for."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                entry = _Entry(fingerprint, self._new_event())
+                self._entries[key] = entry
+                return STARTED, entry
+            if entry.fingerprint != fingerprint:
+                self.mismatches += 1
+                return MISMATCH, entry
+            self._entries.move_to_end(key)
+            if entry.response is not None:
+                self.replays += 1
+                return REPLAY, entry
+            return IN_PROGRESS, entry
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[int, bytes, Dict[str, str]]]]:
+        """Claim key for a request, or wait for the request already holding it.
+
+        Args:
+            key: Idempotency-Key header value
+            fingerprint: request_fingerprint of the request
+
+        Returns:
+            Tuple of (outcome, response) where response is the stored
+            (status, body, headers) for REPLAY and None otherwise
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            outcome, entry = self._claim(key, fingerprint)
+            if outcome != IN_PROGRESS:
+                return outcome, entry.response if outcome == REPLAY else None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not entry.done.wait(remaining):
+                return IN_PROGRESS, None
+            # Finished (replay) or abandoned (claim it for this request)
+
+    def complete(self, key: str, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """Store the response of a started request, or release the key if it is not replayable."""
+        if not is_replayable(status):
+            self.abandon(key)
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.response = (status, body, dict(headers or {}))
+            entry.expires = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            self._evict()
+        entry.done.set()
+
+    def abandon(self, key: str) -> None:
+        """Release a started request's key so the next request with it runs again."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.response is not None:
+                return
+            del self._entries[key]
+        entry.done.set()
+
+    def _evict(self) -> None:
+        completed = [key for key, entry in self._entries.items() if entry.response is not None]
+        for key in completed[:max(0, len(completed) - self.max_size)]:
+            del self._entries[key]
+
+    def stats(self) -> Dict:
+        """Return entry and replay counters."""
+        with self._lock:
+            in_progress = sum(1 for entry in self._entries.values() if entry.response is None)
+            return {
+                "entries": len(self._entries) - in_progress,
+                "in_progress": in_progress,
+                "max_size": self.max_size,
+                "replays": self.replays,
+                "mismatches": self.mismatches
+            }
+
+
+class AsyncIdempotencyStore(IdempotencyStore):
+    """IdempotencyStore for coroutines running on one event loop.
+
+    Repeats arriving while the first request is in progress await it
+    instead of blocking a thread.
+    """
+
+    def _new_event(self) -> Any:
+        return asyncio.Event()
+
+    async def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[int, bytes, Dict[str, str]]]]:
+        """Claim key for a request, or await the request already holding it (see IdempotencyStore.begin)."""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            outcome, entry = self._claim(key, fingerprint)
+            if outcome != IN_PROGRESS:
+                return outcome, entry.response if outcome == REPLAY else None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return IN_PROGRESS, None
+            try:
+                await asyncio.wait_for(entry.done.wait(), remaining)
+            except asyncio.TimeoutError:
+                return IN_PROGRESS, None
+
+
+class SharedIdempotencyStore(IdempotencyStore):
+    """IdempotencyStore whose keys live in a SQLite file shared by worker processes.
+
+    A retry routed to another worker than the first request still gets its
+    response. Claims run in immediate transactions, so the SQLite write lock
+    lets one process start a key; repeats in other processes poll the file
+    until it completes. A key left in progress by a crashed process is
+    taken over after stale_after seconds. Completed responses beyond
+    max_size are evicted oldest first. Replay and mismatch counters remain
+    per process.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_size: int = 1000, ttl: float = 86400, wait_timeout: float = 60,
+                 poll_interval: float = 0.1, stale_after: float = 300):
+        """Initialize the store, creating the file if needed.
+
+        Args:
+            path: SQLite file holding the shared keys and responses
+            max_size: Maximum number of completed responses kept
+            ttl: Seconds a completed response is replayed
+            wait_timeout: Seconds a repeat waits for the request in progress
+            poll_interval: Seconds between checks of a key in progress
+            stale_after: Seconds after which a key still in progress is
+                considered abandoned
+        """
+        super().__init__(max_size, ttl, wait_timeout)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, started_at REAL NOT NULL, "
+                "status INTEGER, body BLOB, headers TEXT, expires REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+
+    def _now(self) -> float:
+        # Wall clock, so timestamps are comparable between processes
+        return time.time()
+
+    def _transaction(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn()
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _claim_shared(self, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[int, bytes, Dict[str, str]]]]:
+        """Start a request for key, or report the stored or in-progress request holding it."""
+        def claim():
+            now = self._now()
+            row = self._conn.execute(
+                "SELECT fingerprint, started_at, status, body, headers, expires FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                stored_fingerprint, started_at, status, body, headers, expires = row
+                if (status is not None and expires < now) or (status is None and started_at + self.stale_after < now):
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO responses (key, fingerprint, started_at) VALUES (?, ?, ?)",
+                    (key, fingerprint, now)
+                )
+                return STARTED, None
+            if stored_fingerprint != fingerprint:
+                self.mismatches += 1
+                return MISMATCH, None
+            if status is not None:
+                self.replays += 1
+                return REPLAY, (status, bytes(body), json.loads(headers))
+            return IN_PROGRESS, None
+
+        return self._transaction(claim)
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[int, bytes, Dict[str, str]]]]:
+        """Claim key for a request, or poll until the request holding it finishes (see IdempotencyStore.begin)."""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            outcome, response = self._claim_shared(key, fingerprint)
+            if outcome != IN_PROGRESS:
+                return outcome, response
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return IN_PROGRESS, None
+            time.sleep(min(self.poll_interval, remaining))
+
+    def complete(self, key: str, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """Store the response of a started request, or release the key if it is not replayable."""
+        if not is_replayable(status):
+            self.abandon(key)
+            return
+
+        def store():
+            self._conn.execute(
+                "UPDATE responses SET status = ?, body = ?, headers = ?, expires = ? "
+                "WHERE key = ? AND status IS NULL",
+                (status, body, json.dumps(dict(headers or {})), self._now() + self.ttl, key)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses WHERE status IS NOT NULL "
+                "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+
+        self._transaction(store)
+
+    def abandon(self, key: str) -> None:
+        """Release a started request's key so the next request with it runs again."""
+        self._transaction(lambda: self._conn.execute(
+            "DELETE FROM responses WHERE key = ? AND status IS NULL", (key,)
+        ))
+
+    def stats(self) -> Dict:
+        """Return entry and replay counters."""
+        with self._lock:
+            entries, in_progress = self._conn.execute(
+                "SELECT COUNT(status), COUNT(*) - COUNT(status) FROM responses"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "in_progress": in_progress,
+            "max_size": self.max_size,
+            "replays": self.replays,
+            "mismatches": self.mismatches
+        }
+
+
+class AsyncSharedIdempotencyStore(SharedIdempotencyStore):
+    """SharedIdempotencyStore for coroutines: claims run in a worker thread and polls sleep on the event loop.
+
+    complete() and abandon() still block (see blocking); async callers run
+    them in a worker thread.
+    """
+
+    async def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[int, bytes, Dict[str, str]]]]:
+        """Claim key for a request, or poll until the request holding it finishes (see IdempotencyStore.begin)."""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            outcome, response = await asyncio.to_thread(self._claim_shared, key, fingerprint)
+            if outcome != IN_PROGRESS:
+                return outcome, response
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return IN_PROGRESS, None
+            await asyncio.sleep(min(self.poll_interval, remaining))
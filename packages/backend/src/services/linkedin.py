@@ -0,0 +1,35 @@
+"""LinkedIn job posting URL parsing shared by the API and the services."""
+import re
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+# /jobs/view/1234567890 or /jobs/view/senior-engineer-2-at-acme-1234567890: the ID is
+# the digits ending the path segment (slugs may contain numbers of their own)
+LINKEDIN_VIEW_PATH_PATTERN = re.compile(r'^/jobs/view/(?:[^/]*-)?(\d+)/?$')
+
+
+def extract_linkedin_job_id(posting_url: str) -> Optional[int]:
+    """Extract the numeric LinkedIn job ID from a posting URL.
+    
+    Handles direct job URLs (with or without a title slug, tracking query
+    parameters or trailing slash) and collection/search URLs that carry the
+    job in a currentJobId query parameter.
+    
+    Args:
+        posting_url: LinkedIn job posting URL
+        
+    Returns:
+        The job ID, or None if the URL does not identify a single job
+    """
+    if not isinstance(posting_url, str):
+        return None
+    
+    parts = urlsplit(posting_url.strip())
+    match = LINKEDIN_VIEW_PATH_PATTERN.match(parts.path)
+    if match:
+        return int(match.group(1))
+    
+    current_job_id = parse_qs(parts.query).get('currentJobId', [''])[0]
+    if current_job_id.isdigit():
+        return int(current_job_id)
+    return None
@@ -0,0 +1,337 @@
+"""Local SQLite mirror of Notion databases, kept current by incremental sync."""
+from notion_client.helpers import iterate_paginated_api
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pages written per transaction while syncing
+SYNC_BATCH_SIZE = 100
+
+
+class NotionMirror:
+    """Copy of the pages of some Notion databases in a SQLite file.
+
+    The first sync of a database streams every page through databases.query
+    pagination. Later syncs only ask for pages edited since the newest
+    last_edited_time already mirrored (the cursor), so a sync costs one
+    query per 100 changed pages however large the database is. Notion does
+    not return deleted pages in queries, so a full pass runs every
+    full_sync_interval and drops pages it no longer sees.
+
+    Pages saved through the backend are written to the mirror right away.
+    Lookups are only answered while the last successful sync of the
+    database is at most max_lag seconds old; otherwise the caller must ask
+    Notion. The mirror file, cursors and sync times survive restarts.
+    """
+
+    def __init__(self, path: str, client, database_ids: Iterable[str],
+                 job_id_of: Callable[[Dict], Optional[int]],
+                 sync_interval: float = 60, max_lag: float = 300,
+                 full_sync_interval: float = 86400):
+        """Open (or create) the mirror.
+
+        Args:
+            path: SQLite file
+            client: Notion client used for databases.query
+            database_ids: Databases to mirror
+            job_id_of: Function returning the LinkedIn job ID of a page, if any
+            sync_interval: Seconds between background syncs (0 disables the
+                background thread; sync with `flask sync-mirror` instead)
+            max_lag: Seconds after the last successful sync during which
+                lookups are answered from the mirror
+            full_sync_interval: Seconds between full passes that remove
+                pages deleted in Notion
+        """
+        self.path = path
+        self.client = client
+        self.database_ids = [database_id for database_id in database_ids if database_id]
+        self._job_id_of = job_id_of
+        self.sync_interval = sync_interval
+        self.max_lag = max_lag
+        self.full_sync_interval = full_sync_interval
+
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "id TEXT PRIMARY KEY, database_id TEXT NOT NULL, title TEXT, posting_url TEXT, "
+            "job_id INTEGER, last_edited_time TEXT NOT NULL, synced_at REAL NOT NULL, page TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_job_id ON pages (database_id, job_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_posting_url ON pages (database_id, posting_url)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_title ON pages (database_id, title)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "database_id TEXT PRIMARY KEY, cursor TEXT, last_sync_at REAL, last_full_sync_at REAL, "
+            "last_duration REAL, last_changes INTEGER, last_error TEXT)"
+        )
+
+    # Lookups
+
+    def is_fresh(self, database_id: str) -> bool:
+        """Return True when the database was synced within max_lag seconds."""
+        lag = self.lag_seconds(database_id)
+        return lag is not None and lag <= self.max_lag
+
+    def lag_seconds(self, database_id: str) -> Optional[float]:
+        """Return seconds since the last successful sync of a database started, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_sync_at FROM sync_state WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return max(0.0, time.time() - row[0])
+
+    def find_posting(self, database_id: str, job_id: Optional[int],
+                     posting_url: str) -> Tuple[bool, Optional[str]]:
+        """Look up a saved posting by LinkedIn job ID (or exact URL when it has none).
+
+        Returns:
+            Tuple of (answered, page_id). When answered is False the mirror
+            is behind and the caller must query Notion instead.
+        """
+        if job_id is not None:
+            return self._find(database_id, "job_id = ?", job_id)
+        return self._find(database_id, "posting_url = ?", posting_url)
+
+    def find_by_title(self, database_id: str, title: str) -> Tuple[bool, Optional[str]]:
+        """Look up a page by its exact title (e.g. a company name).
+
+        Returns:
+            Tuple of (answered, page_id), as for find_posting
+        """
+        return self._find(database_id, "title = ?", title)
+
+    def _find(self, database_id: str, condition: str, value) -> Tuple[bool, Optional[str]]:
+        if not self.is_fresh(database_id):
+            self.misses += 1
+            return False, None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id FROM pages WHERE database_id = ? AND {condition} LIMIT 1",
+                (database_id, value)
+            ).fetchone()
+        self.hits += 1
+        return True, row[0] if row else None
+
+    def get_page(self, page_id: str) -> Optional[Dict]:
+        """Return the mirrored copy of a page as last returned by the Notion API."""
+        with self._lock:
+            row = self._conn.execute("SELECT page FROM pages WHERE id = ?", (page_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # Writes
+
+    def upsert(self, database_id: str, page: Dict) -> None:
+        """Record a page created or updated through the backend."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._write_pages(database_id, [page], time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _title(page: Dict) -> Optional[str]:
+        for prop in page.get('properties', {}).values():
+            if prop.get('type') == 'title':
+                return ''.join(item.get('plain_text', '') for item in prop.get('title') or [])
+        return None
+
+    def _write_pages(self, database_id: str, pages: List[Dict], synced_at: float) -> None:
+        for page in pages:
+            if page.get('archived') or page.get('in_trash'):
+                self._conn.execute("DELETE FROM pages WHERE id = ?", (page['id'],))
+                continue
+            self._conn.execute(
+                "INSERT INTO pages (id, database_id, title, posting_url, job_id, last_edited_time, synced_at, page) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET database_id = excluded.database_id, title = excluded.title, "
+                "posting_url = excluded.posting_url, job_id = excluded.job_id, "
+                "last_edited_time = excluded.last_edited_time, synced_at = excluded.synced_at, page = excluded.page",
+                (
+                    page['id'],
+                    database_id,
+                    self._title(page),
+                    page.get('properties', {}).get('Posting URL', {}).get('url'),
+                    self._job_id_of(page),
+                    page.get('last_edited_time', ''),
+                    synced_at,
+                    json.dumps(page)
+                )
+            )
+
+    # Sync
+
+    def sync(self, full: bool = False) -> Dict[str, Dict]:
+        """Sync every mirrored database.
+
+        Args:
+            full: Re-read every page (and drop deleted ones) even if a
+                cursor exists
+
+        Returns:
+            Stats per database (see stats)
+        """
+        with self._sync_lock:
+            for database_id in self.database_ids:
+                self.sync_database(database_id, full=full)
+        return self.stats()['databases']
+
+    def sync_database(self, database_id: str, full: bool = False) -> bool:
+        """Fetch the pages of one database edited since its cursor.
+
+        Returns:
+            True if the sync succeeded, False otherwise
+        """
+        started = time.time()
+        with self._lock:
+            state = self._conn.execute(
+                "SELECT cursor, last_full_sync_at FROM sync_state WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        cursor, last_full_sync_at = state or (None, None)
+        full = full or cursor is None or last_full_sync_at is None \
+            or started - last_full_sync_at >= self.full_sync_interval
+
+        query = {
+            "database_id": database_id,
+            "page_size": 100,
+            "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]
+        }
+        if not full:
+            # last_edited_time has minute precision, so re-read the boundary
+            query["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}}
+
+        changes = 0
+        batch: List[Dict] = []
+        try:
+            for page in iterate_paginated_api(self.client.databases.query, **query):
+                batch.append(page)
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    cursor = self._apply_batch(database_id, batch, started, cursor)
+                    changes += len(batch)
+                    batch = []
+            cursor = self._apply_batch(database_id, batch, started, cursor)
+            changes += len(batch)
+        except Exception as e:
+            logger.error(f"Mirror sync of database {database_id} failed: {e}")
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO sync_state (database_id, last_error) VALUES (?, ?) "
+                    "ON CONFLICT(database_id) DO UPDATE SET last_error = excluded.last_error",
+                    (database_id, str(e))
+                )
+            return False
+
+        duration = time.time() - started
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                if full:
+                    # Pages not seen by a full pass (nor written since it began) were deleted
+                    self._conn.execute(
+                        "DELETE FROM pages WHERE database_id = ? AND synced_at < ?", (database_id, started)
+                    )
+                self._conn.execute(
+                    "INSERT INTO sync_state (database_id, cursor, last_sync_at, last_full_sync_at, "
+                    "last_duration, last_changes, last_error) VALUES (?, ?, ?, ?, ?, ?, NULL) "
+                    "ON CONFLICT(database_id) DO UPDATE SET cursor = excluded.cursor, "
+                    "last_sync_at = excluded.last_sync_at, "
+                    "last_full_sync_at = COALESCE(excluded.last_full_sync_at, sync_state.last_full_sync_at), "
+                    "last_duration = excluded.last_duration, last_changes = excluded.last_changes, last_error = NULL",
+                    (database_id, cursor, started, started if full else None, duration, changes)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        logger.info(f"Mirror {'full' if full else 'incremental'} sync of database {database_id}: "
+                    f"{changes} pages in {duration:.2f}s")
+        return True
+
+    def _apply_batch(self, database_id: str, pages: List[Dict], synced_at: float,
+                     cursor: Optional[str]) -> Optional[str]:
+        """Write a batch of synced pages and advance the stored cursor with it."""
+        if not pages:
+            return cursor
+        cursor = max([cursor or ''] + [page.get('last_edited_time', '') for page in pages]) or None
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._write_pages(database_id, pages, synced_at)
+                # Keep the cursor so an interrupted first load resumes as a delta
+                self._conn.execute(
+                    "INSERT INTO sync_state (database_id, cursor) VALUES (?, ?) "
+                    "ON CONFLICT(database_id) DO UPDATE SET cursor = excluded.cursor",
+                    (database_id, cursor)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor
+
+    def start(self) -> None:
+        """Sync now and keep syncing in a daemon thread (unless sync_interval is 0)."""
+        if self._thread is not None or self.sync_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="notion-mirror", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sync thread."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sync()
+            self._stop.wait(self.sync_interval)
+
+    def stats(self) -> Dict:
+        """Return page counts, sync lag and lookup counters."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT database_id, COUNT(*) FROM pages GROUP BY database_id"
+            ).fetchall())
+            states = {
+                row[0]: row[1:] for row in self._conn.execute(
+                    "SELECT database_id, cursor, last_sync_at, last_full_sync_at, last_duration, "
+                    "last_changes, last_error FROM sync_state"
+                ).fetchall()
+            }
+
+        databases = {}
+        for database_id in self.database_ids:
+            cursor, last_sync_at, last_full_sync_at, duration, changes, error = \
+                states.get(database_id, (None,) * 6)
+            lag = None if last_sync_at is None else round(max(0.0, now - last_sync_at), 3)
+            databases[database_id] = {
+                "pages": counts.get(database_id, 0),
+                "fresh": lag is not None and lag <= self.max_lag,
+                "lag_seconds": lag,
+                "cursor": cursor,
+                "last_full_sync_seconds_ago": None if last_full_sync_at is None
+                else round(now - last_full_sync_at, 3),
+                "last_sync_duration_seconds": None if duration is None else round(duration, 3),
+                "last_sync_changes": changes,
+                "last_error": error
+            }
+        return {"databases": databases, "hits": self.hits, "misses": self.misses}
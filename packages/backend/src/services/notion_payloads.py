@@ -0,0 +1,358 @@
+"""Notion request payloads and response shaping shared by the sync and async services.
+
+Nothing here talks to Notion or touches local state, so NotionService and
+AsyncNotionService build the same requests and read responses the same way.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+
+from .description_blocks import batch_blocks, block_text, description_blocks, plan_description
+from .linkedin import extract_linkedin_job_id
+
+# Most conditions combined into one OR filter by check_duplicates
+MAX_FILTER_CONDITIONS = 50
+
+
+def posting_key(posting_url: str, job_id: Optional[int]) -> Any:
+    """Identify a posting for duplicate check caching (its job ID, else its URL)."""
+    return job_id if job_id is not None else posting_url
+
+
+def page_job_id(page: Dict, job_id_property: Optional[str]) -> Optional[int]:
+    """Return the LinkedIn job ID of a Job Applications page.
+
+    Uses the job ID property when set, otherwise parses the Posting URL.
+    """
+    properties = page.get('properties', {})
+    if job_id_property:
+        job_id = properties.get(job_id_property, {}).get('number')
+        if job_id is not None:
+            return int(job_id)
+    return extract_linkedin_job_id(properties.get('Posting URL', {}).get('url'))
+
+
+def duplicate_filter(posting_url: str, job_id: Optional[int],
+                     job_id_property: Optional[str] = None) -> Dict:
+    """Build the databases.query filter matching a posting.
+
+    Args:
+        posting_url: LinkedIn job posting URL
+        job_id: LinkedIn job ID parsed from the URL
+        job_id_property: Number property holding the job ID, if the database has it
+    """
+    if job_id is None:
+        return {
+            "property": "Posting URL",
+            "url": {
+                "equals": posting_url
+            }
+        }
+
+    conditions = [{
+        "property": "Posting URL",
+        "url": {
+            "contains": str(job_id)
+        }
+    }]
+    if job_id_property:
+        conditions.append({
+            "property": job_id_property,
+            "number": {
+                "equals": job_id
+            }
+        })
+    return {"or": conditions} if len(conditions) > 1 else conditions[0]
+
+
+def select_duplicate(results: List[Dict], job_id: Optional[int],
+                     job_id_property: Optional[str]) -> Optional[str]:
+    """Pick the page matching a posting from duplicate query results."""
+    for page in results:
+        # "contains" can match a longer ID, so confirm the exact job
+        if job_id is None or page_job_id(page, job_id_property) == job_id:
+            return page['id']
+    return None
+
+
+def batched_duplicate_filters(
+    pending: Dict[str, Optional[int]], job_id_property: Optional[str] = None
+) -> List[Tuple[Dict, Dict[str, Optional[int]]]]:
+    """Combine the duplicate filters of many postings into few OR filters.
+
+    Returns:
+        List of (filter, postings) where postings maps the posting URLs
+        covered by the filter to their LinkedIn job IDs
+    """
+    batches = []
+    conditions: List[Dict] = []
+    postings: Dict[str, Optional[int]] = {}
+    covered_job_ids = set()
+    for posting_url, job_id in pending.items():
+        if job_id is not None and job_id in covered_job_ids:
+            # Another URL of the same job is already in this filter
+            postings[posting_url] = job_id
+            continue
+        posting_filter = duplicate_filter(posting_url, job_id, job_id_property)
+        posting_conditions = posting_filter.get('or', [posting_filter])
+        if conditions and len(conditions) + len(posting_conditions) > MAX_FILTER_CONDITIONS:
+            batches.append(({"or": conditions}, postings))
+            conditions, postings, covered_job_ids = [], {}, set()
+        conditions.extend(posting_conditions)
+        postings[posting_url] = job_id
+        if job_id is not None:
+            covered_job_ids.add(job_id)
+    if conditions:
+        batches.append(({"or": conditions}, postings))
+    return batches
+
+
+def match_duplicates(pages: List[Dict], postings: Dict[str, Optional[int]],
+                     job_id_property: Optional[str]) -> Dict[str, Optional[str]]:
+    """Pick the page matching each posting from the results of a combined query."""
+    by_job_id: Dict[int, str] = {}
+    by_url: Dict[str, str] = {}
+    for page in pages:
+        job_id = page_job_id(page, job_id_property)
+        if job_id is not None:
+            by_job_id.setdefault(job_id, page['id'])
+        posting_url = page.get('properties', {}).get('Posting URL', {}).get('url')
+        if posting_url:
+            by_url.setdefault(posting_url, page['id'])
+
+    return {
+        posting_url: by_url.get(posting_url) if job_id is None else by_job_id.get(job_id)
+        for posting_url, job_id in postings.items()
+    }
+
+
+def company_page_name(page: Dict) -> str:
+    """Return the name of a Companies database page."""
+    title = page.get('properties', {}).get('Name', {}).get('title', [])
+    return ''.join(item.get('plain_text', '') for item in title)
+
+
+def company_filter(name: str) -> Dict:
+    """Build the databases.query filter matching a company by name."""
+    return {
+        "property": "Name",
+        "title": {
+            "equals": name
+        }
+    }
+
+
+def company_page_data(companies_database_id: str, name: str) -> Dict:
+    """Build the pages.create arguments for a new company."""
+    return {
+        "parent": {"database_id": companies_database_id},
+        "icon": {
+            "type": "external",
+            "external": {
+                "url": "https://www.notion.so/icons/factory_gray.svg"
+            }
+        },
+        "properties": {
+            "Name": {
+                "title": [
+                    {
+                        "text": {
+                            "content": name
+                        }
+                    }
+                ]
+            }
+        }
+    }
+
+
+def job_posting_properties(position: str, posting_url: str,
+                           company_id: Optional[str] = None,
+                           match: Optional[str] = None,
+                           work_arrangement: Optional[str] = None,
+                           demand: Optional[str] = None,
+                           budget: Optional[float] = None,
+                           city: Optional[str] = None,
+                           country: Optional[str] = None,
+                           job_id_property: Optional[str] = None) -> Dict:
+    """Build the Notion property payload for a job posting page.
+
+    Args:
+        job_id_property: Number property the LinkedIn job ID is written to,
+            if the database has it
+    """
+    properties = {
+        "Position": {
+            "title": [
+                {
+                    "text": {
+                        "content": position
+                    }
+                }
+            ]
+        },
+        "Posting URL": {
+            "url": posting_url
+        },
+        "Source": {
+            "select": {
+                "name": "LinkedIn"
+            }
+        },
+        "Origin": {
+            "select": {
+                "name": "Applied"
+            }
+        }
+    }
+
+    job_id = extract_linkedin_job_id(posting_url)
+    if job_id is not None and job_id_property:
+        properties[job_id_property] = {
+            "number": job_id
+        }
+
+    # Add Company as relation if we have a company_id
+    if company_id:
+        properties["Company"] = {
+            "relation": [
+                {
+                    "id": company_id
+                }
+            ]
+        }
+
+    # Add optional fields if provided
+    if match:
+        properties["Match"] = {
+            "select": {
+                "name": match
+            }
+        }
+
+    if work_arrangement:
+        properties["Work Arrangement"] = {
+            "select": {
+                "name": work_arrangement
+            }
+        }
+
+    if demand:
+        properties["Demand"] = {
+            "select": {
+                "name": demand
+            }
+        }
+
+    if budget is not None:
+        properties["Budget"] = {
+            "number": budget
+        }
+
+    # City is multi_select, not rich_text
+    if city:
+        properties["City"] = {
+            "multi_select": [
+                {
+                    "name": city
+                }
+            ]
+        }
+
+    if country:
+        properties["Country"] = {
+            "select": {
+                "name": country
+            }
+        }
+
+    return properties
+
+
+def job_posting_page_data(database_id: str, properties: Dict, children: Optional[List[Dict]]) -> Dict:
+    """Build the pages.create arguments for a job posting page.
+
+    Args:
+        database_id: Job Applications database ID
+        properties: Page properties
+        children: First batch of description blocks (the rest is appended
+            after the page is created)
+    """
+    # Create page without template (set icon and children directly)
+    page_data = {
+        "parent": {"database_id": database_id},
+        "icon": {
+            "type": "external",
+            "external": {
+                "url": "https://www.notion.so/icons/share_gray.svg"
+            }
+        },
+        "properties": properties
+    }
+
+    # Add children (page content) if we have job description
+    if children:
+        page_data["children"] = children
+
+    return page_data
+
+
+def description_batches(job_description: Optional[str]) -> List[List[Dict]]:
+    """Plan the blocks of a job description, grouped into request-sized batches."""
+    if not job_description:
+        return []
+    return batch_blocks(description_blocks(plan_description(job_description)))
+
+
+def description_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def description_text(blocks: List[Dict]) -> str:
+    """Return the job description text held by a page's blocks."""
+    return '\n\n'.join(
+        block_text(block)
+        for block in blocks if block['type'] in ('callout', 'paragraph')
+    )
+
+
+def property_value(prop: Optional[Dict]) -> Any:
+    """Reduce a property (request payload or API response) to a comparable value."""
+    if not prop:
+        return None
+    prop_type = prop.get('type') or next((key for key in prop if key != 'id'), None)
+    value = prop.get(prop_type)
+    if prop_type in ('title', 'rich_text'):
+        return ''.join(
+            item.get('plain_text') or item.get('text', {}).get('content', '')
+            for item in value or []
+        )
+    if prop_type == 'select':
+        return value.get('name') if value else None
+    if prop_type == 'multi_select':
+        return sorted(option.get('name') for option in value or [])
+    if prop_type == 'relation':
+        return sorted(relation.get('id', '').replace('-', '') for relation in value or [])
+    if prop_type == 'number':
+        return float(value) if value is not None else None
+    return value
+
+
+def page_state(page: Dict, description_hash: Optional[str] = None) -> Dict:
+    """Reduce a page returned by the Notion API to the state updates are diffed against."""
+    return {
+        "id": page['id'],
+        "url": page['url'],
+        "properties": {
+            name: property_value(prop)
+            for name, prop in page.get('properties', {}).items()
+        },
+        "description_hash": description_hash
+    }
+
+
+def changed_properties(properties: Dict, state: Dict) -> Dict:
+    """Return the properties whose value differs from a page state."""
+    return {
+        name: prop for name, prop in properties.items()
+        if property_value(prop) != state['properties'].get(name)
+    }
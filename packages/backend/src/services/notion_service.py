@@ -1,30 +1,394 @@
 """Service for interacting with Notion API."""
-from notion_client import Client
+from concurrent.futures import Future
 from notion_client.errors import APIResponseError
-from typing import Dict, Optional
+from notion_client.helpers import iterate_paginated_api
+from typing import Dict, Iterator, List, Optional, Tuple
+import atexit
 import logging
+import sqlite3
+import threading
+import time
+
+import httpx
+
+from .background_check import BackgroundCheck
+from .cache_snapshot import CacheSnapshot, notion_timestamp
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .company_cache import CompanyCache
+from .description_blocks import (batch_blocks, block_report_summary, delete_error, description_blocks,
+                                 diff_blocks, log_block_failures, new_block_report, plan_description,
+                                 record_block_outcomes)
+from .linkedin import extract_linkedin_job_id
+from .notion_mirror import NotionMirror
+from .notion_payloads import (
+    batched_duplicate_filters, changed_properties, company_filter, company_page_data, company_page_name,
+    description_batches, description_hash, description_text, duplicate_filter, job_posting_page_data,
+    job_posting_properties, match_duplicates, page_job_id, page_state, posting_key, property_value,
+    select_duplicate
+)
+from .posting_index import PostingIndex
+from .rate_limiter import TokenBucket
+from .search_index import SearchIndex
+from .singleflight import SingleFlight
+from .throttled_client import ContextExecutor, ThrottledClient
+from .tracing import trace_methods
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class NotionService:
     """Service for interacting with Notion API."""
     
-    def __init__(self, api_key: str, database_id: str, companies_database_id: Optional[str] = None):
+    def __init__(self, api_key: str, database_id: str, companies_database_id: Optional[str] = None,
+                 use_posting_index: bool = False,
+                 index_refresh_interval: float = 300,
+                 index_max_staleness: float = 900,
+                 company_cache_size: int = 1000,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_retries: int = 5,
+                 job_id_property: Optional[str] = 'LinkedIn Job ID',
+                 page_cache_size: int = 500,
+                 page_cache_ttl: float = 300,
+                 max_concurrency: int = 4,
+                 http_client: Optional[httpx.Client] = None,
+                 timeout: Optional[httpx.Timeout] = None,
+                 schema_check_interval: float = 60,
+                 schema_check_max_age: float = 300,
+                 base_url: Optional[str] = None,
+                 mirror_path: Optional[str] = None,
+                 mirror_sync_interval: float = 60,
+                 mirror_max_lag: float = 300,
+                 mirror_full_sync_interval: float = 86400,
+                 search_index_path: Optional[str] = None,
+                 not_found_cache_size: int = 1000,
+                 not_found_cache_ttl: float = 30,
+                 snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 300,
+                 snapshot_max_age: float = 86400,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         """Initialize Notion service with API credentials.
         
         Args:
             api_key: Notion integration API key
             database_id: Notion database ID for job applications
             companies_database_id: Notion database ID for companies (optional)
+            use_posting_index: Answer duplicate checks from an in-memory index
+            index_refresh_interval: Seconds between background index rebuilds
+            index_max_staleness: Seconds the index may go without a rebuild
+                before duplicate checks fall back to live queries
+            company_cache_size: Maximum number of company page IDs kept in memory
+            rate_limiter: Token bucket throttling every Notion call (unthrottled if omitted)
+            max_retries: Maximum retries for rate limited or transient failures
+            job_id_property: Number property holding the LinkedIn job ID; written
+                only when the database schema has it
+            page_cache_size: Maximum number of page states kept for diffing updates
+            page_cache_ttl: Seconds a cached page state is trusted before it is
+                retrieved again (bounds how long edits made directly in Notion
+                can be missed)
+            max_concurrency: Worker threads for independent Notion calls made
+                within one operation (e.g. block deletes)
+            http_client: Shared pooled HTTP client (see http_transport.build_http_client);
+                a default httpx client is created if omitted
+            timeout: Connect/read timeouts applied to the HTTP client
+            schema_check_interval: Seconds between background database validations
+            schema_check_max_age: Seconds after which a cached validation is stale
+            base_url: Notion API endpoint (defaults to https://api.notion.com)
+            mirror_path: SQLite file mirroring both databases; duplicate checks
+                and company lookups are served from it while it is in sync
+                (no mirror if omitted)
+            mirror_sync_interval: Seconds between incremental mirror syncs
+            mirror_max_lag: Seconds the mirror may go without a successful
+                sync before lookups fall back to live queries
+            mirror_full_sync_interval: Seconds between full mirror syncs,
+                which pick up pages deleted in Notion
+            search_index_path: SQLite file holding the full-text index of
+                saved postings (no search index if omitted)
+            not_found_cache_size: Maximum number of "not saved" duplicate check
+                answers kept in memory
+            not_found_cache_ttl: Seconds a "not saved" answer is reused (0
+                disables the cache); answers for postings created through this
+                service are dropped immediately
+            snapshot_path: SQLite file the posting index, company cache and
+                schema check are periodically saved to and restored from on
+                startup (no snapshots if omitted)
+            snapshot_interval: Seconds between snapshots (0 only saves on exit)
+            snapshot_max_age: Seconds after which a snapshot is too old to
+                restore and the caches are rebuilt from Notion instead
+            circuit_breaker: Breaker that rejects Notion calls with
+                CircuitOpenError while Notion keeps failing or timing out
+                (calls are never short-circuited if omitted)
         """
-        self.client = Client(auth=api_key)
+        self.client = ThrottledClient(
+            bucket=rate_limiter or TokenBucket(rate=0),
+            max_retries=max_retries,
+            timeout=timeout,
+            breaker=circuit_breaker,
+            client=http_client,
+            auth=api_key,
+            **({"base_url": base_url} if base_url else {})
+        )
         self.database_id = database_id
         self.companies_database_id = companies_database_id
+        self.job_id_property = job_id_property
+        self.job_id_property_available = False
+        
+        self.posting_index: Optional[PostingIndex] = None
+        if use_posting_index:
+            self.posting_index = PostingIndex(
+                loader=self._iter_job_ids,
+                refresh_interval=index_refresh_interval,
+                max_staleness=index_max_staleness
+            )
+        
+        self.mirror: Optional[NotionMirror] = None
+        if mirror_path:
+            self.mirror = NotionMirror(
+                path=mirror_path,
+                client=self.client,
+                database_ids=[database_id, companies_database_id],
+                job_id_of=self._page_job_id,
+                sync_interval=mirror_sync_interval,
+                max_lag=mirror_max_lag,
+                full_sync_interval=mirror_full_sync_interval
+            )
+        
+        self.search_index = SearchIndex(search_index_path) if search_index_path else None
+        
+        self.company_cache = CompanyCache(max_size=company_cache_size)
+        self._company_flight = SingleFlight()
+        self.page_state_cache = TTLCache(max_size=page_cache_size, ttl=page_cache_ttl)
+        self.not_found_cache = TTLCache(
+            max_size=not_found_cache_size if not_found_cache_ttl > 0 else 0,
+            ttl=not_found_cache_ttl
+        )
+        self._duplicate_flight = SingleFlight()
+        # Bumped on every create so a check that raced one does not cache "not saved"
+        self.creations = 0
+        self.snapshot = CacheSnapshot(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot_stop = threading.Event()
+        self._executor = ContextExecutor(max_workers=max_concurrency, thread_name_prefix="notion")
+        self.schema_check = BackgroundCheck(
+            self.validate_database,
+            interval=schema_check_interval,
+            max_age=schema_check_max_age
+        )
+    
+    def close(self) -> None:
+        """Stop background workers and close pooled HTTP connections."""
+        if self.posting_index:
+            self.posting_index.stop()
+        if self.mirror:
+            self.mirror.stop()
+        self.schema_check.stop()
+        self._snapshot_stop.set()
+        self._executor.shutdown(wait=False)
+        self.client.close()
+    
+    def start_background_tasks(self) -> None:
+        """Start background workers (schema check, posting index build and refresh, mirror sync,
+        company preload, cache snapshots).
+        
+        Caches restored from a snapshot skip their initial load from Notion.
+        """
+        restored = self.restore_snapshot() if self.snapshot else {}
+        self.schema_check.start()
+        if self.posting_index:
+            self.posting_index.start(
+                initial_delay=self.posting_index.refresh_interval if restored.get('postings') else 0
+            )
+        if self.mirror:
+            self.mirror.start()
+        if self.companies_database_id and self.company_cache.max_size > 0 and not restored.get('companies'):
+            threading.Thread(target=self.preload_companies, name="company-preload", daemon=True).start()
+        if self.snapshot:
+            if self.snapshot_interval > 0:
+                threading.Thread(target=self._run_snapshots, name="cache-snapshot", daemon=True).start()
+            atexit.register(self._try_save_snapshot)
+    
+    def _snapshot_databases(self) -> Dict[str, Optional[str]]:
+        """Identify what a snapshot's contents depend on."""
+        return {
+            "jobs": self.database_id,
+            "companies": self.companies_database_id,
+            "job_id_property": self.job_id_property
+        }
+    
+    def save_snapshot(self) -> None:
+        """Write the posting index (if ready), company cache and schema check to the snapshot file."""
+        # Captured before the state is copied, so the next restore re-reads anything saved meanwhile
+        taken_at = time.time()
+        postings = self.posting_index.entries() if self.posting_index and self.posting_index.is_ready() else None
+        check = self.schema_check.result()
+        schema = None
+        if check['valid'] is not None:
+            schema = {
+                "valid": check['valid'],
+                "error": check['error'],
+                "job_id_property_available": self.job_id_property_available
+            }
+        self.snapshot.save(self._snapshot_databases(), taken_at, postings, self.company_cache.items(), schema)
+        logger.info(f"Cache snapshot saved ({len(postings) if postings is not None else 'no'} postings, "
+                    f"{len(self.company_cache)} companies) in {self.snapshot.last_duration:.3f}s")
+    
+    def _run_snapshots(self) -> None:
+        while not self._snapshot_stop.wait(self.snapshot_interval):
+            self._try_save_snapshot()
+    
+    def _try_save_snapshot(self) -> None:
+        try:
+            self.save_snapshot()
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Error saving cache snapshot: {e}")
+    
+    def restore_snapshot(self) -> Dict[str, bool]:
+        """Load the caches from the snapshot file and reconcile them with Notion.
+        
+        Only pages edited since the snapshot was taken are queried (usually
+        one request per database). If that delta cannot be fetched, the
+        posting index is left cold and rebuilt from Notion as without a
+        snapshot; restored companies are kept since a cached company page
+        stays valid.
+        
+        The postings and companies sections are captured at different times
+        (postings only while the index is ready), so each one is checked
+        against snapshot_max_age on its own. A too old postings section is
+        not restored: the delta query cannot see deleted pages, so the index
+        is rebuilt from Notion instead.
+        
+        Returns:
+            Which caches were restored: {"postings": bool, "companies": bool}
+        """
+        restored = {"postings": False, "companies": False}
+        started = time.monotonic()
+        try:
+            state = self.snapshot.load(self._snapshot_databases())
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error loading cache snapshot: {e}")
+            return restored
+        if state is None:
+            logger.info("No cache snapshot, loading caches from Notion")
+            return restored
+        
+        now = time.time()
+        companies_fresh = now - state['companies_taken_at'] <= self.snapshot_max_age
+        postings_fresh = (
+            state['postings'] is not None
+            and now - state['postings_taken_at'] <= self.snapshot_max_age
+        )
+        if not companies_fresh and not postings_fresh:
+            logger.info("No recent cache snapshot, loading caches from Notion")
+            return restored
+        
+        # The schema check is saved with every snapshot, like the companies
+        if companies_fresh and state['schema']:
+            self.job_id_property_available = state['schema']['job_id_property_available']
+            self.schema_check.restore(
+                (state['schema']['valid'], state['schema']['error']),
+                age=now - state['companies_taken_at']
+            )
+        
+        if companies_fresh and self.companies_database_id and self.company_cache.max_size > 0:
+            for name, company_id in state['companies']:
+                self.company_cache.put(name, company_id)
+            try:
+                for page in self._iter_edited_since(self.companies_database_id, state['companies_taken_at']):
+                    name = company_page_name(page)
+                    if name:
+                        self.company_cache.put(name, page['id'])
+            except APIResponseError as e:
+                logger.warning(f"Could not reconcile companies with Notion: {e}")
+            restored["companies"] = bool(state['companies'])
+        
+        if self.posting_index and state['postings'] is not None:
+            if not postings_fresh:
+                logger.info(f"Snapshot postings are {now - state['postings_taken_at']:.0f}s old, "
+                            f"rebuilding the index from Notion")
+            else:
+                entries = state['postings']
+                try:
+                    for page in self._iter_edited_since(self.database_id, state['postings_taken_at']):
+                        job_id = self._page_job_id(page)
+                        if job_id is not None:
+                            entries[job_id] = page['id']
+                    self.posting_index.restore(entries)
+                    restored["postings"] = True
+                except APIResponseError as e:
+                    logger.warning(f"Could not reconcile postings with Notion, rebuilding the index: {e}")
+        
+        logger.info(f"Cache snapshot restored in {time.monotonic() - started:.2f}s "
+                    f"(postings: {restored['postings']}, companies: {restored['companies']})")
+        return restored
+    
+    def _iter_edited_since(self, database_id: str, since: float) -> Iterator[Dict]:
+        """Page through the pages of a database edited at or after a Unix time."""
+        # A minute of slack for clock differences between this host and Notion
+        return iterate_paginated_api(
+            self.client.databases.query,
+            database_id=database_id,
+            filter={
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": notion_timestamp(since - 60)}
+            },
+            page_size=100
+        )
+    
+    def preload_companies(self) -> int:
+        """Fill the company cache from the Companies database.
+        
+        Returns:
+            Number of companies loaded
+        """
+        loaded = 0
+        try:
+            for page in iterate_paginated_api(
+                self.client.databases.query,
+                database_id=self.companies_database_id,
+                page_size=100
+            ):
+                name = company_page_name(page)
+                if name:
+                    self.company_cache.put(name, page['id'])
+                    loaded += 1
+                if loaded >= self.company_cache.max_size:
+                    break
+        except APIResponseError as e:
+            logger.error(f"Error preloading companies: {e}")
+        
+        logger.info(f"Preloaded {loaded} companies into cache")
+        return loaded
+    
+    def _page_job_id(self, page: Dict) -> Optional[int]:
+        """Return the LinkedIn job ID of a Job Applications page."""
+        return page_job_id(page, self.job_id_property)
+    
+    @property
+    def available_job_id_property(self) -> Optional[str]:
+        """The job ID property if the database has it (known after validate_database), else None."""
+        return self.job_id_property if self.job_id_property_available else None
+    
+    def _iter_job_ids(self) -> Iterator[Tuple[Optional[int], str]]:
+        """Page through the Job Applications database.
+        
+        Yields:
+            Tuple of (job_id, page_id) for every page in the database
+        """
+        for page in iterate_paginated_api(
+            self.client.databases.query,
+            database_id=self.database_id,
+            page_size=100
+        ):
+            yield self._page_job_id(page), page['id']
         
     def validate_database(self) -> tuple[bool, Optional[str]]:
         """Validate database exists and has required properties.
         
+        Runs a live databases.retrieve; health endpoints read the cached
+        result from schema_check instead.
+        
         Returns:
             Tuple of (is_valid, error_message)
         """
@@ -45,43 +409,170 @@ class NotionService:
                 if properties[prop_name]['type'] != prop_type:
                     return False, f"Property {prop_name} must be type {prop_type}"
             
+            self.job_id_property_available = bool(
+                self.job_id_property
+                and properties.get(self.job_id_property, {}).get('type') == 'number'
+            )
+            
             return True, None
             
         except APIResponseError as e:
             logger.error(f"Notion API error during validation: {e}")
             return False, str(e)
     
-    def check_duplicate(self, posting_url: str) -> Optional[str]:
-        """Check if job posting URL already exists in database.
+    def check_duplicate(self, posting_url: str, fresh: bool = False) -> Optional[str]:
+        """Check if job posting already exists in database.
+        
+        Postings are matched on their LinkedIn job ID, so the same job saved
+        from a collection URL or with tracking parameters is still found.
+        Answered from the posting index when it is warm, then from the local
+        mirror when it is in sync, then from recent "not saved" answers,
+        otherwise by a live query against the database. Concurrent live
+        queries for the same posting are coalesced into one. URLs without a
+        job ID fall back to an exact Posting URL match.
         
         Args:
             posting_url: LinkedIn job posting URL
+            fresh: Skip cached "not saved" answers (used before creating a page)
             
         Returns:
             Existing page ID if duplicate found, None otherwise
         """
+        job_id = extract_linkedin_job_id(posting_url)
+        
+        if job_id is not None and self.posting_index:
+            answered, page_id = self.posting_index.lookup(job_id)
+            if answered:
+                return page_id
+        
+        if self.mirror:
+            answered, page_id = self.mirror.find_posting(self.database_id, job_id, posting_url)
+            if answered:
+                return page_id
+        
+        key = posting_key(posting_url, job_id)
+        if not fresh and self.not_found_cache.get(key):
+            return None
+        
         try:
-            response = self.client.databases.query(
-                database_id=self.database_id,
-                filter={
-                    "property": "Posting URL",
-                    "url": {
-                        "equals": posting_url
-                    }
-                }
+            return self._duplicate_flight.do(
+                key,
+                lambda: self._query_duplicate(posting_url, job_id)
             )
-            
-            if response.get('results'):
-                return response['results'][0]['id']
-            return None
-            
+        except CircuitOpenError:
+            # Notion is down: "not saved" would be a guess, so the caller gets the 503
+            raise
         except APIResponseError as e:
             logger.error(f"Error checking for duplicates: {e}")
             return None
     
+    def _query_duplicate(self, posting_url: str, job_id: Optional[int]) -> Optional[str]:
+        """Query the database for a posting and cache a "not saved" answer."""
+        creations = self.creations
+        response = self.client.databases.query(
+            database_id=self.database_id,
+            filter=duplicate_filter(posting_url, job_id, self.available_job_id_property)
+        )
+        page_id = self.select_duplicate(response.get('results', []), job_id)
+        self.remember_not_found(posting_url, job_id, page_id, creations)
+        return page_id
+    
+    def remember_not_found(self, posting_url: str, job_id: Optional[int],
+                           page_id: Optional[str], creations: int) -> None:
+        """Cache a "not saved" answer unless a page was created while it was being looked up.
+        
+        Args:
+            creations: Value of self.creations read before the lookup started
+        """
+        if page_id is None and creations == self.creations:
+            self.not_found_cache.put(posting_key(posting_url, job_id), True)
+    
+    def select_duplicate(self, results: List[Dict], job_id: Optional[int]) -> Optional[str]:
+        """Pick the page matching a posting from duplicate query results and index it."""
+        page_id = select_duplicate(results, job_id, self.job_id_property)
+        if page_id and job_id is not None and self.posting_index:
+            self.posting_index.add(job_id, page_id)
+        return page_id
+    
+    def check_duplicates(self, posting_urls: List[str]) -> Dict[str, Optional[str]]:
+        """Check many postings at once (see check_duplicate).
+        
+        Postings the posting index or the mirror can answer are answered
+        locally. The rest are matched with as few databases.query calls as
+        possible: their filters are combined into OR filters of up to
+        MAX_FILTER_CONDITIONS conditions, and those queries run concurrently
+        on the worker pool. Unlike check_duplicate, Notion errors are raised
+        rather than reported as "not saved".
+        
+        Args:
+            posting_urls: LinkedIn job posting URLs
+            
+        Returns:
+            Map of every posting URL to its existing page ID (None if not saved)
+        """
+        results, pending = self.check_duplicates_locally(posting_urls)
+        for found in self._executor.map(
+            lambda batch: self._query_duplicates(*batch),
+            batched_duplicate_filters(pending, self.available_job_id_property)
+        ):
+            results.update(found)
+        return results
+    
+    def check_duplicates_locally(
+        self, posting_urls: List[str]
+    ) -> Tuple[Dict[str, Optional[str]], Dict[str, Optional[int]]]:
+        """Answer duplicate checks from the posting index and the mirror.
+        
+        Returns:
+            Tuple of (results, pending) where pending maps each posting URL
+            still to be queried to its LinkedIn job ID
+        """
+        results: Dict[str, Optional[str]] = {}
+        pending: Dict[str, Optional[int]] = {}
+        for posting_url in posting_urls:
+            if posting_url in results or posting_url in pending:
+                continue
+            job_id = extract_linkedin_job_id(posting_url)
+            answered = False
+            if job_id is not None and self.posting_index:
+                answered, page_id = self.posting_index.lookup(job_id)
+            if not answered and self.mirror:
+                answered, page_id = self.mirror.find_posting(self.database_id, job_id, posting_url)
+            if answered:
+                results[posting_url] = page_id
+            else:
+                pending[posting_url] = job_id
+        return results, pending
+    
+    def match_duplicates(self, pages: List[Dict],
+                         postings: Dict[str, Optional[int]]) -> Dict[str, Optional[str]]:
+        """Pick the page matching each posting from the results of a combined query and index them."""
+        results = match_duplicates(pages, postings, self.job_id_property)
+        if self.posting_index:
+            for posting_url, page_id in results.items():
+                job_id = postings[posting_url]
+                if page_id and job_id is not None:
+                    self.posting_index.add(job_id, page_id)
+        return results
+    
+    def _query_duplicates(self, duplicate_filter: Dict,
+                          postings: Dict[str, Optional[int]]) -> Dict[str, Optional[str]]:
+        """Run one combined duplicate query (following pagination) and match its results."""
+        pages = list(iterate_paginated_api(
+            self.client.databases.query,
+            database_id=self.database_id,
+            filter=duplicate_filter,
+            page_size=100
+        ))
+        return self.match_duplicates(pages, postings)
+    
     def find_or_create_company(self, company_name: str) -> Optional[str]:
         """Find existing company or create new one in Companies database.
         
+        Known companies are served from the company cache. Concurrent lookups
+        for the same uncached name share a single query/create so a new
+        company is only created once.
+        
         Args:
             company_name: Name of the company
             
@@ -92,56 +583,266 @@ class NotionService:
             logger.warning("Companies database ID not configured, skipping company lookup")
             return None
         
-        try:
-            # Search for existing company
-            response = self.client.databases.query(
-                database_id=self.companies_database_id,
-                filter={
-                    "property": "Name",
-                    "title": {
-                        "equals": company_name
-                    }
-                }
-            )
-            
-            # Return existing company if found
-            if response.get('results'):
-                company_id = response['results'][0]['id']
-                logger.info(f"Found existing company: {company_name} (ID: {company_id})")
-                return company_id
-            
-            # Create new company with icon
-            logger.info(f"Creating new company: {company_name}")
-            
-            new_company = self.client.pages.create(
-                parent={"database_id": self.companies_database_id},
-                icon={
-                    "type": "external",
-                    "external": {
-                        "url": "https://www.notion.so/icons/factory_gray.svg"
-                    }
-                },
-                properties={
-                    "Name": {
-                        "title": [
-                            {
-                                "text": {
-                                    "content": company_name
-                                }
-                            }
-                        ]
-                    }
-                }
-            )
-            
-            company_id = new_company['id']
-            logger.info(f"Created new company: {company_name} (ID: {company_id})")
+        company_id = self.company_cache.get(company_name)
+        if company_id:
             return company_id
-            
+        
+        return self._company_flight.do(
+            company_name,
+            lambda: self.company_cache.get(company_name) or self._find_or_create_company(company_name)
+        )
+    
+    def company_lookups_in_flight(self) -> int:
+        """Return the number of distinct company lookups currently running."""
+        return self._company_flight.in_flight()
+    
+    def _find_or_create_company(self, company_name: str) -> Optional[str]:
+        """Query the Companies database and create the company if missing."""
+        try:
+            return self._find_company(company_name) or self._create_company(company_name)
+        except CircuitOpenError:
+            # Notion is down: saving without the company would hide that, so the caller gets the 503
+            raise
         except APIResponseError as e:
             logger.error(f"Error finding/creating company: {e}")
             return None
     
+    def _find_company(self, company_name: str) -> Optional[str]:
+        """Look up a company by name without creating it (cache, mirror, then Notion)."""
+        company_id = self.company_cache.get(company_name)
+        if company_id:
+            return company_id
+        
+        answered, company_id = self.find_company_in_mirror(company_name)
+        if answered:
+            return company_id
+        
+        # Search for existing company
+        response = self.client.databases.query(
+            database_id=self.companies_database_id,
+            filter=company_filter(company_name)
+        )
+        return self.remember_found_company(company_name, response)
+    
+    def remember_found_company(self, company_name: str, response: Dict) -> Optional[str]:
+        """Cache the company found by a Companies database query; returns its ID (None if not found)."""
+        if not response.get('results'):
+            return None
+        company_id = response['results'][0]['id']
+        logger.info(f"Found existing company: {company_name} (ID: {company_id})")
+        self.company_cache.put(company_name, company_id)
+        return company_id
+    
+    def find_company_in_mirror(self, company_name: str) -> Tuple[bool, Optional[str]]:
+        """Look up a company in the local mirror (answered is False when it is behind)."""
+        if not self.mirror:
+            return False, None
+        answered, company_id = self.mirror.find_by_title(self.companies_database_id, company_name)
+        if company_id:
+            self.company_cache.put(company_name, company_id)
+        return answered, company_id
+    
+    def _create_company(self, company_name: str) -> str:
+        """Create a company page (callers have checked it does not exist)."""
+        # Create new company with icon
+        logger.info(f"Creating new company: {company_name}")
+        
+        new_company = self.client.pages.create(**company_page_data(self.companies_database_id, company_name))
+        
+        logger.info(f"Created new company: {company_name} (ID: {new_company['id']})")
+        return self.remember_company(company_name, new_company)
+    
+    def remember_company(self, company_name: str, page: Dict) -> str:
+        """Cache and mirror a newly created company page; returns its ID."""
+        self.company_cache.put(company_name, page['id'])
+        if self.mirror:
+            self.mirror.upsert(self.companies_database_id, page)
+        return page['id']
+    
+    def _resolve_company(self, company_name: str, lookup: Optional[Future]) -> Optional[str]:
+        """Finish a company lookup started with _find_company, creating the company if missing."""
+        if lookup is None:
+            return self.find_or_create_company(company_name)
+        try:
+            company_id = lookup.result()
+        except CircuitOpenError:
+            raise
+        except APIResponseError as e:
+            logger.error(f"Error finding company: {e}")
+            return self.find_or_create_company(company_name)
+        if company_id:
+            return company_id
+        
+        def create():
+            try:
+                return self.company_cache.get(company_name) or self._create_company(company_name)
+            except CircuitOpenError:
+                raise
+            except APIResponseError as e:
+                logger.error(f"Error creating company: {e}")
+                return None
+        
+        return self._company_flight.do(company_name, create)
+    
+    def remember_page(self, page: Dict, description_hash: Optional[str] = None) -> Dict:
+        """Store the state of a page as returned by the Notion API.
+        
+        The description hash of the previous state is kept unless a new one
+        is passed.
+        """
+        previous = self.page_state_cache.get(page['id']) or {}
+        state = page_state(page, description_hash or previous.get('description_hash'))
+        self.page_state_cache.put(page['id'], state)
+        if self.mirror:
+            self.mirror.upsert(self.database_id, page)
+        return state
+    
+    def _get_page_state(self, page_id: str) -> Dict:
+        """Return the cached state of a page, retrieving it from Notion on a miss."""
+        state = self.page_state_cache.get(page_id)
+        if state is None:
+            state = self.remember_page(self.client.pages.retrieve(page_id=page_id))
+        return state
+    
+    def posting_properties(self, company_id: Optional[str], position: str, posting_url: str,
+                           match: Optional[str], work_arrangement: Optional[str],
+                           demand: Optional[str], budget: Optional[float],
+                           city: Optional[str], country: Optional[str]) -> Dict:
+        """Build the properties of a job posting page for this database (see job_posting_properties)."""
+        return job_posting_properties(
+            position=position,
+            posting_url=posting_url,
+            company_id=company_id,
+            match=match,
+            work_arrangement=work_arrangement,
+            demand=demand,
+            budget=budget,
+            city=city,
+            country=country,
+            job_id_property=self.available_job_id_property
+        )
+    
+    def record_created(self, page: Dict, position: str, company: str, posting_url: str,
+                       match: Optional[str], work_arrangement: Optional[str],
+                       country: Optional[str], budget: Optional[float],
+                       job_description: Optional[str], description_complete: bool) -> None:
+        """Update the posting index, page state cache and search index after a page was created.
+        
+        Pass description_complete=False if the description was not
+        completely written, so the next update rewrites it.
+        """
+        job_id = extract_linkedin_job_id(posting_url)
+        if job_id is not None and self.posting_index:
+            self.posting_index.add(job_id, page['id'])
+        self.creations += 1
+        self.not_found_cache.pop(posting_key(posting_url, job_id))
+        self.remember_page(
+            page,
+            description_hash=description_hash(job_description) if job_description and description_complete else None
+        )
+        self.index_posting(page, position, company, posting_url, match,
+                           work_arrangement, country, budget, job_description)
+    
+    def record_updated(self, page: Dict, position: str, company: str, posting_url: str,
+                       match: Optional[str], work_arrangement: Optional[str],
+                       country: Optional[str], budget: Optional[float],
+                       job_description: Optional[str]) -> None:
+        """Update the posting index and search index after a page was updated."""
+        job_id = extract_linkedin_job_id(posting_url)
+        if job_id is not None and self.posting_index:
+            self.posting_index.add(job_id, page['id'])
+        self.index_posting(page, position, company, posting_url, match,
+                           work_arrangement, country, budget, job_description)
+    
+    def index_posting(self, page: Dict, position: str, company: str, posting_url: str,
+                       match: Optional[str], work_arrangement: Optional[str],
+                       country: Optional[str], budget: Optional[float],
+                       job_description: Optional[str]) -> None:
+        """Add a saved posting to the search index (a failure here does not fail the save)."""
+        if not self.search_index:
+            return
+        try:
+            self.search_index.upsert(
+                page['id'],
+                page_url=page.get('url'),
+                position=position,
+                company=company,
+                posting_url=posting_url,
+                match=match,
+                work_arrangement=work_arrangement,
+                country=country,
+                budget=budget,
+                description=job_description
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error indexing page {page['id']} for search: {e}")
+    
+    def backfill_search_index(self, reindex: bool = False) -> int:
+        """Index postings saved before the search index existed.
+        
+        Pages through the Job Applications database and reads the blocks of
+        every page not indexed yet (every page with reindex), a few pages at
+        a time on the worker pool. Company names come from one pass over the
+        Companies database. Indexed pages are skipped, so an interrupted
+        backfill picks up where it stopped when run again.
+        
+        Args:
+            reindex: Re-read pages that are already indexed
+            
+        Returns:
+            Number of pages indexed
+        """
+        if not self.search_index:
+            return 0
+        
+        company_names = {}
+        if self.companies_database_id:
+            for page in iterate_paginated_api(
+                self.client.databases.query,
+                database_id=self.companies_database_id,
+                page_size=100
+            ):
+                company_names[page['id'].replace('-', '')] = \
+                    property_value(page.get('properties', {}).get('Name'))
+        
+        def index(page: Dict) -> None:
+            properties = {
+                name: property_value(prop)
+                for name, prop in page.get('properties', {}).items()
+            }
+            company_ids = properties.get('Company') or []
+            description = description_text(self.list_child_blocks(page['id']))
+            self.search_index.upsert(
+                page['id'],
+                page_url=page.get('url'),
+                position=properties.get('Position'),
+                company=company_names.get(company_ids[0]) if company_ids else None,
+                posting_url=properties.get('Posting URL'),
+                match=properties.get('Match'),
+                work_arrangement=properties.get('Work Arrangement'),
+                country=properties.get('Country'),
+                budget=properties.get('Budget'),
+                description=description or None
+            )
+        
+        indexed = 0
+        pending: List[Dict] = []
+        for page in iterate_paginated_api(
+            self.client.databases.query,
+            database_id=self.database_id,
+            page_size=100
+        ):
+            if reindex or not self.search_index.contains(page['id']):
+                pending.append(page)
+            if len(pending) >= 100:
+                indexed += len(list(self._executor.map(index, pending)))
+                pending = []
+                logger.info(f"Search index backfill: {indexed} pages indexed")
+        indexed += len(list(self._executor.map(index, pending)))
+        
+        logger.info(f"Search index backfill finished: {indexed} pages indexed")
+        return indexed
+    
     def create_job_posting(self, position: str, company: str, 
                           posting_url: str, origin: str = 'LinkedIn',
                           match: Optional[str] = None,
@@ -172,142 +873,188 @@ class NotionService:
         # Find or create company in Companies database
         company_id = self.find_or_create_company(company)
         
-        properties = {
-            "Position": {
-                "title": [
-                    {
-                        "text": {
-                            "content": position
-                        }
-                    }
-                ]
-            },
-            "Posting URL": {
-                "url": posting_url
-            },
-            "Source": {
-                "select": {
-                    "name": "LinkedIn"
-                }
-            },
-            "Origin": {
-                "select": {
-                    "name": "Applied"
-                }
-            }
-        }
-        
-        # Add Company as relation if we have a company_id
-        if company_id:
-            properties["Company"] = {
-                "relation": [
-                    {
-                        "id": company_id
-                    }
-                ]
-            }
+        return self._create_job_posting_page(
+            company_id, position, company, posting_url, match, work_arrangement,
+            demand, budget, job_description, city, country
+        )
+    
+    def create_job_posting_if_new(self, position: str, company: str,
+                                  posting_url: str, origin: str = 'LinkedIn',
+                                  match: Optional[str] = None,
+                                  work_arrangement: Optional[str] = None,
+                                  demand: Optional[str] = None,
+                                  budget: Optional[float] = None,
+                                  job_description: Optional[str] = None,
+                                  city: Optional[str] = None,
+                                  country: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """Check for a duplicate and create the job posting if there is none.
         
-        # Add optional fields if provided
-        if match:
-            properties["Match"] = {
-                "select": {
-                    "name": match
-                }
-            }
+        The duplicate check and the company lookup do not depend on each
+        other, so an uncached company is queried on the worker pool while the
+        duplicate check runs. Only read-only calls overlap: a missing company
+        is created after the posting is known to be new, and the lookup is
+        cancelled (or its result dropped) when a duplicate is found.
         
-        if work_arrangement:
-            properties["Work Arrangement"] = {
-                "select": {
-                    "name": work_arrangement
-                }
-            }
+        Takes the same arguments as create_job_posting.
         
-        if demand:
-            properties["Demand"] = {
-                "select": {
-                    "name": demand
-                }
-            }
+        Returns:
+            Tuple of (created_page, existing_page_id); exactly one is set
+        """
+        company_lookup = None
+        if self.companies_database_id and not self.company_cache.get(company):
+            company_lookup = self._executor.submit(self._find_company, company)
         
-        if budget is not None:
-            properties["Budget"] = {
-                "number": budget
-            }
+        try:
+            existing_page_id = self.check_duplicate(posting_url, fresh=True)
+        except Exception:
+            if company_lookup:
+                company_lookup.cancel()
+            raise
+        if existing_page_id:
+            if company_lookup:
+                company_lookup.cancel()
+            return None, existing_page_id
         
-        # City is multi_select, not rich_text
-        if city:
-            properties["City"] = {
-                "multi_select": [
-                    {
-                        "name": city
-                    }
-                ]
-            }
+        company_id = self._resolve_company(company, company_lookup)
         
-        if country:
-            properties["Country"] = {
-                "select": {
-                    "name": country
-                }
-            }
+        page = self._create_job_posting_page(
+            company_id, position, company, posting_url, match, work_arrangement,
+            demand, budget, job_description, city, country
+        )
+        return page, None
+    
+    def _create_job_posting_page(self, company_id: Optional[str], position: str, company: str,
+                                 posting_url: str, match: Optional[str],
+                                 work_arrangement: Optional[str], demand: Optional[str],
+                                 budget: Optional[float], job_description: Optional[str],
+                                 city: Optional[str], country: Optional[str]) -> Dict:
+        """Create the job posting page once its company has been resolved."""
+        properties = self.posting_properties(company_id, position, posting_url, match,
+                                             work_arrangement, demand, budget, city, country)
         
         logger.info(f"Creating Notion page for: {position} at {company}")
         
-        # Prepare page content (children) for job description
-        children = []
-        if job_description:
-            # Place job description inside a callout block
-            # Split into 2000-char chunks for each rich_text item
-            description_chunks = [job_description[i:i+2000] 
-                                for i in range(0, len(job_description), 2000)]
-            
-            children.append({
-                "object": "block",
-                "type": "callout",
-                "callout": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": chunk
-                            }
-                        }
-                        for chunk in description_chunks
-                    ],
-                    "icon": {
-                        "type": "external",
-                        "external": {
-                            "url": "https://www.notion.so/icons/description_gray.svg"
-                        }
-                    },
-                    "color": "default"
-                }
-            })
-        
+        batches = description_batches(job_description)
         try:
-            # Create page without template (set icon and children directly)
-            page_data = {
-                "parent": {"database_id": self.database_id},
-                "icon": {
-                    "type": "external",
-                    "external": {
-                        "url": "https://www.notion.so/icons/share_gray.svg"
-                    }
-                },
-                "properties": properties
-            }
-            
-            # Add children (page content) if we have job description
-            if children:
-                page_data["children"] = children
-            
-            response = self.client.pages.create(**page_data)
-            
+            response = self.client.pages.create(
+                **job_posting_page_data(self.database_id, properties, batches[0] if batches else None)
+            )
+            complete = self._append_description_overflow(response['id'], batches[1:])
+            self.record_created(response, position, company, posting_url, match,
+                                work_arrangement, country, budget, job_description, complete)
             return response
         except APIResponseError as e:
             logger.error(f"Error creating Notion page: {e}")
             raise
     
+    def list_child_blocks(self, block_id: str) -> List[Dict]:
+        """Return every child block of a block or page, following pagination."""
+        return list(iterate_paginated_api(
+            self.client.blocks.children.list,
+            block_id=block_id,
+            page_size=100
+        ))
+    
+    def _append_blocks(self, parent_id: str, batches: List[List[Dict]]) -> List[str]:
+        """Append batches of blocks in order, one call per batch; returns the new block IDs."""
+        block_ids = []
+        for batch in batches:
+            response = self.client.blocks.children.append(block_id=parent_id, children=batch)
+            block_ids.extend(block['id'] for block in response.get('results', []))
+        return block_ids
+    
+    def _append_description_overflow(self, page_id: str, batches: List[List[Dict]]) -> bool:
+        """Append the description blocks that did not fit in pages.create.
+        
+        Returns:
+            False if appending failed (the page is saved with a partial
+            description that the next update rewrites)
+        """
+        if not batches:
+            return True
+        try:
+            self._append_blocks(page_id, batches)
+            return True
+        except APIResponseError as e:
+            logger.error(f"Page {page_id} created but appending its description failed: {e}")
+            return False
+    
+    def replace_blocks(self, parent_id: str, blocks: List[Dict]) -> Dict:
+        """Make blocks the children of a page or block using as few calls as possible.
+        
+        The current children are listed across all pages of results and
+        compared with blocks (see diff_blocks): children whose text changed
+        are updated in place and surplus children deleted, both concurrently
+        on the service's worker pool (each call still goes through the shared
+        rate limiter), and missing blocks are appended in batches of up to
+        100 blocks that stay within Notion's request size limit. Unchanged
+        children cost nothing beyond listing them.
+        
+        Notion errors on individual calls are reported rather than raised.
+        Appending stops at the first failed batch so blocks are never added
+        out of order.
+        
+        Args:
+            parent_id: Page or block ID whose children are replaced
+            blocks: New child blocks
+            
+        Returns:
+            Report of the replacement:
+            {"updated": [block_id, ...], "deleted": [block_id, ...],
+             "appended": [block_id, ...],
+             "failed": [{"block_id": "...", "operation": "update|delete|append",
+                         "error": "..."}, ...]}
+        """
+        updates, deletes, appends = diff_blocks(self.list_child_blocks(parent_id), blocks)
+        report = new_block_report()
+        if not (updates or deletes or appends):
+            return report
+        
+        def update(item):
+            block_id, arguments = item
+            try:
+                self.client.blocks.update(block_id=block_id, **arguments)
+                return block_id, None
+            except APIResponseError as e:
+                return block_id, str(e)
+        
+        def delete(block_id):
+            try:
+                self.client.blocks.delete(block_id=block_id)
+                return block_id, None
+            except APIResponseError as e:
+                return block_id, delete_error(e)
+        
+        record_block_outcomes(report, 'update', self._executor.map(update, updates))
+        record_block_outcomes(report, 'delete', self._executor.map(delete, deletes))
+        for batch in batch_blocks(appends):
+            try:
+                response = self.client.blocks.children.append(block_id=parent_id, children=batch)
+            except APIResponseError as e:
+                report["failed"].append({"block_id": parent_id, "operation": "append", "error": str(e)})
+                break
+            report["appended"].extend(block['id'] for block in response.get('results', []))
+        
+        log_block_failures(report)
+        return report
+    
+    def _write_description(self, page_id: str, job_description: str) -> Dict:
+        """Make the page content the job description (see replace_blocks).
+        
+        The description is planned as one block per paragraph.
+        
+        Args:
+            page_id: Notion page ID
+            job_description: New job description text
+            
+        Returns:
+            Report of the block replacement; the description is only
+            complete when its "failed" list is empty
+        """
+        report = self.replace_blocks(page_id, description_blocks(plan_description(job_description)))
+        logger.info(f"Job description written: {block_report_summary(report)}")
+        return report
+    
     def update_job_posting(self, page_id: str, position: str, company: str, 
                           posting_url: str, origin: str = 'LinkedIn',
                           match: Optional[str] = None,
@@ -319,6 +1066,11 @@ class NotionService:
                           country: Optional[str] = None) -> Dict:
         """Update existing job posting entry in Notion database.
         
+        Only properties whose value differs from the current page state
+        (cached, or retrieved on a cache miss) are sent, and the page update
+        is skipped entirely when nothing changed. The description is compared
+        by hash and its blocks are only rewritten when it changed.
+        
         Args:
             page_id: Notion page ID to update
             position: Job title
@@ -334,143 +1086,48 @@ class NotionService:
             country: Country location - optional
             
         Returns:
-            Updated page object from Notion API
+            Updated page object from Notion API (id and url at least), with
+            "description_report" set to the replace_blocks report when the
+            description was rewritten (None otherwise)
         """
         # Find or create company in Companies database
         company_id = self.find_or_create_company(company)
         
-        properties = {
-            "Position": {
-                "title": [
-                    {
-                        "text": {
-                            "content": position
-                        }
-                    }
-                ]
-            },
-            "Posting URL": {
-                "url": posting_url
-            },
-            "Source": {
-                "select": {
-                    "name": "LinkedIn"
-                }
-            },
-            "Origin": {
-                "select": {
-                    "name": "Applied"
-                }
-            }
-        }
-        
-        # Add Company as relation if we have a company_id
-        if company_id:
-            properties["Company"] = {
-                "relation": [
-                    {
-                        "id": company_id
-                    }
-                ]
-            }
-        
-        # Add optional fields if provided
-        if match:
-            properties["Match"] = {
-                "select": {
-                    "name": match
-                }
-            }
-        
-        if work_arrangement:
-            properties["Work Arrangement"] = {
-                "select": {
-                    "name": work_arrangement
-                }
-            }
-        
-        if demand:
-            properties["Demand"] = {
-                "select": {
-                    "name": demand
-                }
-            }
-        
-        if budget is not None:
-            properties["Budget"] = {
-                "number": budget
-            }
-        
-        # City is multi_select, not rich_text
-        if city:
-            properties["City"] = {
-                "multi_select": [
-                    {
-                        "name": city
-                    }
-                ]
-            }
-        
-        if country:
-            properties["Country"] = {
-                "select": {
-                    "name": country
-                }
-            }
+        properties = self.posting_properties(company_id, position, posting_url, match,
+                                             work_arrangement, demand, budget, city, country)
         
         logger.info(f"Updating Notion page: {page_id}")
         
         try:
-            # Update page properties
-            response = self.client.pages.update(
-                page_id=page_id,
-                properties=properties
-            )
+            state = self._get_page_state(page_id)
+            changed = changed_properties(properties, state)
+            
+            if changed:
+                logger.info(f"Updating properties: {', '.join(changed)}")
+                response = self.client.pages.update(
+                    page_id=page_id,
+                    properties=changed
+                )
+                state = self.remember_page(response)
+            else:
+                logger.info("Properties unchanged, skipping page update")
+                response = {"id": state['id'], "url": state['url']}
             
             # If job description provided, update page content
+            report = None
             if job_description:
-                # First, get existing blocks to delete them
-                blocks_response = self.client.blocks.children.list(block_id=page_id)
-                existing_blocks = blocks_response.get('results', [])
-                
-                # Delete existing blocks
-                for block in existing_blocks:
-                    try:
-                        self.client.blocks.delete(block_id=block['id'])
-                    except APIResponseError as e:
-                        logger.warning(f"Could not delete block {block['id']}: {e}")
-                
-                # Add new job description in callout block
-                description_chunks = [job_description[i:i+2000] 
-                                    for i in range(0, len(job_description), 2000)]
-                
-                self.client.blocks.children.append(
-                    block_id=page_id,
-                    children=[{
-                        "object": "block",
-                        "type": "callout",
-                        "callout": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {
-                                        "content": chunk
-                                    }
-                                }
-                                for chunk in description_chunks
-                            ],
-                            "icon": {
-                                "type": "external",
-                                "external": {
-                                    "url": "https://www.notion.so/icons/description_gray.svg"
-                                }
-                            },
-                            "color": "default"
-                        }
-                    }]
-                )
+                new_hash = description_hash(job_description)
+                if new_hash == state.get('description_hash'):
+                    logger.info("Job description unchanged, skipping block rewrite")
+                else:
+                    report = self._write_description(page_id, job_description)
+                    # A partly written description is rewritten by the next update
+                    state['description_hash'] = None if report['failed'] else new_hash
             
-            return response
+            self.record_updated(response, position, company, posting_url, match,
+                                work_arrangement, country, budget, job_description)
+            
+            return {**response, "description_report": report}
         except APIResponseError as e:
             logger.error(f"Error updating Notion page: {e}")
             raise
@@ -0,0 +1,149 @@
+"""In-memory index of saved job postings for fast duplicate checks."""
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PostingIndex:
+    """Maps LinkedIn job IDs to Notion page IDs for the Job Applications database.
+
+    The index is built by paging through the whole database and then kept
+    current by recording every successful create/update made through the
+    backend. A background thread rebuilds it periodically so pages added or
+    removed directly in Notion are picked up. Lookups are only answered while
+    the index is fresh; a cold or stale index tells the caller to fall back to
+    a live query.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Tuple[Optional[int], str]]],
+                 refresh_interval: float = 300,
+                 max_staleness: float = 900):
+        """Initialize an empty index.
+
+        Args:
+            loader: Callable yielding (job_id, page_id) for every page
+            refresh_interval: Seconds between background rebuilds
+            max_staleness: Seconds after the last successful build during
+                which lookups are answered from memory
+        """
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+
+        self._lock = threading.Lock()
+        self._entries: Dict[int, str] = {}
+        self._pending: Optional[Dict[int, str]] = None
+        self._built_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+
+    def is_ready(self) -> bool:
+        """Return True when the index is built and within the staleness window."""
+        built_at = self._built_at
+        return built_at is not None and time.monotonic() - built_at <= self.max_staleness
+
+    def lookup(self, job_id: int) -> tuple[bool, Optional[str]]:
+        """Look up a LinkedIn job ID.
+
+        Args:
+            job_id: Numeric LinkedIn job ID
+
+        Returns:
+            Tuple of (answered, page_id). When answered is False the index is
+            cold or stale and the caller must query Notion instead.
+        """
+        if not self.is_ready():
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, self._entries.get(job_id)
+
+    def add(self, job_id: int, page_id: str) -> None:
+        """Record a posting saved through the backend."""
+        with self._lock:
+            self._entries[job_id] = page_id
+            if self._pending is not None:
+                self._pending[job_id] = page_id
+
+    def entries(self) -> Dict[int, str]:
+        """Return a copy of the indexed job ID -> page ID entries."""
+        with self._lock:
+            return dict(self._entries)
+
+    def restore(self, entries: Dict[int, str]) -> None:
+        """Load entries known to be current (e.g. a reconciled snapshot) and mark the index built."""
+        with self._lock:
+            self._entries = dict(entries)
+            self._built_at = time.monotonic()
+        logger.info(f"Posting index restored with {len(entries)} entries")
+
+    def rebuild(self) -> bool:
+        """Reload the full index from Notion and swap it in atomically.
+
+        Writes recorded while the rebuild is running are replayed on top of
+        the freshly loaded entries so they are not lost.
+
+        Returns:
+            True if the rebuild succeeded, False otherwise
+        """
+        with self._lock:
+            self._pending = {}
+
+        started = time.monotonic()
+        try:
+            entries = {job_id: page_id for job_id, page_id in self._loader() if job_id is not None}
+        except Exception as e:
+            logger.error(f"Posting index rebuild failed: {e}")
+            with self._lock:
+                self._pending = None
+            return False
+
+        with self._lock:
+            entries.update(self._pending or {})
+            self._entries = entries
+            self._pending = None
+            self._built_at = started
+
+        logger.info(f"Posting index rebuilt with {len(entries)} entries "
+                    f"in {time.monotonic() - started:.2f}s")
+        return True
+
+    def start(self, initial_delay: float = 0) -> None:
+        """Build the index and keep refreshing it in a daemon thread.
+
+        Args:
+            initial_delay: Seconds to wait before the first build (for an
+                index that was restored and is already current)
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(initial_delay,),
+                                        name="posting-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+
+    def _run(self, initial_delay: float) -> None:
+        if initial_delay > 0:
+            self._stop.wait(initial_delay)
+        while not self._stop.is_set():
+            self.rebuild()
+            self._stop.wait(self.refresh_interval)
+
+    def stats(self) -> Dict:
+        """Return size and freshness information about the index."""
+        built_at = self._built_at
+        return {
+            "ready": self.is_ready(),
+            "entries": len(self._entries),
+            "age_seconds": None if built_at is None else round(time.monotonic() - built_at, 3),
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,165 @@
+"""Token bucket rate limiting for Notion API calls."""
+from typing import Dict, Optional
+import sqlite3
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every Notion call in the process.
+
+    Callers reserve a token and are told how long to wait before using it.
+    Reservations may drive the bucket into debt, which queues callers in
+    arrival order and spreads a burst out at the configured rate instead of
+    letting it through and failing with 429s.
+    """
+
+    # reserve() and pause() only take an in-memory lock
+    blocking = False
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = self._now()
+        self._pause_until = 0.0
+
+        self.reservations = 0
+        self.delayed = 0
+        self.wait_seconds = 0.0
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def _take(self, now: float, tokens: float, updated: float, pause_until: float) -> tuple[float, float]:
+        """Refill, take one token and compute the wait.
+
+        Returns:
+            Tuple of (remaining_tokens, wait_seconds)
+        """
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate) - 1
+        wait = max(0.0, -tokens / self.rate, pause_until - now)
+        return tokens, wait
+
+    def reserve(self) -> float:
+        """Reserve a token.
+
+        Returns:
+            Seconds the caller must wait before making its request
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._now()
+            self._tokens, wait = self._take(now, self._tokens, self._updated, self._pause_until)
+            self._updated = now
+            self._record(wait)
+        return wait
+
+    def acquire(self) -> float:
+        """Reserve a token and sleep until it may be used.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given number of seconds (e.g. after a 429)."""
+        with self._lock:
+            self._pause_until = max(self._pause_until, self._now() + seconds)
+
+    def _record(self, wait: float) -> None:
+        self.reservations += 1
+        if wait > 0:
+            self.delayed += 1
+            self.wait_seconds += wait
+
+    def stats(self) -> Dict:
+        """Return reservation and wait counters."""
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "reservations": self.reservations,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_seconds, 3)
+        }
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state lives in a SQLite file shared by worker processes.
+
+    Each reservation runs in an immediate transaction, so the SQLite write
+    lock serializes processes the same way the in-process lock serializes
+    threads. Wait counters remain per process.
+    """
+
+    # reserve() and pause() write the state file, so async callers run them in a thread
+    blocking = True
+
+    def __init__(self, path: str, rate: float, capacity: Optional[float] = None):
+        """Initialize the bucket, creating the state file if needed.
+
+        Args:
+            path: SQLite file holding the shared bucket state
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to rate)
+        """
+        super().__init__(rate, capacity)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated REAL, pause_until REAL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO bucket VALUES (1, ?, ?, 0)", (self.capacity, self._now())
+            )
+
+    def _now(self) -> float:
+        # Wall clock, so timestamps are comparable between processes
+        return time.time()
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn()
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+
+        def take():
+            tokens, updated, pause_until = self._conn.execute(
+                "SELECT tokens, updated, pause_until FROM bucket WHERE id = 1"
+            ).fetchone()
+            now = self._now()
+            tokens, wait = self._take(now, tokens, updated, pause_until)
+            self._conn.execute("UPDATE bucket SET tokens = ?, updated = ? WHERE id = 1", (tokens, now))
+            self._record(wait)
+            return wait
+
+        return self._transaction(take)
+
+    def pause(self, seconds: float) -> None:
+        until = self._now() + seconds
+        self._transaction(lambda: self._conn.execute(
+            "UPDATE bucket SET pause_until = MAX(pause_until, ?) WHERE id = 1", (until,)
+        ))
@@ -0,0 +1,257 @@
+"""Write-behind queue for job posting saves backed by a durable SQLite journal."""
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Journal entry states
+QUEUED = 'queued'
+PROCESSING = 'processing'
+FINISHED_STATES = ('completed', 'duplicate', 'failed')
+
+
+class SaveQueue:
+    """Durable queue that drains saved job postings into Notion in the background.
+
+    Each submitted payload is committed to a SQLite journal before the caller
+    gets its job ID, so pending saves survive a restart. A pool of worker
+    threads claims queued entries and hands them to the process function,
+    which returns a result dict whose 'state' is one of 'completed',
+    'duplicate' or 'failed'. If the process function raises, the entry is
+    retried with exponential backoff until max_attempts is reached.
+
+    A claimed entry is leased to its queue (one per process) for lease
+    seconds, and a heartbeat thread keeps renewing the leases of entries the
+    queue is still working on. Several processes can share one journal: an
+    entry is only taken over once its lease has expired, i.e. the process
+    that claimed it crashed or hung, never while its owner is still alive.
+    """
+
+    def __init__(self, path: str, process: Callable[[Dict], Dict],
+                 workers: int = 2, max_attempts: int = 5,
+                 retry_delay: float = 5.0, retention: float = 86400,
+                 lease: float = 300):
+        """Open (or create) the journal.
+
+        Args:
+            path: SQLite journal file
+            process: Function that saves one payload to Notion and returns its result
+            workers: Number of worker threads draining the journal
+            max_attempts: Attempts before an entry is marked failed
+            retry_delay: Base delay in seconds between attempts
+            retention: Seconds finished entries are kept for status lookups
+            lease: Seconds a claimed entry stays reserved without a heartbeat
+        """
+        self.path = path
+        self._process = process
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS saves ("
+            "id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, result TEXT, error TEXT, "
+            "owner TEXT, lease_until REAL)"
+        )
+        # Journals written before leases existed
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(saves)")}
+        for column, kind in (('owner', 'TEXT'), ('lease_until', 'REAL')):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE saves ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS saves_state ON saves (state, next_attempt_at)")
+
+    def submit(self, payload: Dict) -> str:
+        """Journal a payload for saving.
+
+        Args:
+            payload: Validated job posting request data
+
+        Returns:
+            Job ID for status lookups
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO saves (id, payload, state, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), QUEUED, now, now, now)
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the state of a journaled save, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, state, attempts, created_at, updated_at, result, error FROM saves WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row['id'],
+            "state": row['state'],
+            "attempts": row['attempts'],
+            "created_at": row['created_at'],
+            "updated_at": row['updated_at'],
+            "result": json.loads(row['result']) if row['result'] else None,
+            "error": row['error']
+        }
+
+    def pending_count(self) -> int:
+        """Return the number of entries not yet finished."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM saves WHERE state IN (?, ?)", (QUEUED, PROCESSING)
+            ).fetchone()[0]
+
+    def start(self) -> None:
+        """Start the worker threads and the lease heartbeat.
+
+        Entries whose lease has expired (their process crashed) are claimed
+        again by the workers like queued ones; entries leased to a live
+        process are left alone.
+        """
+        if self._threads:
+            return
+        with self._lock:
+            interrupted = self._conn.execute(
+                "SELECT COUNT(*) FROM saves WHERE state = ? AND COALESCE(lease_until, 0) < ?",
+                (PROCESSING, time.time())
+            ).fetchone()[0]
+        if interrupted:
+            logger.info(f"Recovering {interrupted} interrupted saves with expired leases")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"save-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="save-queue-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"Save queue started with {self.workers} workers ({self.pending_count()} pending)")
+
+    def stop(self) -> None:
+        """Ask worker threads to exit after their current entry."""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Atomically lease the oldest due or abandoned entry to this queue."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM saves "
+                    "WHERE (state = ? AND next_attempt_at <= ?) "
+                    "OR (state = ? AND COALESCE(lease_until, 0) < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, now, PROCESSING, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE saves SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE id = ?",
+                        (PROCESSING, self.owner, now + self.lease, now, row['id'])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row
+
+    def _finish(self, job_id: str, state: str, result: Optional[Dict] = None,
+                error: Optional[str] = None, next_attempt_at: Optional[float] = None) -> None:
+        """Record the outcome of an attempt and release the lease."""
+        now = time.time()
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE saves SET state = ?, result = ?, error = ?, next_attempt_at = ?, updated_at = ?, "
+                "owner = NULL, lease_until = NULL WHERE id = ? AND owner = ?",
+                (state, json.dumps(result) if result is not None else None, error,
+                 next_attempt_at or now, now, job_id, self.owner)
+            ).rowcount
+        if not updated:
+            logger.warning(f"Lease on queued save {job_id} expired before it finished; "
+                           f"its {state} result was dropped")
+
+    def _renew_leases(self) -> None:
+        """Extend the leases of every entry this queue is processing."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE saves SET lease_until = ? WHERE state = ? AND owner = ?",
+                (now + self.lease, PROCESSING, self.owner)
+            )
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self._renew_leases()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew save queue leases: {e}")
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.retention
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM saves WHERE state IN ({','.join('?' * len(FINISHED_STATES))}) "
+                "AND updated_at < ?",
+                (*FINISHED_STATES, cutoff)
+            )
+
+    def _run(self) -> None:
+        last_purge = 0.0
+        while not self._stop.is_set():
+            if time.time() - last_purge > 3600:
+                self._purge()
+                last_purge = time.time()
+
+            row = self._claim()
+            if row is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+
+            job_id, attempts = row['id'], row['attempts'] + 1
+            try:
+                result = self._process(json.loads(row['payload']))
+                self._finish(job_id, result.get('state', 'completed'), result=result,
+                             error=result.get('error'))
+            except Exception as e:
+                if attempts >= self.max_attempts:
+                    logger.error(f"Queued save {job_id} failed after {attempts} attempts: {e}")
+                    self._finish(job_id, 'failed', error=str(e))
+                else:
+                    delay = self.retry_delay * (2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+                    # Not before a fast-failing dependency (e.g. an open circuit breaker) is retried
+                    delay = max(delay, getattr(e, 'retry_after', 0))
+                    logger.warning(f"Queued save {job_id} failed (attempt {attempts}), "
+                                   f"retrying in {delay:.1f}s: {e}")
+                    self._finish(job_id, QUEUED, error=str(e), next_attempt_at=time.time() + delay)
@@ -0,0 +1,214 @@
+"""Full-text index of saved job postings backed by SQLite FTS5."""
+from typing import Dict, List, Optional, Tuple
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Column weights for bm25 ranking: position, company, description
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Characters FTS5 treats as part of a word
+_TERM_PATTERN = re.compile(r"\w+\*?")
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Every word is quoted so FTS5 operators and punctuation in user input
+    cannot break the query; a trailing * keeps its prefix meaning.
+
+    Returns:
+        The FTS5 query, or None if the text has no words
+    """
+    terms = []
+    for term in _TERM_PATTERN.findall(text or ''):
+        prefix = term.endswith('*')
+        word = term.rstrip('*')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return ' '.join(terms) or None
+
+
+class SearchIndex:
+    """Inverted index over the position, company and description of postings.
+
+    Postings are written as they are saved or updated through the backend
+    and by a one-time backfill of pages saved before the index existed.
+    Searches are ranked with bm25 and can be narrowed by match, work
+    arrangement, country and budget range.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the index.
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "rowid INTEGER PRIMARY KEY, page_id TEXT NOT NULL UNIQUE, page_url TEXT, position TEXT, "
+            "company TEXT, posting_url TEXT, match TEXT, work_arrangement TEXT, country TEXT, "
+            "budget REAL, description TEXT, indexed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_indexed_at ON postings (indexed_at)")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5("
+            "position, company, description, content='postings', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def count(self) -> int:
+        """Return the number of indexed postings."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def contains(self, page_id: str) -> bool:
+        """Return True if a page is already indexed."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM postings WHERE page_id = ?", (page_id,)
+            ).fetchone() is not None
+
+    def upsert(self, page_id: str, page_url: Optional[str] = None, position: Optional[str] = None,
+               company: Optional[str] = None, posting_url: Optional[str] = None,
+               match: Optional[str] = None, work_arrangement: Optional[str] = None,
+               country: Optional[str] = None, budget: Optional[float] = None,
+               description: Optional[str] = None) -> None:
+        """Index a posting, or update an indexed one.
+
+        Fields passed as None keep their indexed value, mirroring how an
+        update leaves omitted Notion properties and descriptions untouched.
+        """
+        fields = {
+            "page_url": page_url,
+            "position": position,
+            "company": company,
+            "posting_url": posting_url,
+            "match": match,
+            "work_arrangement": work_arrangement,
+            "country": country,
+            "budget": budget,
+            "description": description
+        }
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                existing = self._conn.execute(
+                    "SELECT * FROM postings WHERE page_id = ?", (page_id,)
+                ).fetchone()
+                if existing is not None:
+                    # External content tables need the old values to remove stale terms
+                    self._conn.execute(
+                        "INSERT INTO postings_fts (postings_fts, rowid, position, company, description) "
+                        "VALUES ('delete', ?, ?, ?, ?)",
+                        (existing['rowid'], existing['position'], existing['company'], existing['description'])
+                    )
+                    fields = {
+                        name: existing[name] if value is None else value
+                        for name, value in fields.items()
+                    }
+                cursor = self._conn.execute(
+                    "INSERT INTO postings (page_id, page_url, position, company, posting_url, match, "
+                    "work_arrangement, country, budget, description, indexed_at) "
+                    "VALUES (:page_id, :page_url, :position, :company, :posting_url, :match, "
+                    ":work_arrangement, :country, :budget, :description, :indexed_at) "
+                    "ON CONFLICT(page_id) DO UPDATE SET page_url = excluded.page_url, "
+                    "position = excluded.position, company = excluded.company, "
+                    "posting_url = excluded.posting_url, match = excluded.match, "
+                    "work_arrangement = excluded.work_arrangement, country = excluded.country, "
+                    "budget = excluded.budget, description = excluded.description, "
+                    "indexed_at = excluded.indexed_at "
+                    "RETURNING rowid",
+                    dict(fields, page_id=page_id, indexed_at=time.time())
+                )
+                rowid = cursor.fetchone()[0]
+                self._conn.execute(
+                    "INSERT INTO postings_fts (rowid, position, company, description) VALUES (?, ?, ?, ?)",
+                    (rowid, fields['position'], fields['company'], fields['description'])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(self, query: Optional[str] = None, match: Optional[str] = None,
+               work_arrangement: Optional[str] = None, country: Optional[str] = None,
+               budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Find postings matching all words of query and the given filters.
+
+        Args:
+            query: Keywords (all must match; word* matches a prefix). Without
+                keywords, filtered postings are listed newest first.
+            match: Only postings with this match level
+            work_arrangement: Only postings with this work arrangement
+            country: Only postings in this country (case-insensitive)
+            budget_min: Minimum budget (postings without a budget are excluded)
+            budget_max: Maximum budget (postings without a budget are excluded)
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Tuple of (results, total) where total counts every match
+        """
+        conditions: List[str] = []
+        params: List = []
+        for column, value in (('match', match), ('work_arrangement', work_arrangement)):
+            if value:
+                conditions.append(f"p.{column} = ?")
+                params.append(value)
+        if country:
+            conditions.append("p.country = ? COLLATE NOCASE")
+            params.append(country)
+        if budget_min is not None:
+            conditions.append("p.budget >= ?")
+            params.append(budget_min)
+        if budget_max is not None:
+            conditions.append("p.budget <= ?")
+            params.append(budget_max)
+
+        columns = ("p.page_id, p.page_url, p.position, p.company, p.posting_url, p.match, "
+                   "p.work_arrangement, p.country, p.budget")
+        match_query = fts_query(query)
+        if match_query:
+            source = "postings_fts f JOIN postings p ON p.rowid = f.rowid"
+            conditions.insert(0, "postings_fts MATCH ?")
+            params.insert(0, match_query)
+            weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+            select = (f"{columns}, bm25(postings_fts, {weights}) AS score, "
+                      f"snippet(postings_fts, 2, '**', '**', '…', 16) AS snippet")
+            order = "score"
+        else:
+            source = "postings p"
+            select = f"{columns}, NULL AS score, substr(p.description, 1, 200) AS snippet"
+            order = "p.indexed_at DESC"
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM {source} {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {select} FROM {source} {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            result = {key: row[key] for key in row.keys() if key != 'score'}
+            # bm25 scores are negative; larger is better for callers
+            result['score'] = None if row['score'] is None else round(-row['score'], 4)
+            results.append(result)
+        return results, total
+
+    def stats(self) -> Dict:
+        """Return the number of indexed postings."""
+        return {"entries": self.count()}
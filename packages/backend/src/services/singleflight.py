@@ -0,0 +1,98 @@
+"""Duplicate call suppression for concurrent requests."""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import threading
+
+
+class _Call:
+    """A call in flight that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still running block until it finishes and receive the same result (or the
+    same exception). Once the call completes the key is forgotten, so the next
+    caller starts a fresh execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the call already running for key.
+
+        Args:
+            key: Identifies calls that can share a result
+            fn: Function to run when no call for key is in flight
+
+        Returns:
+            The result of fn
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop.
+
+    Callers arriving while the leader's call is in flight await the same
+    future instead of blocking a thread. A waiter being cancelled does not
+    cancel the shared call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() for key, or the call already running for key.
+
+        Args:
+            key: Identifies calls that can share a result
+            fn: Coroutine function to run when no call for key is in flight
+
+        Returns:
+            The result of fn
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        return len(self._calls)
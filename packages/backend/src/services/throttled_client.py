@@ -0,0 +1,366 @@
+"""Notion client with rate limiting and retries applied to every request."""
+from notion_client import AsyncClient, Client
+from notion_client.errors import APIResponseError, HTTPResponseError, RequestTimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import itertools
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, is_outage
+from .http_transport import pool_stats
+from .metrics import REGISTRY
+from .rate_limiter import TokenBucket
+from .tracing import record_span
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying when the request is safe to repeat
+RETRYABLE_STATUSES = {409, 500, 502, 503, 504}
+
+NOTION_REQUEST_SECONDS = REGISTRY.histogram(
+    'notion_request_duration_seconds',
+    'Time spent in a Notion API call, including throttling and retries',
+    ['method']
+)
+NOTION_ERRORS = REGISTRY.counter(
+    'notion_request_errors_total',
+    'Notion API calls that failed after retries',
+    ['method', 'code']
+)
+NOTION_RETRIES = REGISTRY.counter(
+    'notion_request_retries_total',
+    'Notion API attempts that were retried',
+    ['method']
+)
+NOTION_IN_FLIGHT = REGISTRY.gauge(
+    'notion_requests_in_flight',
+    'Notion API calls currently waiting on throttling or a response'
+)
+
+# Notion endpoint paths with the object ID replaced, mapped per HTTP method
+_ENDPOINT_NAMES = {
+    ('databases/*/query', 'POST'): 'databases.query',
+    ('databases/*', 'GET'): 'databases.retrieve',
+    ('databases/*', 'PATCH'): 'databases.update',
+    ('pages', 'POST'): 'pages.create',
+    ('pages/*', 'GET'): 'pages.retrieve',
+    ('pages/*', 'PATCH'): 'pages.update',
+    ('blocks/*/children', 'GET'): 'blocks.children.list',
+    ('blocks/*/children', 'PATCH'): 'blocks.children.append',
+    ('blocks/*', 'GET'): 'blocks.retrieve',
+    ('blocks/*', 'PATCH'): 'blocks.update',
+    ('blocks/*', 'DELETE'): 'blocks.delete',
+    ('search', 'POST'): 'search',
+}
+
+
+class CallCounter:
+    """Number of Notion calls made on behalf of one HTTP request."""
+
+    def __init__(self):
+        # next() on itertools.count is atomic, so executor threads can share it
+        self._calls = itertools.count(1)
+        self.count = 0
+
+    def increment(self) -> None:
+        self.count = next(self._calls)
+
+
+_call_counter: ContextVar[Optional[CallCounter]] = ContextVar('notion_call_counter', default=None)
+
+
+def count_calls() -> CallCounter:
+    """Start counting the Notion calls made from the current context.
+
+    The counter is inherited by tasks and by work submitted through a
+    ContextExecutor, so calls fanned out by a request are included.
+    """
+    counter = CallCounter()
+    _call_counter.set(counter)
+    return counter
+
+
+class ContextExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that runs work in a copy of the submitter's context."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Return the notion_client method name for a request (e.g. 'pages.create').
+
+    Object IDs are dropped so metric labels stay low-cardinality.
+    """
+    parts = path.strip('/').split('/')
+    pattern = '/'.join(part if i % 2 == 0 else '*' for i, part in enumerate(parts))
+    return _ENDPOINT_NAMES.get((pattern, method), f"{parts[0]}.{method.lower()}")
+
+
+def is_idempotent(method: str, path: str) -> bool:
+    """Return True if repeating the request cannot create duplicate content.
+
+    Database queries are POSTs but only read; page creation and block
+    appends are the calls that must not be replayed blindly.
+    """
+    if method in ('GET', 'DELETE'):
+        return True
+    if method == 'POST':
+        return path.endswith('/query')
+    if method == 'PATCH':
+        return not path.endswith('/children')
+    return False
+
+
+def retry_after_seconds(error: HTTPResponseError) -> Optional[float]:
+    """Parse the Retry-After header of a Notion error response, if any."""
+    value = error.headers.get('Retry-After') if getattr(error, 'headers', None) else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class _RetryPolicy:
+    """Throttling and retry bookkeeping shared by the sync and async clients."""
+
+    def _init_policy(self, bucket: TokenBucket, max_retries: int,
+                     base_delay: float, max_delay: float,
+                     breaker: Optional[CircuitBreaker]) -> None:
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._stats_lock = threading.Lock()
+        self.retries = 0
+        self.rate_limited = 0
+        self.backoff_seconds = 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _admit(self) -> bool:
+        """Pass the circuit breaker before an attempt (raises CircuitOpenError while open)."""
+        return self.breaker.admit() if self.breaker is not None else False
+
+    def _settle(self, trial: bool, error: Optional[BaseException]) -> None:
+        """Report the outcome of an attempt to the circuit breaker."""
+        if self.breaker is not None:
+            self.breaker.record(trial, is_outage(error))
+
+    def _retry_delay(self, error: Exception, method: str, path: str, attempt: int) -> Optional[float]:
+        """Return how long to wait before retrying, or None to give up."""
+        if attempt >= self.max_retries:
+            return None
+        # An attempt that just opened the circuit is not retried into it
+        if self.breaker is not None and self.breaker.is_open():
+            return None
+
+        if isinstance(error, APIResponseError) and error.code == 'rate_limited':
+            with self._stats_lock:
+                self.rate_limited += 1
+            retry_after = retry_after_seconds(error)
+            if retry_after is None:
+                delay = self._backoff(attempt)
+            else:
+                delay = retry_after + random.uniform(0, self.base_delay)
+            self.bucket.pause(delay)
+            return delay
+
+        if not is_idempotent(method, path):
+            return None
+        if isinstance(error, RequestTimeoutError):
+            return self._backoff(attempt)
+        if isinstance(error, HTTPResponseError) and error.status in RETRYABLE_STATUSES:
+            return retry_after_seconds(error) or self._backoff(attempt)
+        return None
+
+    def _record_retry(self, error: Exception, method: str, path: str,
+                      attempt: int, delay: float) -> None:
+        logger.warning(f"Notion {method} {path} failed ({error}), "
+                       f"retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+        NOTION_RETRIES.labels(endpoint_name(method, path)).inc()
+        with self._stats_lock:
+            self.retries += 1
+            self.backoff_seconds += delay
+
+    @staticmethod
+    def _record_call(method: str, path: str, started: float, error: Optional[Exception]) -> None:
+        counter = _call_counter.get()
+        # Calls failed fast by the circuit breaker never reached Notion
+        if counter is not None and not isinstance(error, CircuitOpenError):
+            counter.increment()
+        endpoint = endpoint_name(method, path)
+        NOTION_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        record_span(f"notion {endpoint}", started, error, method=method, path=path)
+        if error is not None:
+            code = getattr(error, 'code', None) or type(error).__name__
+            NOTION_ERRORS.labels(endpoint, code).inc()
+
+    def stats(self) -> Dict:
+        """Return throttling and retry counters."""
+        return {
+            **self.bucket.stats(),
+            "retries": self.retries,
+            "rate_limited_responses": self.rate_limited,
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "http_pool": pool_stats(self.client),
+            "circuit_breaker": self.breaker.stats() if self.breaker is not None else None
+        }
+
+
+class ThrottledClient(_RetryPolicy, Client):
+    """notion_client.Client that throttles and retries every request.
+
+    All endpoint helpers (databases.query, pages.create, blocks.delete, ...)
+    funnel through Client.request, so overriding it applies the shared token
+    bucket and the retry policy to every call NotionService makes.
+
+    Rate limited responses (429) are retried for any request after the
+    server's Retry-After delay, and the whole bucket is paused so other
+    threads back off too. Server errors and timeouts are retried with
+    jittered exponential backoff only for requests that are safe to repeat.
+    """
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0,
+                 timeout: Optional[httpx.Timeout] = None,
+                 breaker: Optional[CircuitBreaker] = None, **kwargs: Any):
+        """Initialize the client.
+
+        Args:
+            bucket: Token bucket shared by all requests
+            max_retries: Maximum retries per request
+            base_delay: Initial backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay in seconds
+            timeout: Per-phase timeouts for the HTTP client (notion_client
+                otherwise applies its single timeout_ms to every phase)
+            breaker: Circuit breaker failing calls fast during Notion outages
+            **kwargs: Passed to notion_client.Client (auth, client, ...)
+        """
+        super().__init__(**kwargs)
+        if timeout is not None:
+            self.client.timeout = timeout
+        self._init_policy(bucket, max_retries, base_delay, max_delay, breaker)
+
+    def request(self, path: str, method: str,
+                query: Optional[Dict[Any, Any]] = None,
+                body: Optional[Dict[Any, Any]] = None,
+                auth: Optional[str] = None) -> Any:
+        """Send a throttled HTTP request, retrying transient failures."""
+        started = time.perf_counter()
+        NOTION_IN_FLIGHT.inc()
+        error = None
+        try:
+            attempt = 0
+            while True:
+                trial = self._admit()
+                self.bucket.acquire()
+                try:
+                    response = super().request(path, method, query, body, auth)
+                except (HTTPResponseError, RequestTimeoutError) as e:
+                    self._settle(trial, e)
+                    delay = self._retry_delay(e, method, path, attempt)
+                    if delay is None:
+                        raise
+                    self._record_retry(e, method, path, attempt, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException as e:
+                    self._settle(trial, e)
+                    raise
+                self._settle(trial, None)
+                return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            NOTION_IN_FLIGHT.dec()
+            self._record_call(method, path, started, error)
+
+
+class AsyncThrottledClient(_RetryPolicy, AsyncClient):
+    """notion_client.AsyncClient with the same throttling and retry policy as ThrottledClient.
+
+    Waits for the token bucket and between retries with asyncio.sleep, so a
+    throttled request never blocks the event loop; a bucket that keeps its
+    state in a file (SharedTokenBucket) is updated from a worker thread. The
+    bucket can be shared with a ThrottledClient so both stay within one
+    Notion rate limit.
+    """
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0,
+                 timeout: Optional[httpx.Timeout] = None,
+                 breaker: Optional[CircuitBreaker] = None, **kwargs: Any):
+        """Initialize the client.
+
+        Args:
+            bucket: Token bucket shared by all requests
+            max_retries: Maximum retries per request
+            base_delay: Initial backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay in seconds
+            timeout: Per-phase timeouts for the HTTP client
+            breaker: Circuit breaker (can be shared with a ThrottledClient)
+            **kwargs: Passed to notion_client.AsyncClient (auth, client, ...)
+        """
+        super().__init__(**kwargs)
+        if timeout is not None:
+            self.client.timeout = timeout
+        self._init_policy(bucket, max_retries, base_delay, max_delay, breaker)
+
+    async def _blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call a bucket operation, in a worker thread if the bucket does file I/O."""
+        if self.bucket.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def request(self, path: str, method: str,
+                      query: Optional[Dict[Any, Any]] = None,
+                      body: Optional[Dict[Any, Any]] = None,
+                      auth: Optional[str] = None) -> Any:
+        """Send a throttled HTTP request, retrying transient failures."""
+        started = time.perf_counter()
+        NOTION_IN_FLIGHT.inc()
+        error = None
+        try:
+            attempt = 0
+            while True:
+                trial = self._admit()
+                try:
+                    wait = await self._blocking(self.bucket.reserve)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    response = await super().request(path, method, query, body, auth)
+                except (HTTPResponseError, RequestTimeoutError) as e:
+                    self._settle(trial, e)
+                    # A 429 pauses the bucket
+                    delay = await self._blocking(self._retry_delay, e, method, path, attempt)
+                    if delay is None:
+                        raise
+                    self._record_retry(e, method, path, attempt, delay)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                except BaseException as e:
+                    self._settle(trial, e)
+                    raise
+                self._settle(trial, None)
+                return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            NOTION_IN_FLIGHT.dec()
+            self._record_call(method, path, started, error)
@@ -0,0 +1,287 @@
+"""Per-request traces of service methods and Notion calls, written to disk for debugging."""
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import cProfile
+import functools
+import inspect
+import itertools
+import json
+import os
+import pstats
+import re
+import threading
+import time
+
+# Request IDs double as file names, so only these characters are loaded
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Functions listed in a trace's profile summary
+PROFILE_TOP_FUNCTIONS = 25
+
+
+class Trace:
+    """Spans recorded while handling one request.
+
+    Spans may finish on several threads (executor work inherits the trace
+    through its context), so adding one is locked.
+    """
+
+    def __init__(self, request_id: str, method: str, path: str,
+                 client_request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.client_request_id = client_request_id
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.spans: List[Dict] = []
+        self._tokens: Optional[Tuple[Token, Token]] = None
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, span_id: int, parent: Optional[int], name: str, started: float,
+            finished: float, attributes: Dict, error: Optional[BaseException]) -> None:
+        """Record a finished span (times are time.perf_counter() values)."""
+        entry = {
+            "id": span_id,
+            "parent": parent,
+            "name": name,
+            "start_ms": round((started - self._origin) * 1000, 3),
+            "duration_ms": round((finished - started) * 1000, 3)
+        }
+        if attributes:
+            entry["attributes"] = attributes
+        if error is not None:
+            entry["error"] = getattr(error, 'code', None) or type(error).__name__
+        with self._lock:
+            self.spans.append(entry)
+
+    def to_dict(self, status: int) -> Dict:
+        """Return the trace as written to disk, spans ordered by start time."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['start_ms'])
+        trace = {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status": status,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self._origin) * 1000, 3),
+            "notion_calls": sum(1 for span in spans if span['name'].startswith('notion ')),
+            "spans": spans
+        }
+        if self.client_request_id is not None:
+            trace["client_request_id"] = self.client_request_id
+        return trace
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar('trace_span', default=None)
+
+
+def start_trace(request_id: str, method: str, path: str,
+                client_request_id: Optional[str] = None) -> Trace:
+    """Trace the rest of the work done in the current context.
+
+    Server threads are reused across requests, so every start_trace() must
+    be paired with end_trace() once the request is done.
+    """
+    trace = Trace(request_id, method, path, client_request_id)
+    trace._tokens = (_current_trace.set(trace), _current_span.set(None))
+    return trace
+
+
+def end_trace(trace: Trace) -> None:
+    """Stop tracing the current context, restoring what start_trace() replaced."""
+    if trace._tokens is None:
+        return
+    trace_token, span_token = trace._tokens
+    trace._tokens = None
+    try:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+    except ValueError:
+        # Ended from another context than it started in: clear this one instead
+        _current_span.set(None)
+        _current_trace.set(None)
+
+
+def record_span(name: str, started: float, error: Optional[BaseException] = None, **attributes: Any) -> None:
+    """Add a span that started at time.perf_counter() value started and ends now.
+
+    Does nothing outside a traced request.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(trace.next_id(), _current_span.get(), name, started, time.perf_counter(),
+                  attributes, error)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorate a function or coroutine function to record a span per call.
+
+    Outside a traced request the wrapper only reads a context variable.
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+    """
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                trace = _current_trace.get()
+                if trace is None:
+                    return await fn(*args, **kwargs)
+                span_id = trace.next_id()
+                parent = _current_span.get()
+                token = _current_span.set(span_id)
+                started = time.perf_counter()
+                error = None
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    _current_span.reset(token)
+                    trace.add(span_id, parent, span_name, started,
+                              time.perf_counter(), {}, error)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            span_id = trace.next_id()
+            parent = _current_span.get()
+            token = _current_span.set(span_id)
+            started = time.perf_counter()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                _current_span.reset(token)
+                trace.add(span_id, parent, span_name, started,
+                          time.perf_counter(), {}, error)
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(cls: type) -> type:
+    """Class decorator applying traced() to every method defined on the class.
+
+    Static methods, class methods, properties and dunder methods are left
+    alone; they are pure helpers that would only add noise to a trace.
+    Generators are skipped too, since a span would only time their creation.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('__') or not inspect.isfunction(value):
+            continue
+        if inspect.isgeneratorfunction(value) or inspect.isasyncgenfunction(value):
+            continue
+        setattr(cls, attr, traced()(value))
+    return cls
+
+
+def profile_summary(profile: cProfile.Profile, limit: int = PROFILE_TOP_FUNCTIONS) -> List[Dict]:
+    """Return the functions with the most cumulative time in a profile."""
+    stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3)
+        }
+        for (filename, line, function), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+class TraceStore:
+    """Directory of finished traces, one JSON file per request ID.
+
+    A cProfile dump (request_id.prof, readable with pstats or snakeviz) is
+    kept next to the trace when the request was profiled. Only the newest
+    max_traces traces are kept.
+    """
+
+    def __init__(self, directory: str, max_traces: int = 200):
+        """Create the directory if needed.
+
+        Args:
+            directory: Where traces are written
+            max_traces: Number of traces kept before the oldest are deleted
+        """
+        self.directory = directory
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, request_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{request_id}{suffix}")
+
+    def save(self, trace: Dict, profile: Optional[cProfile.Profile] = None) -> None:
+        """Write a trace (from Trace.to_dict) and its optional profile."""
+        request_id = trace['request_id']
+        if profile is not None:
+            profile.dump_stats(self._path(request_id, '.prof'))
+            trace = dict(trace, profile={
+                "file": f"{request_id}.prof",
+                "top": profile_summary(profile)
+            })
+        path = self._path(request_id, '.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(trace, f, default=str)
+        os.replace(path + '.tmp', path)
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            traces = sorted(
+                (entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            for entry in traces[:max(0, len(traces) - self.max_traces)]:
+                for suffix in ('.json', '.prof'):
+                    try:
+                        os.remove(self._path(entry.name[:-len('.json')], suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def load(self, request_id: str) -> Optional[Dict]:
+        """Return a stored trace, or None if there is none for the ID."""
+        if not REQUEST_ID_PATTERN.match(request_id):
+            return None
+        try:
+            with open(self._path(request_id, '.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Return summaries of the newest traces, newest first."""
+        traces = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime, reverse=True
+        )[:limit]
+        summaries = []
+        for entry in traces:
+            trace = self.load(entry.name[:-len('.json')])
+            if trace is not None:
+                summaries.append({
+                    key: trace.get(key)
+                    for key in ('request_id', 'method', 'path', 'status', 'started_at',
+                                'duration_ms', 'notion_calls')
+                })
+        return summaries
@@ -0,0 +1,31 @@
+"""Shared fixtures."""
+import pytest
+
+
+class FakeClock:
+    """Replaces the time module of a module under test; time only moves when told to."""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += max(0.0, seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,28 @@
+"""Tests for the Flask application factory."""
+import pytest
+
+from src import app as app_module
+from src.config.settings import Config
+
+
+@pytest.fixture
+def started(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Config, 'NOTION_API_KEY', 'secret_test')
+    monkeypatch.setattr(Config, 'NOTION_DATABASE_JOB_APPLICATIONS_ID', 'jobs')
+    monkeypatch.setattr(app_module, '_background_started', False)
+    monkeypatch.setattr(app_module.notion_service, 'start_background_tasks', lambda: calls.append('service'))
+    monkeypatch.setattr(app_module, 'save_queue', None)
+    return calls
+
+
+def test_create_app_does_not_start_background_tasks(started):
+    app_module.create_app()
+    assert started == []
+
+
+def test_first_request_starts_background_tasks_once(started):
+    client = app_module.create_app().test_client()
+    client.get('/api/health/live')
+    client.get('/api/health/live')
+    assert started == ['service']
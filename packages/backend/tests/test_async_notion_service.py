@@ -0,0 +1,130 @@
+"""Tests for AsyncNotionService against the fake Notion API."""
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services.async_notion_service import AsyncNotionService
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.notion_service import NotionService
+from src.services.rate_limiter import SharedTokenBucket
+
+JOBS_DATABASE_ID = 'jobs'
+COMPANIES_DATABASE_ID = 'companies'
+POSTING_URL = 'https://www.linkedin.com/jobs/view/3881234567'
+
+
+@pytest.fixture
+def notion():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    notion.base_url = server.base_url
+    yield notion
+    server.stop()
+
+
+def run(service, scenario):
+    """Run scenario(async_service) on a fresh event loop, closing the service afterwards."""
+    async def main():
+        async_service = AsyncNotionService(service)
+        try:
+            return await scenario(async_service)
+        finally:
+            await async_service.aclose()
+    return asyncio.run(main())
+
+
+def test_wraps_the_sync_service_instead_of_subclassing_it(notion):
+    service = NotionService('secret_test', JOBS_DATABASE_ID, base_url=notion.base_url, max_retries=0)
+
+    async def scenario(async_service):
+        return async_service
+
+    async_service = run(service, scenario)
+
+    assert not isinstance(async_service, NotionService)
+    assert async_service.client is service.client
+    assert async_service.async_client.bucket is service.client.bucket
+    assert async_service.company_cache is service.company_cache
+
+
+def test_create_then_check_and_update(notion):
+    service = NotionService('secret_test', JOBS_DATABASE_ID, COMPANIES_DATABASE_ID,
+                            base_url=notion.base_url, max_retries=0)
+
+    async def scenario(async_service):
+        page, existing = await async_service.create_job_posting_if_new(
+            position='Engineer', company='Acme', posting_url=POSTING_URL,
+            match='High', job_description='Intro\n\nDetails'
+        )
+        duplicate = await async_service.create_job_posting_if_new(
+            position='Engineer', company='Acme', posting_url=POSTING_URL
+        )
+        notion.calls.clear()
+        updated = await async_service.update_job_posting(
+            page_id=page['id'], position='Engineer', company='Acme', posting_url=POSTING_URL,
+            match='Low', job_description='Intro\n\nNew details'
+        )
+        return page, existing, duplicate, updated
+
+    page, existing, duplicate, updated = run(service, scenario)
+
+    assert existing is None
+    assert len(updated['description_report']['updated']) == 1
+    assert duplicate == (None, page['id'])
+    assert notion.pages[page['id']]['properties']['Match']['select'] == {'name': 'Low'}
+    # Company cached, page state cached, one paragraph changed
+    assert notion.calls == {'pages.update': 1, 'blocks.children.list': 1, 'blocks.update': 1}
+    # The wrapped service holds the state the async one saved
+    assert service.page_state_cache.get(page['id'])['properties']['Match'] == 'Low'
+    assert service.company_cache.get('Acme') is not None
+
+
+def test_sqlite_work_runs_off_the_event_loop(notion, tmp_path):
+    service = NotionService('secret_test', JOBS_DATABASE_ID, COMPANIES_DATABASE_ID,
+                            base_url=notion.base_url, max_retries=0,
+                            rate_limiter=SharedTokenBucket(str(tmp_path / 'bucket.db'), rate=1000),
+                            mirror_path=str(tmp_path / 'mirror.db'),
+                            search_index_path=str(tmp_path / 'search.db'))
+    threads = {}
+
+    def record(name, fn):
+        def wrapper(*args, **kwargs):
+            threads.setdefault(name, set()).add(threading.get_ident())
+            return fn(*args, **kwargs)
+        return wrapper
+
+    service.mirror.find_posting = record('mirror.find_posting', service.mirror.find_posting)
+    service.mirror.upsert = record('mirror.upsert', service.mirror.upsert)
+    service.search_index.upsert = record('search_index.upsert', service.search_index.upsert)
+    service.client.bucket.reserve = record('bucket.reserve', service.client.bucket.reserve)
+
+    async def scenario(async_service):
+        await async_service.create_job_posting_if_new(
+            position='Engineer', company='Acme', posting_url=POSTING_URL
+        )
+        return threading.get_ident()
+
+    loop_thread = run(service, scenario)
+
+    assert set(threads) == {'mirror.find_posting', 'mirror.upsert', 'search_index.upsert', 'bucket.reserve'}
+    assert all(loop_thread not in idents for idents in threads.values())
+
+
+def test_open_circuit_fails_the_company_lookup(notion):
+    breaker = CircuitBreaker(failure_rate=0.5, minimum_calls=1, window=10, open_seconds=30, half_open_calls=1)
+    service = NotionService('secret_test', JOBS_DATABASE_ID, companies_database_id=COMPANIES_DATABASE_ID,
+                            base_url=notion.base_url, max_retries=0, circuit_breaker=breaker)
+    notion.error_rate = 1.0
+
+    async def scenario(async_service):
+        assert await async_service.find_or_create_company('Acme Corp') is None
+        with pytest.raises(CircuitOpenError):
+            await async_service.find_or_create_company('Acme Corp')
+        with pytest.raises(CircuitOpenError):
+            await async_service.create_job_posting_if_new(position='Engineer', company='Acme Corp',
+                                                          posting_url=POSTING_URL)
+
+    run(service, scenario)
+    assert 'pages.create' not in notion.calls
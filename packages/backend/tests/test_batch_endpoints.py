@@ -0,0 +1,134 @@
+"""Tests for the batch check and batch create endpoints."""
+import asyncio
+
+import pytest
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src import app as app_module
+from src import asgi_app
+from src.api import async_routes, routes
+from src.config.settings import Config
+from src.services.async_notion_service import AsyncNotionService
+from src.services.notion_service import NotionService
+
+JOBS_DATABASE_ID = 'jobs'
+COMPANIES_DATABASE_ID = 'companies'
+
+
+def posting(job_id, company='Acme'):
+    return {
+        'position': 'Software Engineer',
+        'company': company,
+        'posting_url': f'https://www.linkedin.com/jobs/view/{job_id}/',
+        'origin': 'LinkedIn'
+    }
+
+
+@pytest.fixture
+def notion():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    notion.base_url = server.base_url
+    yield notion
+    server.stop()
+
+
+@pytest.fixture
+def client(notion, monkeypatch):
+    service = NotionService('secret_test', JOBS_DATABASE_ID, companies_database_id=COMPANIES_DATABASE_ID,
+                            base_url=notion.base_url, max_retries=0)
+    monkeypatch.setattr(Config, 'NOTION_API_KEY', 'secret_test')
+    monkeypatch.setattr(Config, 'NOTION_DATABASE_JOB_APPLICATIONS_ID', JOBS_DATABASE_ID)
+    monkeypatch.setattr(routes, 'notion_service', service)
+    monkeypatch.setattr(routes, 'idempotency_store', None)
+    monkeypatch.setattr(app_module, '_background_started', True)
+    yield app_module.create_app().test_client()
+    service.close()
+
+
+def test_batch_create_reports_saved_and_repeated_postings(notion, client):
+    saved = notion.add_page(JOBS_DATABASE_ID, {
+        'Posting URL': {'url': 'https://www.linkedin.com/jobs/view/3881234567/'}
+    })
+    notion.calls.clear()
+
+    response = client.post('/api/job-postings/batch', json={'job_postings': [
+        posting(3881234567),
+        posting(3999999999),
+        posting(3999999999, company='Globex'),
+        {'position': 'Engineer'}
+    ]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [result['status'] for result in body['results']] == [409, 201, 409, 400]
+    assert body['results'][0]['existing_page_id'] == saved['id']
+    assert body['results'][2]['duplicate_of_index'] == 1
+    assert (body['created'], body['duplicates'], body['failed']) == (1, 2, 1)
+    # Both postings were checked against Notion with one combined query
+    assert notion.calls['databases.query'] == 2  # duplicate check + company lookup
+
+
+def test_batch_create_fails_postings_when_the_duplicate_check_fails(notion, client):
+    notion.error_rate = 1.0
+
+    response = client.post('/api/job-postings/batch', json={'job_postings': [
+        posting(3881234567), posting(3999999999)
+    ]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [result['status'] for result in body['results']] == [500, 500]
+    assert body['failed'] == 2
+    assert 'pages.create' not in notion.calls
+
+
+def test_batch_check_answers_every_url(notion, client):
+    saved = notion.add_page(JOBS_DATABASE_ID, {
+        'Posting URL': {'url': 'https://www.linkedin.com/jobs/view/3881234567/'}
+    })
+    urls = [f'https://www.linkedin.com/jobs/view/{3881234567 + offset}/' for offset in range(3)]
+    notion.calls.clear()
+
+    response = client.post('/api/job-postings/check-batch', json={'posting_urls': urls})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['saved'] == 1
+    assert body['results'][urls[0]]['page_id'] == saved['id']
+    assert body['results'][urls[1]] == {'exists': False}
+    assert notion.calls == {'databases.query': 1}
+
+
+def test_batch_check_rejects_a_malformed_body(client):
+    response = client.post('/api/job-postings/check-batch', json={'posting_urls': []})
+
+    assert response.status_code == 400
+
+
+def test_async_batch_create_fails_postings_when_the_duplicate_check_fails(notion, monkeypatch):
+    monkeypatch.setattr(Config, 'NOTION_API_KEY', 'secret_test')
+    monkeypatch.setattr(Config, 'NOTION_DATABASE_JOB_APPLICATIONS_ID', JOBS_DATABASE_ID)
+    monkeypatch.setattr(async_routes, 'idempotency_store', None)
+    notion.error_rate = 1.0
+
+    async def scenario():
+        service = AsyncNotionService(NotionService(
+            'secret_test', JOBS_DATABASE_ID, companies_database_id=COMPANIES_DATABASE_ID,
+            base_url=notion.base_url, max_retries=0
+        ))
+        monkeypatch.setattr(async_routes, 'notion_service', service)
+        try:
+            client = asgi_app.create_asgi_app().test_client()
+            response = await client.post('/api/job-postings/batch', json={'job_postings': [
+                posting(3881234567), posting(3999999999)
+            ]})
+            return response.status_code, await response.get_json()
+        finally:
+            await service.aclose()
+
+    status, body = asyncio.run(scenario())
+
+    assert status == 200
+    assert [result['status'] for result in body['results']] == [500, 500]
+    assert 'pages.create' not in notion.calls
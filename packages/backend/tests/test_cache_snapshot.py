@@ -0,0 +1,55 @@
+"""Tests for restoring the caches from a snapshot."""
+import time
+
+import pytest
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services.notion_service import NotionService
+
+JOBS_DATABASE_ID = 'jobs'
+COMPANIES_DATABASE_ID = 'companies'
+MAX_AGE = 3600
+
+
+@pytest.fixture
+def service(tmp_path):
+    server = FakeNotionServer(FakeNotion(latency=0)).start()
+    service = NotionService(
+        'secret_test', JOBS_DATABASE_ID, COMPANIES_DATABASE_ID,
+        use_posting_index=True, base_url=server.base_url, max_retries=0,
+        snapshot_path=str(tmp_path / 'snapshot.db'), snapshot_max_age=MAX_AGE
+    )
+    yield service
+    service.close()
+    server.stop()
+
+
+def save(service, taken_at, postings):
+    service.snapshot.save(service._snapshot_databases(), taken_at, postings,
+                          [('Acme', 'company-page')], None)
+
+
+def test_fresh_snapshot_restores_both_caches(service):
+    save(service, time.time(), {3881234567: 'posting-page'})
+
+    assert service.restore_snapshot() == {"postings": True, "companies": True}
+    assert service.posting_index.lookup(3881234567) == (True, 'posting-page')
+    assert service.company_cache.get('Acme') == 'company-page'
+
+
+def test_stale_postings_are_rebuilt_even_when_companies_are_fresh(service):
+    # Postings captured long ago; later snapshots (index not ready) only refreshed the companies
+    save(service, time.time() - 2 * MAX_AGE, {3881234567: 'deleted-posting-page'})
+    save(service, time.time(), None)
+
+    assert service.restore_snapshot() == {"postings": False, "companies": True}
+    assert not service.posting_index.is_ready()
+    assert service.company_cache.get('Acme') == 'company-page'
+
+
+def test_stale_snapshot_is_ignored(service):
+    save(service, time.time() - 2 * MAX_AGE, {3881234567: 'posting-page'})
+
+    assert service.restore_snapshot() == {"postings": False, "companies": False}
+    assert not service.posting_index.is_ready()
+    assert service.company_cache.get('Acme') is None
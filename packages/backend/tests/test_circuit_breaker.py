@@ -0,0 +1,160 @@
+"""Tests for the Notion circuit breaker."""
+import httpx
+import pytest
+from notion_client.errors import APIResponseError, HTTPResponseError, RequestTimeoutError
+
+from src.services import circuit_breaker
+from src.services.circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError,
+                                          is_outage)
+
+
+@pytest.fixture(autouse=True)
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'time', clock)
+
+
+def breaker(**options):
+    settings = dict(failure_rate=0.5, minimum_calls=4, window=10, open_seconds=30, half_open_calls=2)
+    settings.update(options)
+    return CircuitBreaker(**settings)
+
+
+def call(cb, failed):
+    trial = cb.admit()
+    cb.record(trial, failed)
+    return trial
+
+
+def open_breaker(cb):
+    for _ in range(cb.minimum_calls):
+        call(cb, True)
+    assert cb.state == OPEN
+
+
+def test_stays_closed_below_minimum_calls():
+    cb = breaker()
+    for _ in range(3):
+        call(cb, True)
+    assert cb.state == CLOSED
+
+
+def test_opens_at_the_failure_rate():
+    cb = breaker()
+    call(cb, False)
+    call(cb, True)
+    call(cb, False)
+    assert cb.state == CLOSED
+    call(cb, True)  # 2 of 4 failed
+    assert cb.state == OPEN
+    assert cb.times_opened == 1
+
+
+def test_old_outcomes_leave_the_window(clock):
+    cb = breaker()
+    for _ in range(3):
+        call(cb, True)
+    clock.advance(11)
+    call(cb, True)
+    assert cb.state == CLOSED
+    assert cb.stats()['calls_in_window'] == 1
+
+
+def test_open_breaker_rejects_with_retry_after(clock):
+    cb = breaker()
+    open_breaker(cb)
+    clock.advance(10.2)
+
+    with pytest.raises(CircuitOpenError) as raised:
+        cb.admit()
+    assert raised.value.retry_after == 20
+    assert raised.value.status == 503
+    assert raised.value.code == 'circuit_open'
+    assert raised.value.headers['Retry-After'] == '20'
+    assert cb.rejected == 1
+    assert cb.is_open()
+
+
+def test_half_open_trials_close_the_breaker(clock):
+    cb = breaker()
+    open_breaker(cb)
+    clock.advance(30)
+
+    first, second = cb.admit(), cb.admit()
+    assert (first, second) == (True, True)
+    assert cb.state == HALF_OPEN
+    # Only half_open_calls trials at a time
+    with pytest.raises(CircuitOpenError):
+        cb.admit()
+
+    cb.record(first, False)
+    assert cb.state == HALF_OPEN
+    cb.record(second, False)
+    assert cb.state == CLOSED
+    assert cb.stats()['calls_in_window'] == 0
+    assert call(cb, False) is False
+
+
+def test_failed_trial_opens_the_breaker_again(clock):
+    cb = breaker()
+    open_breaker(cb)
+    clock.advance(30)
+
+    trial = cb.admit()
+    cb.record(trial, True)
+
+    assert cb.state == OPEN
+    assert cb.times_opened == 2
+    with pytest.raises(CircuitOpenError):
+        cb.admit()
+    clock.advance(30)
+    assert cb.admit() is True
+
+
+def test_unclassified_trial_frees_its_slot(clock):
+    cb = breaker(half_open_calls=1)
+    open_breaker(cb)
+    clock.advance(30)
+
+    trial = cb.admit()
+    cb.record(trial, None)  # e.g. cancelled
+    assert cb.state == HALF_OPEN
+    assert cb.admit() is True
+
+
+def test_calls_admitted_before_opening_are_not_counted(clock):
+    cb = breaker()
+    late = cb.admit()
+    open_breaker(cb)
+    cb.record(late, True)
+    assert cb.stats()['failures_in_window'] == cb.minimum_calls
+
+
+def test_stats_report_the_open_state(clock):
+    cb = breaker()
+    open_breaker(cb)
+    clock.advance(5)
+
+    stats = cb.stats()
+    assert stats['state'] == OPEN
+    assert stats['retry_after_seconds'] == 25
+    assert stats['opened_seconds_ago'] == 5
+    assert stats['failure_rate'] == 1.0
+
+
+def api_error(status, code='internal_server_error'):
+    return APIResponseError(httpx.Response(status), 'error', code)
+
+
+@pytest.mark.parametrize('error, outage', [
+    (None, False),
+    (RequestTimeoutError(), True),
+    (httpx.ConnectError('refused'), True),
+    (api_error(502), True),
+    (HTTPResponseError(httpx.Response(503)), True),
+    (api_error(429, 'rate_limited'), False),
+    (api_error(400, 'validation_error'), False),
+    (api_error(404, 'object_not_found'), False),
+    (ValueError('bug'), None),
+])
+def test_is_outage(error, outage):
+    assert is_outage(error) is outage
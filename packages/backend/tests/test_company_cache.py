@@ -0,0 +1,79 @@
+"""Tests for the company name cache and its use in company lookups."""
+import threading
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services.company_cache import CompanyCache
+from src.services.notion_service import NotionService
+
+JOBS_DATABASE_ID = 'jobs'
+COMPANIES_DATABASE_ID = 'companies'
+
+
+def test_least_recently_used_company_is_evicted():
+    cache = CompanyCache(max_size=2)
+    cache.put('Acme', 'page-1')
+    cache.put('Globex', 'page-2')
+
+    assert cache.get('Acme') == 'page-1'
+    cache.put('Initech', 'page-3')
+
+    assert cache.get('Globex') is None
+    assert cache.items() == [('Acme', 'page-1'), ('Initech', 'page-3')]
+
+
+def test_hits_and_misses_are_counted():
+    cache = CompanyCache()
+    cache.put('Acme', 'page-1')
+
+    cache.get('Acme')
+    cache.get('Globex')
+
+    assert cache.stats() == {'entries': 1, 'max_size': 1000, 'hits': 1, 'misses': 1}
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = CompanyCache(max_size=0)
+    cache.put('Acme', 'page-1')
+
+    assert len(cache) == 0
+    assert cache.get('Acme') is None
+
+
+def make_service(notion, server):
+    return NotionService('secret_test', JOBS_DATABASE_ID, companies_database_id=COMPANIES_DATABASE_ID,
+                         base_url=server.base_url, max_retries=0)
+
+
+def test_known_company_is_served_from_the_cache():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    service = make_service(notion, server)
+    try:
+        company_id = service.find_or_create_company('Acme')
+        notion.calls.clear()
+
+        assert service.find_or_create_company('Acme') == company_id
+        assert notion.calls == {}
+    finally:
+        service.close()
+        server.stop()
+
+
+def test_concurrent_lookups_create_a_new_company_once():
+    notion = FakeNotion(latency=0.05)
+    server = FakeNotionServer(notion).start()
+    service = make_service(notion, server)
+    results = []
+    try:
+        threads = [threading.Thread(target=lambda: results.append(service.find_or_create_company('Acme')))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(set(results)) == 1 and results[0] is not None
+        assert notion.calls.get('pages.create') == 1
+    finally:
+        service.close()
+        server.stop()
@@ -0,0 +1,140 @@
+"""Tests for laying out job descriptions as Notion blocks."""
+import json
+
+from src.services.description_blocks import (MAX_BLOCKS_PER_REQUEST, MAX_REQUEST_BYTES, MAX_RICH_TEXT_ITEMS,
+                                             MAX_TEXT_LENGTH, batch_blocks, block_text, description_blocks,
+                                             diff_blocks, plan_description, split_text)
+
+
+def utf16_length(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def test_split_text_respects_the_utf16_limit():
+    text = 'a' * 1999 + '😀' + 'b' * 10
+    pieces = split_text(text)
+
+    assert ''.join(pieces) == text
+    assert [utf16_length(piece) for piece in pieces] == [1999, 12]
+    assert split_text('') == []
+    assert split_text('short') == ['short']
+
+
+def test_each_paragraph_gets_a_block():
+    assert plan_description('  Intro\n\nDetails \n \n\n Benefits\n') == ['Intro', 'Details', 'Benefits']
+
+
+def test_many_paragraphs_share_at_most_100_blocks():
+    paragraphs = [f"Paragraph {index}" for index in range(250)]
+    texts = plan_description('\n\n'.join(paragraphs))
+
+    assert len(texts) <= MAX_BLOCKS_PER_REQUEST
+    assert '\n\n'.join(texts) == '\n\n'.join(paragraphs)
+
+
+def test_oversized_paragraph_is_split_into_full_blocks():
+    capacity = MAX_RICH_TEXT_ITEMS * MAX_TEXT_LENGTH
+    texts = plan_description('x' * (capacity + 10))
+
+    assert [len(text) for text in texts] == [capacity, 10]
+    blocks = description_blocks(texts)
+    assert len(blocks[0]['callout']['rich_text']) == MAX_RICH_TEXT_ITEMS
+    assert all(len(item['text']['content']) <= MAX_TEXT_LENGTH
+               for block in blocks for item in block[block['type']]['rich_text'])
+
+
+def test_first_block_is_the_callout():
+    blocks = description_blocks(['Intro', 'Details'])
+    assert [block['type'] for block in blocks] == ['callout', 'paragraph']
+    assert [block_text(block) for block in blocks] == ['Intro', 'Details']
+
+
+def test_batches_hold_at_most_100_blocks():
+    blocks = description_blocks([f"Paragraph {index}" for index in range(250)])
+    batches = batch_blocks(blocks)
+
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    assert [block for batch in batches for block in batch] == blocks
+
+
+def test_batches_stay_under_the_request_size():
+    # 40 blocks of ~20 KB each: far fewer than 100 blocks, but over 450 KB together
+    blocks = description_blocks(['y' * 20_000] * 40)
+    batches = batch_blocks(blocks)
+
+    assert len(batches) > 1
+    assert all(len(batch) <= MAX_BLOCKS_PER_REQUEST for batch in batches)
+    assert all(sum(len(json.dumps(block)) for block in batch) <= MAX_REQUEST_BYTES for batch in batches)
+    assert [block for batch in batches for block in batch] == blocks
+
+
+def test_description_at_the_validator_limit_fits_in_requests():
+    # 50,000 characters (validate_job_posting's limit) of short paragraphs
+    description = '\n\n'.join(['z' * 98] * 500)
+    batches = batch_blocks(description_blocks(plan_description(description)))
+
+    assert len(batches) == 1
+    assert len(batches[0]) <= MAX_BLOCKS_PER_REQUEST
+
+
+def existing(blocks, prefix='block'):
+    """Give planned blocks the IDs and plain_text Notion returns when listing them."""
+    listed = []
+    for index, block in enumerate(blocks):
+        content = block[block['type']]
+        listed.append(dict(block, id=f"{prefix}-{index}", has_children=False, **{block['type']: dict(
+            content, rich_text=[dict(item, plain_text=item['text']['content']) for item in content['rich_text']]
+        )}))
+    return listed
+
+
+def heading(block_id):
+    return {"id": block_id, "type": "heading_2", "has_children": False,
+            "heading_2": {"rich_text": [{"plain_text": "My notes"}]}}
+
+
+def test_unchanged_description_needs_no_calls():
+    blocks = description_blocks(['Intro', 'Details'])
+    assert diff_blocks(existing(blocks), blocks) == ([], [], [])
+
+
+def test_changed_blocks_are_updated_in_place():
+    current = existing(description_blocks(['Intro', 'Details', 'Benefits']))
+    updates, deletes, appends = diff_blocks(current, description_blocks(['Intro', 'New details', 'Benefits']))
+
+    assert [block_id for block_id, _ in updates] == ['block-1']
+    assert updates[0][1]['paragraph']['rich_text'][0]['text']['content'] == 'New details'
+    assert (deletes, appends) == ([], [])
+
+
+def test_only_extra_blocks_are_deleted_or_appended():
+    current = existing(description_blocks(['Intro', 'Details', 'Benefits']))
+
+    updates, deletes, appends = diff_blocks(current, description_blocks(['Intro', 'Details']))
+    assert (updates, deletes, appends) == ([], ['block-2'], [])
+
+    updates, deletes, appends = diff_blocks(current, description_blocks(['Intro', 'Details', 'Benefits', 'Apply']))
+    assert (updates, deletes) == ([], [])
+    assert [block_text(block) for block in appends] == ['Apply']
+
+
+def test_blocks_after_a_foreign_block_are_rewritten():
+    # A heading added in Notion: the description continues after it, in order
+    current = existing(description_blocks(['Intro', 'Details']))
+    current.insert(1, heading('user-heading'))
+
+    updates, deletes, appends = diff_blocks(current, description_blocks(['Intro', 'Details']))
+
+    assert updates == []
+    assert deletes == ['user-heading', 'block-1']
+    assert [block_text(block) for block in appends] == ['Details']
+
+
+def test_blocks_with_children_are_not_updated_in_place():
+    current = existing(description_blocks(['Intro', 'Details']))
+    current[1]['has_children'] = True
+
+    updates, deletes, appends = diff_blocks(current, description_blocks(['Intro', 'Details']))
+
+    assert (updates, deletes) == ([], ['block-1'])
+    assert [block_text(block) for block in appends] == ['Details']
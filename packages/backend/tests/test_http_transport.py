@@ -0,0 +1,74 @@
+"""Tests for the shared HTTP transport of Notion calls."""
+import asyncio
+
+import httpx
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services import http_transport
+from src.services.http_transport import build_async_http_client, build_http_client, pool_stats
+from src.services.notion_service import NotionService
+
+
+def test_client_is_built_with_the_configured_pool_and_timeouts():
+    client = build_http_client(max_connections=7, max_keepalive_connections=3,
+                               keepalive_expiry=12, connect_timeout=2, read_timeout=9)
+
+    stats = pool_stats(client)
+    assert (stats['max_connections'], stats['max_keepalive_connections']) == (7, 3)
+    assert client.timeout == httpx.Timeout(9, connect=2)
+    client.close()
+
+
+def test_http2_falls_back_to_http1_without_h2(monkeypatch, caplog):
+    monkeypatch.setattr(http_transport, 'http2_available', lambda: False)
+
+    client = build_http_client(http2=True)
+
+    assert client._transport._pool._http2 is False
+    assert "'h2' package is not installed" in caplog.text
+    client.close()
+
+
+def test_pool_stats_is_none_without_a_connection_pool():
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    assert pool_stats(client) is None
+
+
+def test_notion_calls_reuse_one_keep_alive_connection():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    client = build_http_client()
+    service = NotionService('secret_test', 'jobs', base_url=server.base_url, max_retries=0, http_client=client)
+    try:
+        for _ in range(5):
+            service.client.databases.query(database_id='jobs')
+
+        stats = pool_stats(client)
+        assert (stats['connections'], stats['idle'], stats['active']) == (1, 1, 0)
+        assert service.client.stats()['http_pool'] == stats
+    finally:
+        service.close()
+        server.stop()
+
+
+def test_async_client_shares_its_pool_between_coroutines():
+    notion = FakeNotion(latency=0.05)
+    server = FakeNotionServer(notion).start()
+
+    async def scenario():
+        client = build_async_http_client(max_connections=2)
+        try:
+            await asyncio.gather(*(client.post(f"{server.base_url}/v1/databases/jobs/query", json={})
+                                   for _ in range(6)))
+            return pool_stats(client)
+        finally:
+            await client.aclose()
+
+    try:
+        stats = asyncio.run(scenario())
+    finally:
+        server.stop()
+
+    assert stats['connections'] == 2
+    assert notion.calls == {'databases.query': 6}
@@ -0,0 +1,235 @@
+"""Tests for the Idempotency-Key response store."""
+import asyncio
+import threading
+
+import pytest
+
+from src.services import idempotency
+from src.services.idempotency import (IN_PROGRESS, MISMATCH, REPLAY, STARTED, AsyncIdempotencyStore,
+                                      AsyncSharedIdempotencyStore, IdempotencyStore, SharedIdempotencyStore,
+                                      request_fingerprint)
+
+SAVE = request_fingerprint('POST', '/api/job-postings', b'{"position": "Engineer"}')
+OTHER_SAVE = request_fingerprint('POST', '/api/job-postings', b'{"position": "Designer"}')
+CREATED = (201, b'{"id": "page"}', {'Content-Type': 'application/json'})
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(idempotency, 'time', clock)
+    return clock
+
+
+def test_completed_request_is_replayed():
+    store = IdempotencyStore()
+    assert store.begin('key-1', SAVE) == (STARTED, None)
+    store.complete('key-1', *CREATED)
+
+    assert store.begin('key-1', SAVE) == (REPLAY, CREATED)
+    assert store.stats()['replays'] == 1
+
+
+def test_key_reused_for_another_request_is_a_conflict():
+    store = IdempotencyStore()
+    store.begin('key-1', SAVE)
+    store.complete('key-1', *CREATED)
+
+    assert store.begin('key-1', OTHER_SAVE) == (MISMATCH, None)
+    assert store.stats()['mismatches'] == 1
+    # The stored response is kept for the original request
+    assert store.begin('key-1', SAVE) == (REPLAY, CREATED)
+
+
+def test_key_in_use_by_a_running_request_is_a_conflict():
+    store = IdempotencyStore(wait_timeout=0)
+    store.begin('key-1', SAVE)
+
+    assert store.begin('key-1', OTHER_SAVE) == (MISMATCH, None)
+    assert store.begin('key-1', SAVE) == (IN_PROGRESS, None)
+
+
+def test_repeat_waits_for_the_running_request():
+    store = IdempotencyStore(wait_timeout=5)
+    store.begin('key-1', SAVE)
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(store.begin('key-1', SAVE)))
+    waiter.start()
+
+    store.complete('key-1', *CREATED)
+    waiter.join()
+    assert outcome == [(REPLAY, CREATED)]
+
+
+@pytest.mark.parametrize('status', [500, 503, 429])
+def test_failed_responses_are_not_stored(status):
+    store = IdempotencyStore()
+    store.begin('key-1', SAVE)
+    store.complete('key-1', status, b'{"error": "..."}')
+
+    assert store.begin('key-1', SAVE) == (STARTED, None)
+
+
+def test_abandoned_key_runs_again():
+    store = IdempotencyStore()
+    store.begin('key-1', SAVE)
+    store.abandon('key-1')
+
+    assert store.begin('key-1', SAVE) == (STARTED, None)
+
+
+def test_abandon_does_not_drop_a_stored_response():
+    store = IdempotencyStore()
+    store.begin('key-1', SAVE)
+    store.complete('key-1', *CREATED)
+    store.abandon('key-1')
+
+    assert store.begin('key-1', SAVE) == (REPLAY, CREATED)
+
+
+def test_responses_expire_after_the_ttl(fake_time):
+    store = IdempotencyStore(ttl=60)
+    store.begin('key-1', SAVE)
+    store.complete('key-1', *CREATED)
+
+    fake_time.advance(59)
+    assert store.begin('key-1', SAVE)[0] == REPLAY
+    fake_time.advance(2)
+    assert store.begin('key-1', OTHER_SAVE) == (STARTED, None)
+
+
+def test_least_recently_used_responses_are_evicted():
+    store = IdempotencyStore(max_size=2)
+    for key in ('key-1', 'key-2'):
+        store.begin(key, SAVE)
+        store.complete(key, *CREATED)
+    store.begin('key-1', SAVE)  # replay: key-1 is now the most recently used
+    store.begin('key-3', SAVE)
+    store.complete('key-3', *CREATED)
+
+    assert store.begin('key-1', SAVE)[0] == REPLAY
+    assert store.begin('key-2', SAVE) == (STARTED, None)
+
+
+def test_running_requests_are_never_evicted():
+    store = IdempotencyStore(max_size=1, wait_timeout=0)
+    store.begin('running', SAVE)
+    for key in ('key-1', 'key-2'):
+        store.begin(key, SAVE)
+        store.complete(key, *CREATED)
+
+    assert store.begin('running', SAVE) == (IN_PROGRESS, None)
+    assert store.stats()['in_progress'] == 1
+    assert store.stats()['entries'] == 1
+
+
+def test_async_repeat_awaits_the_running_request():
+    async def scenario():
+        store = AsyncIdempotencyStore(wait_timeout=5)
+        assert await store.begin('key-1', SAVE) == (STARTED, None)
+        waiter = asyncio.ensure_future(store.begin('key-1', SAVE))
+        await asyncio.sleep(0)
+        store.complete('key-1', *CREATED)
+        return await waiter, await store.begin('key-1', OTHER_SAVE)
+
+    assert asyncio.run(scenario()) == ((REPLAY, CREATED), (MISMATCH, None))
+
+
+def test_async_repeat_claims_an_abandoned_key():
+    async def scenario():
+        store = AsyncIdempotencyStore(wait_timeout=5)
+        await store.begin('key-1', SAVE)
+        waiter = asyncio.ensure_future(store.begin('key-1', SAVE))
+        await asyncio.sleep(0)
+        store.abandon('key-1')
+        return await waiter
+
+    assert asyncio.run(scenario()) == (STARTED, None)
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    return str(tmp_path / 'idempotency.db')
+
+
+def test_shared_store_replays_a_response_stored_by_another_process(shared_path):
+    first, second = SharedIdempotencyStore(shared_path), SharedIdempotencyStore(shared_path)
+    assert first.begin('key-1', SAVE) == (STARTED, None)
+    first.complete('key-1', *CREATED)
+
+    assert second.begin('key-1', SAVE) == (REPLAY, CREATED)
+    assert second.begin('key-1', OTHER_SAVE) == (MISMATCH, None)
+    assert second.stats() == {"entries": 1, "in_progress": 0, "max_size": 1000, "replays": 1, "mismatches": 1}
+
+
+def test_shared_store_repeat_polls_until_the_other_process_finishes(shared_path):
+    first = SharedIdempotencyStore(shared_path)
+    second = SharedIdempotencyStore(shared_path, wait_timeout=5, poll_interval=0.01)
+    first.begin('key-1', SAVE)
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(second.begin('key-1', SAVE)))
+    waiter.start()
+
+    first.complete('key-1', *CREATED)
+    waiter.join()
+    assert outcome == [(REPLAY, CREATED)]
+
+
+def test_shared_store_gives_up_waiting_after_the_timeout(shared_path, fake_time):
+    first = SharedIdempotencyStore(shared_path)
+    second = SharedIdempotencyStore(shared_path, wait_timeout=1, poll_interval=0.25)
+    first.begin('key-1', SAVE)
+
+    assert second.begin('key-1', SAVE) == (IN_PROGRESS, None)
+    assert fake_time.slept == [0.25] * 4
+
+
+@pytest.mark.parametrize('status', [500, 429])
+def test_shared_store_releases_keys_of_failed_responses(shared_path, status):
+    store = SharedIdempotencyStore(shared_path)
+    store.begin('key-1', SAVE)
+    store.complete('key-1', status, b'{"error": "..."}')
+
+    assert store.begin('key-1', SAVE) == (STARTED, None)
+
+
+def test_shared_store_takes_over_a_key_left_by_a_crashed_process(shared_path, fake_time):
+    crashed = SharedIdempotencyStore(shared_path, stale_after=300)
+    survivor = SharedIdempotencyStore(shared_path, wait_timeout=0, stale_after=300)
+    crashed.begin('key-1', SAVE)
+
+    fake_time.advance(299)
+    assert survivor.begin('key-1', SAVE) == (IN_PROGRESS, None)
+    fake_time.advance(2)
+    assert survivor.begin('key-1', SAVE) == (STARTED, None)
+
+
+def test_shared_store_expires_and_evicts_old_responses(shared_path, fake_time):
+    store = SharedIdempotencyStore(shared_path, max_size=2, ttl=60)
+    for key in ('key-1', 'key-2', 'key-3'):
+        store.begin(key, SAVE)
+        store.complete(key, *CREATED)
+        fake_time.advance(1)
+
+    assert store.begin('key-1', SAVE) == (STARTED, None)
+    assert store.begin('key-3', SAVE) == (REPLAY, CREATED)
+    fake_time.advance(60)
+    assert store.begin('key-3', OTHER_SAVE) == (STARTED, None)
+
+
+def test_async_shared_store_awaits_the_running_request(shared_path):
+    async def scenario():
+        store = AsyncSharedIdempotencyStore(shared_path, wait_timeout=5, poll_interval=0.01)
+        assert await store.begin('key-1', SAVE) == (STARTED, None)
+        waiter = asyncio.ensure_future(store.begin('key-1', SAVE))
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(store.complete, 'key-1', *CREATED)
+        return await waiter
+
+    assert asyncio.run(scenario()) == (REPLAY, CREATED)
+
+
+def test_fingerprint_covers_method_path_and_body():
+    body = b'{"position": "Engineer"}'
+    assert request_fingerprint('POST', '/api/job-postings', body) == SAVE
+    assert request_fingerprint('PUT', '/api/job-postings', body) != SAVE
+    assert request_fingerprint('POST', '/api/job-postings/batch', body) != SAVE
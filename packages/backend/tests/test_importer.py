@@ -0,0 +1,46 @@
+"""Tests for the bulk importer's handling of bad rows."""
+import io
+import json
+
+from src.importer import BulkImporter, ImportCheckpoint, read_jsonl
+
+
+class RecordingService:
+    """Stands in for NotionService; saves every posting as a new page."""
+
+    def __init__(self):
+        self.saved = []
+
+    def create_job_posting_if_new(self, **fields):
+        self.saved.append(fields)
+        return {"id": f"page-{len(self.saved)}"}, None
+
+
+def test_rows_with_non_string_fields_are_counted_invalid(tmp_path):
+    rows = [
+        {"position": 123, "company": "Acme", "origin": "LinkedIn",
+         "posting_url": "https://www.linkedin.com/jobs/view/1"},
+        {"position": "Engineer", "company": ["Acme"], "origin": "LinkedIn",
+         "posting_url": "https://www.linkedin.com/jobs/view/2"},
+        {"position": "Engineer", "company": "Acme", "origin": "LinkedIn",
+         "posting_url": "https://www.linkedin.com/jobs/view/3", "city": 7},
+        {"position": "Engineer", "company": "Acme", "origin": "LinkedIn",
+         "posting_url": "https://www.linkedin.com/jobs/view/4"},
+    ]
+    source = io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+    errors = io.StringIO()
+    service = RecordingService()
+    checkpoint = ImportCheckpoint(str(tmp_path / 'import.checkpoint'), str(tmp_path / 'postings.jsonl'))
+
+    result = BulkImporter(service, 2, checkpoint, errors).run(read_jsonl(source))
+
+    assert result['invalid'] == 3
+    assert result['created'] == 1
+    assert [fields['posting_url'] for fields in service.saved] == ["https://www.linkedin.com/jobs/view/4"]
+    reported = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [(row['_row'], row['_error']) for row in reported] == [
+        (1, "position must be a string"),
+        (2, "company must be a string"),
+        (3, "city must be a string"),
+    ]
+    assert checkpoint.row == 4
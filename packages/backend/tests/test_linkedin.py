@@ -0,0 +1,39 @@
+"""Tests for LinkedIn job ID parsing."""
+import pytest
+
+from src.services.linkedin import extract_linkedin_job_id
+
+
+@pytest.mark.parametrize('url, job_id', [
+    ('https://www.linkedin.com/jobs/view/3881234567', 3881234567),
+    ('https://www.linkedin.com/jobs/view/3881234567/', 3881234567),
+    ('https://www.linkedin.com/jobs/view/senior-engineer-at-acme-3881234567', 3881234567),
+    ('https://www.linkedin.com/jobs/view/software-engineer-2-at-acme-3881234567', 3881234567),
+    ('https://www.linkedin.com/jobs/view/python-3-developer-at-foo-3999999999/', 3999999999),
+    ('https://www.linkedin.com/jobs/view/3881234567/?refId=abc&trackingId=x%3D%3D', 3881234567),
+    ('https://www.linkedin.com/jobs/view/data-scientist-2-at-other-3999999999?trk=public', 3999999999),
+    ('https://www.linkedin.com/jobs/collections/recommended/?currentJobId=3881234567', 3881234567),
+    ('  https://www.linkedin.com/jobs/view/3881234567  ', 3881234567),
+])
+def test_extract_job_id(url, job_id):
+    assert extract_linkedin_job_id(url) == job_id
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.linkedin.com/jobs/view/123abc',
+    'https://www.linkedin.com/jobs/view/senior-engineer-at-acme',
+    'https://www.linkedin.com/jobs/view/3881234567/apply',
+    'https://www.linkedin.com/jobs/collections/recommended/',
+    'https://www.linkedin.com/jobs/collections/recommended/?currentJobId=12ab',
+    '',
+    None,
+    123,
+])
+def test_extract_job_id_rejects_urls_without_a_job_id(url):
+    assert extract_linkedin_job_id(url) is None
+
+
+def test_slugs_with_numbers_do_not_collide():
+    first = extract_linkedin_job_id('https://www.linkedin.com/jobs/view/software-engineer-2-at-acme-3881234567')
+    second = extract_linkedin_job_id('https://www.linkedin.com/jobs/view/data-scientist-2-at-other-3999999999')
+    assert first != second
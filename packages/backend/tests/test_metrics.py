@@ -0,0 +1,76 @@
+"""Tests for the metrics registry and the service metrics on /metrics."""
+from types import SimpleNamespace
+
+import pytest
+
+from src.api import metrics
+from src.services.metrics import REGISTRY, MetricsRegistry, _Metric
+
+
+class StatsStub:
+    def __init__(self, hits, misses, entries=1):
+        self.hits = hits
+        self.misses = misses
+        self.entries = entries
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": self.entries}
+
+
+def fake_service(hits):
+    return SimpleNamespace(
+        company_cache=StatsStub(hits, 2),
+        page_state_cache=StatsStub(0, 0),
+        not_found_cache=StatsStub(0, 0),
+        posting_index=None,
+        mirror=None,
+        client=SimpleNamespace(breaker=None),
+        company_lookups_in_flight=lambda: 0
+    )
+
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_cache_hits_and_misses_are_counters():
+    metrics.register_service_metrics(fake_service(5))
+    text = REGISTRY.render()
+
+    assert '# TYPE cache_hits_total counter' in text
+    assert '# TYPE cache_misses_total counter' in text
+    assert 'cache_hits_total{cache="company"} 5' in text
+    assert 'cache_misses_total{cache="company"} 2' in text
+    assert sample_lines(text, 'cache_hits{') == []
+
+
+def test_registering_service_metrics_again_replaces_the_collector():
+    calls = []
+    first, second = fake_service(1), fake_service(7)
+    first.company_lookups_in_flight = lambda: calls.append('first') or 0
+    second.company_lookups_in_flight = lambda: calls.append('second') or 0
+
+    metrics.register_service_metrics(first)
+    metrics.register_service_metrics(second)
+    text = REGISTRY.render()
+
+    assert calls == ['second']
+    assert sample_lines(text, 'cache_hits_total{cache="company"}') == ['cache_hits_total{cache="company"} 7']
+
+
+def test_collectors_run_on_render():
+    registry = MetricsRegistry()
+    depth = registry.gauge('queue_depth', 'Queued items')
+    registry.register_collector('queue', lambda: depth.set(3))
+    registry.register_collector('queue', lambda: depth.set(4))
+
+    assert 'queue_depth 4' in registry.render().splitlines()
+
+
+def test_metric_family_must_implement_its_samples():
+    class Incomplete(_Metric):
+        def _new_child(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete('incomplete', 'Missing _samples')
@@ -0,0 +1,189 @@
+"""Tests for the SQLite mirror of the Notion databases and its incremental sync."""
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import notion_mirror
+from src.services.notion_mirror import NotionMirror
+
+JOBS = 'jobs'
+COMPANIES = 'companies'
+
+
+def page(page_id, edited, title='Software Engineer', job_id=None, database_id=JOBS, archived=False):
+    return {
+        "id": page_id,
+        "parent": {"database_id": database_id},
+        "last_edited_time": edited,
+        "archived": archived,
+        "properties": {
+            "Position": {"type": "title", "title": [{"plain_text": title}]},
+            "Posting URL": {"type": "url", "url": f"https://www.linkedin.com/jobs/view/{job_id}/" if job_id else None},
+            "Job ID": {"type": "number", "number": job_id}
+        }
+    }
+
+
+class FakeDatabases:
+    """databases.query over a list of pages, honouring the last_edited_time filter and pagination."""
+
+    def __init__(self):
+        self.pages = []
+        self.queries = []
+        self.fail_after = None
+        self.page_size = None
+
+    def query(self, database_id, page_size=100, sorts=None, filter=None, start_cursor=None):
+        self.queries.append({"database_id": database_id, "filter": filter, "start_cursor": start_cursor})
+        if self.fail_after is not None and len(self.queries) > self.fail_after:
+            raise RuntimeError("Notion unavailable")
+        since = filter['last_edited_time']['on_or_after'] if filter else ''
+        matching = sorted(
+            (p for p in self.pages if p['parent']['database_id'] == database_id and p['last_edited_time'] >= since),
+            key=lambda p: p['last_edited_time']
+        )
+        start = int(start_cursor or 0)
+        end = start + (self.page_size or page_size)
+        return {
+            "results": matching[start:end],
+            "has_more": end < len(matching),
+            "next_cursor": str(end) if end < len(matching) else None
+        }
+
+
+@pytest.fixture
+def databases():
+    return FakeDatabases()
+
+
+@pytest.fixture
+def open_mirror(tmp_path, databases, clock, monkeypatch):
+    monkeypatch.setattr(notion_mirror, 'time', clock)
+
+    def open_(**kwargs):
+        return NotionMirror(
+            str(tmp_path / 'mirror.db'),
+            SimpleNamespace(databases=databases),
+            [JOBS, COMPANIES],
+            job_id_of=lambda p: p['properties']['Job ID']['number'],
+            **kwargs
+        )
+
+    return open_
+
+
+def test_first_sync_loads_every_page_and_answers_lookups(open_mirror, databases):
+    databases.pages = [
+        page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567),
+        page('p2', '2026-01-01T11:00:00.000Z', job_id=3881234568),
+        page('c1', '2026-01-01T09:00:00.000Z', title='Acme Corp', database_id=COMPANIES)
+    ]
+    mirror = open_mirror()
+
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (False, None)
+    stats = mirror.sync()
+
+    assert stats[JOBS]['pages'] == 2 and stats[COMPANIES]['pages'] == 1
+    assert stats[JOBS]['cursor'] == '2026-01-01T11:00:00.000Z'
+    assert all(query['filter'] is None for query in databases.queries)
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (True, 'p1')
+    assert mirror.find_posting(JOBS, 3999999999, 'unused') == (True, None)
+    assert mirror.find_by_title(COMPANIES, 'Acme Corp') == (True, 'c1')
+    assert mirror.get_page('p2')['last_edited_time'] == '2026-01-01T11:00:00.000Z'
+
+
+def test_later_syncs_only_fetch_pages_edited_since_the_cursor(open_mirror, databases):
+    databases.pages = [page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567)]
+    mirror = open_mirror()
+    mirror.sync()
+    databases.queries.clear()
+
+    databases.pages = [
+        page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567),
+        page('p2', '2026-01-01T12:00:00.000Z', job_id=3881234568)
+    ]
+    stats = mirror.sync()
+
+    assert databases.queries[0]['filter'] == {
+        "timestamp": "last_edited_time", "last_edited_time": {"on_or_after": '2026-01-01T10:00:00.000Z'}
+    }
+    # The page at the cursor is re-read (minute precision), the new one is added
+    assert stats[JOBS]['last_sync_changes'] == 2
+    assert mirror.find_posting(JOBS, 3881234568, 'unused') == (True, 'p2')
+
+
+def test_archived_pages_are_removed_by_an_incremental_sync(open_mirror, databases):
+    databases.pages = [page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567)]
+    mirror = open_mirror()
+    mirror.sync()
+
+    databases.pages = [page('p1', '2026-01-01T12:00:00.000Z', job_id=3881234567, archived=True)]
+    mirror.sync()
+
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (True, None)
+
+
+def test_full_sync_drops_pages_deleted_in_notion(open_mirror, databases, clock):
+    databases.pages = [page('p1', '2026-01-01T10:00:00.000Z'), page('p2', '2026-01-01T11:00:00.000Z')]
+    mirror = open_mirror(full_sync_interval=3600)
+    mirror.sync()
+
+    databases.pages = [page('p2', '2026-01-01T11:00:00.000Z')]
+    clock.advance(60)
+    mirror.sync()
+    assert mirror.get_page('p1') is not None
+
+    clock.advance(3600)
+    mirror.sync()
+    assert mirror.get_page('p1') is None
+    assert mirror.stats()['databases'][JOBS]['pages'] == 1
+
+
+def test_lookups_stop_once_the_mirror_lags_behind(open_mirror, databases, clock):
+    databases.pages = [page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567)]
+    mirror = open_mirror(max_lag=300)
+    mirror.sync()
+
+    clock.advance(301)
+
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (False, None)
+    assert mirror.stats()['databases'][JOBS]['fresh'] is False
+    assert (mirror.hits, mirror.misses) == (0, 1)
+
+
+def test_failed_sync_keeps_the_cursor_of_the_batches_written(open_mirror, databases, monkeypatch):
+    monkeypatch.setattr(notion_mirror, 'SYNC_BATCH_SIZE', 2)
+    databases.pages = [page(f'p{n}', f'2026-01-01T1{n}:00:00.000Z') for n in range(5)]
+    # The second result page fails, after the first was written
+    databases.page_size = 2
+    databases.fail_after = 1
+    mirror = open_mirror()
+
+    assert mirror.sync_database(JOBS) is False
+
+    stats = mirror.stats()['databases'][JOBS]
+    assert stats['last_error'] == "Notion unavailable"
+    assert stats['cursor'] == '2026-01-01T11:00:00.000Z'
+    assert stats['fresh'] is False
+    assert stats['pages'] == 2
+
+
+def test_pages_saved_through_the_backend_are_mirrored_right_away(open_mirror, databases):
+    mirror = open_mirror()
+    mirror.sync()
+
+    mirror.upsert(JOBS, page('new', '2026-01-01T10:00:00.000Z', job_id=3881234567))
+
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (True, 'new')
+
+
+def test_sync_state_survives_a_restart(open_mirror, databases):
+    databases.pages = [page('p1', '2026-01-01T10:00:00.000Z', job_id=3881234567)]
+    open_mirror().sync()
+    databases.queries.clear()
+
+    mirror = open_mirror()
+
+    assert mirror.find_posting(JOBS, 3881234567, 'unused') == (True, 'p1')
+    mirror.sync_database(JOBS)
+    assert databases.queries[0]['filter'] is not None
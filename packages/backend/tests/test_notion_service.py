@@ -0,0 +1,148 @@
+"""Tests for NotionService against the fake Notion API."""
+import pytest
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.services.description_blocks import block_text, description_blocks
+from src.services.notion_service import NotionService
+
+JOBS_DATABASE_ID = 'jobs'
+
+
+@pytest.fixture
+def notion():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    notion.base_url = server.base_url
+    yield notion
+    server.stop()
+
+
+@pytest.fixture
+def service(notion):
+    service = NotionService('secret_test', JOBS_DATABASE_ID, base_url=notion.base_url, max_retries=0)
+    yield service
+    service.close()
+
+
+def page_with_description(notion, service, *paragraphs):
+    page = notion.add_page(JOBS_DATABASE_ID, {})
+    service.client.blocks.children.append(block_id=page['id'], children=description_blocks(list(paragraphs)))
+    notion.calls.clear()
+    return page['id']
+
+
+def page_texts(notion, page_id):
+    return [(block['type'], block_text(block)) for block in notion.blocks[page_id]]
+
+
+def test_unchanged_description_only_lists_the_blocks(notion, service):
+    page_id = page_with_description(notion, service, 'Intro', 'Details')
+
+    assert service._write_description(page_id, 'Intro\n\nDetails') == {
+        'updated': [], 'deleted': [], 'appended': [], 'failed': []
+    }
+    assert notion.calls == {'blocks.children.list': 1}
+
+
+def test_changed_paragraph_is_updated_in_place(notion, service):
+    page_id = page_with_description(notion, service, 'Intro', 'Details', 'Benefits')
+    block_ids = [block['id'] for block in notion.blocks[page_id]]
+
+    report = service._write_description(page_id, 'Intro\n\nNew details\n\nBenefits')
+
+    assert report['updated'] == [block_ids[1]]
+
+    assert notion.calls == {'blocks.children.list': 1, 'blocks.update': 1}
+    assert [block['id'] for block in notion.blocks[page_id]] == block_ids
+    assert page_texts(notion, page_id) == [('callout', 'Intro'), ('paragraph', 'New details'),
+                                           ('paragraph', 'Benefits')]
+
+
+def test_blocks_added_in_notion_do_not_end_up_before_the_description(notion, service):
+    page_id = page_with_description(notion, service, 'Intro', 'Details')
+    service.client.blocks.children.append(block_id=page_id, children=[
+        {"object": "block", "type": "heading_2",
+         "heading_2": {"rich_text": [{"type": "text", "text": {"content": "My notes"}}]}}
+    ])
+    notion.calls.clear()
+
+    report = service._write_description(page_id, 'Intro\n\nDetails\n\nBenefits')
+
+    assert len(report['deleted']) == 1 and len(report['appended']) == 1
+
+    assert notion.calls == {'blocks.children.list': 1, 'blocks.delete': 1, 'blocks.children.append': 1}
+    assert page_texts(notion, page_id) == [('callout', 'Intro'), ('paragraph', 'Details'),
+                                           ('paragraph', 'Benefits')]
+
+
+def test_shorter_description_deletes_only_the_extra_blocks(notion, service):
+    page_id = page_with_description(notion, service, 'Intro', 'Details', 'Benefits', 'Apply')
+
+    report = service._write_description(page_id, 'Intro\n\nDetails')
+
+    assert len(report['deleted']) == 2 and report['failed'] == []
+    assert notion.calls == {'blocks.children.list': 1, 'blocks.delete': 2}
+    assert page_texts(notion, page_id) == [('callout', 'Intro'), ('paragraph', 'Details')]
+
+
+def fail_block_updates(notion):
+    """Make the fake API reject every blocks.update call."""
+    handle = notion.handle
+
+    def failing(method, path, query, body):
+        if method == 'PATCH' and '/blocks/' in path and not path.rstrip('/').endswith('/children'):
+            return 409, {"object": "error", "status": 409, "code": "conflict_error", "message": "Conflict"}, {}
+        return handle(method, path, query, body)
+
+    notion.handle = failing
+
+
+def test_failed_block_updates_are_reported_instead_of_raised(notion, service):
+    page_id = page_with_description(notion, service, 'Intro', 'Details', 'Benefits')
+    fail_block_updates(notion)
+
+    report = service._write_description(page_id, 'Intro\n\nNew details')
+
+    assert report['updated'] == []
+    assert [(failure['operation'], failure['block_id']) for failure in report['failed']] == [
+        ('update', notion.blocks[page_id][1]['id'])
+    ]
+    assert len(report['deleted']) == 1
+
+
+def test_update_returns_the_description_report_and_rewrites_a_partial_description(notion, service):
+    page = notion.add_page(JOBS_DATABASE_ID, {})
+    fields = {'position': 'Engineer', 'company': 'Acme',
+              'posting_url': 'https://www.linkedin.com/jobs/view/3881234567/'}
+    service.update_job_posting(page['id'], job_description='Intro\n\nDetails', **fields)
+    fail_block_updates(notion)
+
+    updated = service.update_job_posting(page['id'], job_description='Intro\n\nNew details', **fields)
+
+    assert updated['id'] == page['id']
+    assert len(updated['description_report']['failed']) == 1
+    # The partly written description is not recorded as current, so the same text is tried again
+    notion.calls.clear()
+    again = service.update_job_posting(page['id'], job_description='Intro\n\nNew details', **fields)
+    assert again['description_report'] is not None
+    assert notion.calls.get('blocks.children.list') == 1
+
+
+def test_open_circuit_fails_the_company_lookup_instead_of_saving_without_it(notion):
+    breaker = CircuitBreaker(failure_rate=0.5, minimum_calls=1, window=10, open_seconds=30, half_open_calls=1)
+    service = NotionService('secret_test', JOBS_DATABASE_ID, companies_database_id='companies',
+                            base_url=notion.base_url, max_retries=0, circuit_breaker=breaker)
+    notion.error_rate = 1.0
+    try:
+        # An ordinary Notion error still saves the posting without its company
+        assert service.find_or_create_company('Acme Corp') is None
+
+        with pytest.raises(CircuitOpenError):
+            service.find_or_create_company('Acme Corp')
+        with pytest.raises(CircuitOpenError):
+            service.create_job_posting_if_new(position='Engineer', company='Acme Corp', origin='LinkedIn',
+                                              posting_url='https://www.linkedin.com/jobs/view/3881234567/')
+        assert 'pages.create' not in notion.calls
+    finally:
+        service.close()
@@ -0,0 +1,117 @@
+"""Tests for the in-memory posting index."""
+import threading
+
+from benchmarks.fake_notion import FakeNotion, FakeNotionServer
+from src.services import posting_index
+from src.services.notion_service import NotionService
+from src.services.posting_index import PostingIndex
+
+JOBS_DATABASE_ID = 'jobs'
+
+
+def make_index(monkeypatch, clock, entries=None, **kwargs):
+    monkeypatch.setattr(posting_index, 'time', clock)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return list(entries if entries is not None else [(3881234567, 'page-1')])
+
+    return PostingIndex(loader, **kwargs), loads
+
+
+def test_cold_index_tells_the_caller_to_query_notion(monkeypatch, clock):
+    index, loads = make_index(monkeypatch, clock)
+
+    assert index.lookup(3881234567) == (False, None)
+    assert index.misses == 1
+    assert loads == []
+
+
+def test_built_index_answers_saved_and_unsaved_postings(monkeypatch, clock):
+    index, _ = make_index(monkeypatch, clock, entries=[(3881234567, 'page-1'), (None, 'page-2')])
+
+    assert index.rebuild() is True
+
+    assert index.lookup(3881234567) == (True, 'page-1')
+    assert index.lookup(3999999999) == (True, None)
+    assert index.entries() == {3881234567: 'page-1'}
+    assert index.hits == 2
+
+
+def test_index_stops_answering_once_stale(monkeypatch, clock):
+    index, _ = make_index(monkeypatch, clock, max_staleness=900)
+    index.rebuild()
+
+    clock.advance(900)
+    assert index.lookup(3881234567) == (True, 'page-1')
+
+    clock.advance(1)
+    assert index.lookup(3881234567) == (False, None)
+    assert index.stats()['ready'] is False
+
+
+def test_failed_rebuild_keeps_the_previous_entries(monkeypatch, clock):
+    index, _ = make_index(monkeypatch, clock)
+    index.rebuild()
+
+    def failing_loader():
+        raise RuntimeError("Notion unavailable")
+
+    index._loader = failing_loader
+    assert index.rebuild() is False
+
+    assert index.lookup(3881234567) == (True, 'page-1')
+
+
+def test_postings_saved_during_a_rebuild_survive_the_swap(monkeypatch, clock):
+    loading = threading.Event()
+    release = threading.Event()
+    monkeypatch.setattr(posting_index, 'time', clock)
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return [(3881234567, 'page-1')]
+
+    index = PostingIndex(slow_loader)
+    rebuild = threading.Thread(target=index.rebuild)
+    rebuild.start()
+    assert loading.wait(5)
+
+    index.add(3999999999, 'page-2')
+    release.set()
+    rebuild.join(5)
+
+    assert index.entries() == {3881234567: 'page-1', 3999999999: 'page-2'}
+
+
+def test_restore_marks_the_index_built(monkeypatch, clock):
+    index, loads = make_index(monkeypatch, clock)
+
+    index.restore({3881234567: 'page-1'})
+
+    assert index.lookup(3881234567) == (True, 'page-1')
+    assert loads == []
+
+
+def test_warm_index_answers_duplicate_checks_without_a_query():
+    notion = FakeNotion(latency=0)
+    server = FakeNotionServer(notion).start()
+    saved = notion.add_page(JOBS_DATABASE_ID, {
+        'Posting URL': {'url': 'https://www.linkedin.com/jobs/view/3881234567/'}
+    })
+    service = NotionService('secret_test', JOBS_DATABASE_ID, base_url=server.base_url,
+                            max_retries=0, use_posting_index=True)
+    try:
+        assert service.posting_index.rebuild() is True
+        notion.calls.clear()
+
+        assert service.check_duplicate(
+            'https://www.linkedin.com/jobs/view/software-engineer-at-acme-3881234567?trk=feed'
+        ) == saved['id']
+        assert service.check_duplicate('https://www.linkedin.com/jobs/view/3999999999/') is None
+        assert notion.calls == {}
+    finally:
+        service.close()
+        server.stop()
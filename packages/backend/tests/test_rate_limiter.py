@@ -0,0 +1,98 @@
+"""Tests for the token bucket rate limiters."""
+import pytest
+
+from src.services import rate_limiter
+from src.services.rate_limiter import SharedTokenBucket, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+
+
+def reserve(bucket, count):
+    return [round(bucket.reserve(), 6) for _ in range(count)]
+
+
+def test_burst_up_to_capacity_is_not_delayed():
+    bucket = TokenBucket(rate=3, capacity=3)
+    assert reserve(bucket, 3) == [0, 0, 0]
+
+
+def test_callers_past_capacity_queue_up_in_debt():
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    # Each reservation beyond the burst waits one more token interval than the previous one
+    assert reserve(bucket, 5) == [0, 0, 0.5, 1.0, 1.5]
+    assert bucket.stats()['delayed'] == 3
+    assert bucket.stats()['wait_seconds'] == 3.0
+
+
+def test_debt_is_paid_back_at_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    reserve(bucket, 4)  # two tokens of debt
+
+    clock.advance(1.0)
+    assert reserve(bucket, 1) == [0.5]
+    clock.advance(1.5)
+    assert reserve(bucket, 1) == [0]
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    reserve(bucket, 2)
+
+    clock.advance(60)
+    assert reserve(bucket, 3) == [0, 0, 1.0]
+
+
+def test_pause_holds_back_callers_with_tokens_left(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(5)
+
+    assert reserve(bucket, 1) == [5.0]
+    clock.advance(5)
+    assert reserve(bucket, 1) == [0]
+
+
+def test_shorter_pause_does_not_cut_a_longer_one(clock):
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(5)
+    bucket.pause(1)
+    clock.advance(2)
+
+    assert reserve(bucket, 1) == [3.0]
+
+
+def test_wait_is_the_longer_of_debt_and_pause():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.pause(0.5)
+
+    assert reserve(bucket, 3) == [0.5, 1.0, 2.0]
+
+
+def test_acquire_sleeps_for_the_reserved_wait(clock):
+    bucket = TokenBucket(rate=4, capacity=1)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.25
+    assert clock.slept == [0.25]
+
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0)
+    assert reserve(bucket, 100) == [0] * 100
+
+
+def test_shared_bucket_state_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / 'bucket.db')
+    first = SharedTokenBucket(path, rate=2, capacity=2)
+    second = SharedTokenBucket(path, rate=2, capacity=2)
+
+    assert reserve(first, 2) == [0, 0]
+    assert reserve(second, 1) == [0.5]
+
+    second.pause(3)
+    assert reserve(first, 1) == [3.0]
+    clock.advance(10)
+    assert reserve(second, 1) == [0]
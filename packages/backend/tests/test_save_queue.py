@@ -0,0 +1,129 @@
+"""Tests for the write-behind save queue and its SQLite journal."""
+import sqlite3
+import time
+
+import pytest
+
+from src.services import save_queue as save_queue_module
+from src.services.save_queue import PROCESSING, QUEUED, SaveQueue
+
+PAYLOAD = {'position': 'Software Engineer', 'posting_url': 'https://www.linkedin.com/jobs/view/3881234567/'}
+
+
+def wait_for_state(queue, job_id, states=('completed', 'duplicate', 'failed'), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.get(job_id)
+        if status['state'] in states:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"{job_id} still {queue.get(job_id)['state']}")
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / 'journal.db')
+
+
+@pytest.fixture
+def queues():
+    started = []
+    yield started
+    for queue in started:
+        queue.stop()
+
+
+def test_submitted_save_is_processed_in_the_background(journal, queues):
+    processed = []
+    queue = SaveQueue(journal, lambda payload: processed.append(payload) or {'state': 'completed'})
+    job_id = queue.submit(PAYLOAD)
+    assert queue.get(job_id)['state'] == QUEUED
+
+    queues.append(queue)
+    queue.start()
+    status = wait_for_state(queue, job_id)
+
+    assert status['state'] == 'completed'
+    assert status['attempts'] == 1
+    assert processed == [PAYLOAD]
+    assert queue.pending_count() == 0
+
+
+def test_failing_save_is_retried_then_marked_failed(journal, queues):
+    attempts = []
+
+    def process(payload):
+        attempts.append(1)
+        raise RuntimeError("Notion unavailable")
+
+    queue = SaveQueue(journal, process, workers=1, max_attempts=3, retry_delay=0)
+    job_id = queue.submit(PAYLOAD)
+    queues.append(queue)
+    queue.start()
+    status = wait_for_state(queue, job_id)
+
+    assert status['state'] == 'failed'
+    assert status['attempts'] == 3
+    assert status['error'] == "Notion unavailable"
+    assert len(attempts) == 3
+
+
+def test_pending_saves_survive_a_restart(journal, queues):
+    SaveQueue(journal, lambda payload: {'state': 'completed'}).submit(PAYLOAD)
+
+    queue = SaveQueue(journal, lambda payload: {'state': 'duplicate'})
+    assert queue.pending_count() == 1
+    queues.append(queue)
+    queue.start()
+
+    job_id = queue._conn.execute("SELECT id FROM saves").fetchone()['id']
+    assert wait_for_state(queue, job_id)['state'] == 'duplicate'
+
+
+def test_entry_leased_to_a_live_queue_is_not_taken_over(journal, clock, monkeypatch):
+    monkeypatch.setattr(save_queue_module, 'time', clock)
+    first = SaveQueue(journal, lambda payload: {}, lease=60)
+    second = SaveQueue(journal, lambda payload: {}, lease=60)
+    job_id = first.submit(PAYLOAD)
+
+    assert first._claim()['id'] == job_id
+    clock.advance(50)
+    first._renew_leases()
+    clock.advance(50)
+
+    assert second._claim() is None
+    assert first.get(job_id)['state'] == PROCESSING
+
+
+def test_expired_lease_is_recovered_by_another_queue(journal, clock, monkeypatch):
+    monkeypatch.setattr(save_queue_module, 'time', clock)
+    crashed = SaveQueue(journal, lambda payload: {}, lease=60)
+    survivor = SaveQueue(journal, lambda payload: {}, lease=60)
+    job_id = crashed.submit(PAYLOAD)
+    crashed._claim()
+
+    clock.advance(61)
+    row = survivor._claim()
+
+    assert row['id'] == job_id
+    survivor._finish(job_id, 'completed', result={'state': 'completed'})
+    # The late result of the queue that lost the lease is dropped
+    crashed._finish(job_id, 'failed', error="too late")
+    status = survivor.get(job_id)
+    assert (status['state'], status['attempts'], status['error']) == ('completed', 2, None)
+
+
+def test_processing_entries_of_an_old_journal_are_recovered(journal):
+    conn = sqlite3.connect(journal, isolation_level=None)
+    conn.execute(
+        "CREATE TABLE saves (id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL, result TEXT, error TEXT)"
+    )
+    conn.execute("INSERT INTO saves (id, payload, state, attempts, next_attempt_at, created_at, updated_at) "
+                 "VALUES ('old', '{}', ?, 1, 0, 0, 0)", (PROCESSING,))
+    conn.close()
+
+    queue = SaveQueue(journal, lambda payload: {})
+
+    assert queue._claim()['id'] == 'old'
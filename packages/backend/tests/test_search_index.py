@@ -0,0 +1,125 @@
+"""Tests for the full-text search index of saved postings."""
+import pytest
+
+from src.api.payloads import parse_search
+from src.services import search_index
+from src.services.search_index import SearchIndex, fts_query
+
+
+@pytest.fixture
+def index(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(search_index, 'time', clock)
+    return SearchIndex(str(tmp_path / 'search.db'))
+
+
+def page_ids(results):
+    return [result['page_id'] for result in results]
+
+
+def test_fts_query_quotes_words_and_keeps_prefixes():
+    assert fts_query('python  AND "django"') == '"python" "AND" "django"'
+    assert fts_query('eng* (remote)') == '"eng"* "remote"'
+    assert fts_query('-- !!') is None
+
+
+def test_matches_in_the_position_rank_above_matches_in_the_description(index):
+    index.upsert('described', position='Data Analyst', company='Acme',
+                 description='Some Python scripting. ' * 5)
+    index.upsert('titled', position='Python Developer', company='Initech', description='Build services.')
+    # bm25 needs postings without the word to give it any weight
+    for n in range(3):
+        index.upsert(f'other-{n}', position='Go Developer', company='Globex', description='Build services.')
+
+    results, total = index.search('python')
+
+    assert total == 2
+    assert page_ids(results) == ['titled', 'described']
+    assert results[0]['score'] > results[1]['score'] > 0
+
+
+def test_every_word_must_match_and_prefixes_expand(index):
+    index.upsert('p1', position='Senior Engineer', company='Acme', description='Remote friendly')
+    index.upsert('p2', position='Engineering Manager', company='Acme', description='On-site')
+
+    assert page_ids(index.search('engineer remote')[0]) == ['p1']
+    assert sorted(page_ids(index.search('engineer*')[0])) == ['p1', 'p2']
+
+
+def test_diacritics_and_punctuation_do_not_break_the_search(index):
+    index.upsert('p1', position='Développeur Backend', company='Société Générale')
+
+    assert page_ids(index.search('developpeur')[0]) == ['p1']
+    assert page_ids(index.search('societe "generale')[0]) == ['p1']
+
+
+def test_updates_replace_indexed_terms_and_keep_omitted_fields(index):
+    index.upsert('p1', position='Java Developer', company='Acme', country='Germany',
+                 description='Spring and Kafka')
+
+    index.upsert('p1', position='Kotlin Developer')
+
+    assert index.search('java')[1] == 0
+    assert page_ids(index.search('kotlin kafka')[0]) == ['p1']
+    result = index.search('kotlin')[0][0]
+    assert (result['company'], result['country']) == ('Acme', 'Germany')
+    assert index.count() == 1
+
+
+def test_filters_narrow_the_results(index):
+    index.upsert('p1', position='Engineer', match='high', work_arrangement='remote', country='Germany', budget=90000)
+    index.upsert('p2', position='Engineer', match='high', work_arrangement='hybrid', country='germany', budget=60000)
+    index.upsert('p3', position='Engineer', match='low', work_arrangement='remote', country='France')
+
+    assert sorted(page_ids(index.search('engineer', match='high')[0])) == ['p1', 'p2']
+    assert page_ids(index.search('engineer', work_arrangement='remote', match='high')[0]) == ['p1']
+    assert sorted(page_ids(index.search(country='GERMANY')[0])) == ['p1', 'p2']
+    # Postings without a budget never match a budget range
+    assert page_ids(index.search(budget_min=50000, budget_max=70000)[0]) == ['p2']
+    assert sorted(page_ids(index.search(budget_min=0)[0])) == ['p1', 'p2']
+
+
+def test_without_keywords_postings_are_listed_newest_first_and_paged(index, clock):
+    for n in range(5):
+        index.upsert(f'p{n}', position='Engineer', description='x' * 300)
+        clock.advance(1)
+
+    results, total = index.search(limit=2, offset=1)
+
+    assert total == 5
+    assert page_ids(results) == ['p3', 'p2']
+    assert results[0]['score'] is None
+    assert len(results[0]['snippet']) == 200
+
+
+def test_snippet_highlights_the_matched_words(index):
+    index.upsert('p1', position='Engineer', description='We use Terraform to manage infrastructure.')
+
+    assert '**Terraform**' in index.search('terraform')[0][0]['snippet']
+
+
+def test_index_is_kept_across_reopens(tmp_path):
+    path = str(tmp_path / 'search.db')
+    SearchIndex(path).upsert('p1', position='Site Reliability Engineer')
+
+    reopened = SearchIndex(path)
+
+    assert reopened.contains('p1')
+    assert page_ids(reopened.search('reliability')[0]) == ['p1']
+
+
+@pytest.mark.parametrize('args, error', [
+    ({'match': 'great'}, "match must be one of: low, medium, high"),
+    ({'budget_min': 'lots'}, "budget_min must be a number"),
+    ({'limit': '0'}, "limit must be between 1 and 100"),
+    ({'offset': '-1'}, "offset must not be negative"),
+])
+def test_invalid_search_parameters_are_rejected(args, error):
+    assert parse_search(args) == (error, {})
+
+
+def test_search_parameters_are_converted():
+    error, params = parse_search({'q': 'python', 'budget_max': '120000', 'limit': '5'})
+
+    assert error is None
+    assert params == {"query": 'python', "match": None, "work_arrangement": None, "country": None,
+                      "budget_min": None, "budget_max": 120000.0, "limit": 5, "offset": 0}
@@ -0,0 +1,164 @@
+"""Tests for coalescing concurrent calls with SingleFlight."""
+import asyncio
+import threading
+import time
+
+from src.services.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class NotionDown(Exception):
+    pass
+
+
+def run_concurrently(flight, key, fn, callers):
+    """Call flight.do from several threads while the first call is held open."""
+    results = [None] * callers
+    errors = [None] * callers
+
+    def caller(index):
+        try:
+            results[index] = flight.do(key, fn)
+        except BaseException as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=caller, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def held_call(release, outcome):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return fn, calls
+
+
+def wait_for_waiters(flight):
+    deadline = time.monotonic() + 5
+    while flight.in_flight() == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # Give the other callers time to reach the in-flight call
+    time.sleep(0.05)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    fn, calls = held_call(release, 'company-page')
+
+    threads, results, errors = run_concurrently(flight, 'acme', fn, 5)
+    wait_for_waiters(flight)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['company-page'] * 5
+    assert errors == [None] * 5
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter_and_the_key_is_forgotten():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = NotionDown('Notion unavailable')
+    fn, calls = held_call(release, error)
+
+    threads, results, errors = run_concurrently(flight, 'acme', fn, 4)
+    wait_for_waiters(flight)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert errors == [error] * 4
+    assert flight.in_flight() == 0
+    # The failure is not cached: the next caller runs the function again
+    assert flight.do('acme', lambda: 'retried') == 'retried'
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+
+
+async def gather_callers(flight, key, fn, callers):
+    tasks = [asyncio.ensure_future(flight.do(key, fn)) for _ in range(callers)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_async_callers_share_one_call():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return 'company-page'
+
+        tasks = await gather_callers(flight, 'acme', fn, 5)
+        assert flight.in_flight() == 1
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return calls, results, flight.in_flight()
+
+    calls, results, in_flight = asyncio.run(scenario())
+    assert calls == [1]
+    assert results == ['company-page'] * 5
+    assert in_flight == 0
+
+
+def test_async_error_reaches_every_waiter():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise NotionDown('Notion unavailable')
+
+        tasks = await gather_callers(flight, 'acme', fn, 3)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        retried = await flight.do('acme', _retried)
+        return results, retried
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, NotionDown) for result in results)
+    assert len({id(result) for result in results}) == 1
+    assert retried == 'retried'
+
+
+async def _retried():
+    return 'retried'
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return 'company-page'
+
+        first, second = await gather_callers(flight, 'acme', fn, 2)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first.cancelled(), await second
+
+    cancelled, result = asyncio.run(scenario())
+    assert cancelled
+    assert result == 'company-page'
@@ -0,0 +1,139 @@
+"""Tests for the retry policy of the throttled Notion clients."""
+import asyncio
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError
+
+from src.services import rate_limiter, throttled_client
+from src.services.rate_limiter import TokenBucket
+from src.services.throttled_client import AsyncThrottledClient, ThrottledClient
+
+PAGE = {"object": "page", "id": "page-1"}
+QUERY = {"object": "list", "results": [], "has_more": False, "next_cursor": None}
+
+
+@pytest.fixture(autouse=True)
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    monkeypatch.setattr(throttled_client, 'time', clock)
+
+
+def error(status, code, retry_after=None):
+    headers = {'Retry-After': retry_after} if retry_after is not None else {}
+    return httpx.Response(status, headers=headers,
+                          json={"object": "error", "status": status, "code": code, "message": code})
+
+
+def scripted(*responses):
+    """Transport answering requests with the given responses in order; records the requests."""
+    requests = []
+    queue = list(responses)
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        return queue.pop(0)
+
+    return httpx.MockTransport(handler), requests
+
+
+def make_client(*responses, max_retries=3):
+    transport, requests = scripted(*responses)
+    client = ThrottledClient(TokenBucket(rate=100), max_retries=max_retries, base_delay=0.5,
+                             auth='secret_test', client=httpx.Client(transport=transport))
+    return client, requests
+
+
+def test_rate_limited_request_waits_for_retry_after_and_pauses_the_bucket(clock):
+    client, requests = make_client(error(429, 'rate_limited', '2'), httpx.Response(200, json=PAGE))
+
+    assert client.pages.create(parent={"database_id": "jobs"}, properties={}) == PAGE
+
+    # Page creation is not idempotent, but a 429 means Notion did not process it
+    assert requests == [('POST', '/v1/pages'), ('POST', '/v1/pages')]
+    assert len(clock.slept) == 1 and 2 <= clock.slept[0] <= 2.5
+    assert client.bucket._pause_until == pytest.approx(1_000_000.0 + clock.slept[0])
+    assert (client.stats()['retries'], client.stats()['rate_limited_responses']) == (1, 1)
+
+
+def test_rate_limited_request_without_retry_after_backs_off():
+    client, requests = make_client(error(429, 'rate_limited'), httpx.Response(200, json=QUERY))
+
+    client.databases.query(database_id='jobs')
+
+    assert len(requests) == 2
+    assert 0.25 <= client.stats()['backoff_seconds'] <= 0.5
+
+
+def test_server_error_on_a_query_is_retried_with_its_retry_after(clock):
+    client, requests = make_client(error(503, 'service_unavailable', '3'), httpx.Response(200, json=QUERY))
+
+    assert client.databases.query(database_id='jobs') == QUERY
+
+    assert len(requests) == 2
+    assert clock.slept == [3.0]
+
+
+def test_server_error_on_page_creation_is_not_retried():
+    client, requests = make_client(error(503, 'service_unavailable'))
+
+    with pytest.raises(APIResponseError):
+        client.pages.create(parent={"database_id": "jobs"}, properties={})
+
+    assert len(requests) == 1
+    assert client.stats()['retries'] == 0
+
+
+def test_client_errors_are_not_retried():
+    client, requests = make_client(error(400, 'validation_error'))
+
+    with pytest.raises(APIResponseError) as raised:
+        client.databases.query(database_id='jobs')
+
+    assert raised.value.code == 'validation_error'
+    assert len(requests) == 1
+
+
+def test_gives_up_after_max_retries(clock):
+    client, requests = make_client(*[error(503, 'service_unavailable')] * 3, max_retries=2)
+
+    with pytest.raises(APIResponseError):
+        client.databases.query(database_id='jobs')
+
+    assert len(requests) == 3
+    # Jittered exponential backoff: attempt n waits between half and all of base_delay * 2**n
+    assert 0.25 <= clock.slept[0] <= 0.5 and 0.5 <= clock.slept[1] <= 1.0
+
+
+def test_timeout_on_a_read_is_retried(clock):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json=PAGE)
+
+    client = ThrottledClient(TokenBucket(rate=100), max_retries=3, base_delay=0.5, auth='secret_test',
+                             client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    assert client.pages.retrieve(page_id='page-1') == PAGE
+    assert len(calls) == 2
+
+
+def test_async_client_retries_a_rate_limited_request():
+    transport, requests = scripted(error(429, 'rate_limited', '0'), httpx.Response(200, json=PAGE))
+
+    async def scenario():
+        client = AsyncThrottledClient(TokenBucket(rate=100), max_retries=3, base_delay=0.01,
+                                      auth='secret_test', client=httpx.AsyncClient(transport=transport))
+        try:
+            return await client.pages.create(parent={"database_id": "jobs"}, properties={}), client.stats()
+        finally:
+            await client.aclose()
+
+    page, stats = asyncio.run(scenario())
+
+    assert page == PAGE
+    assert len(requests) == 2
+    assert (stats['retries'], stats['rate_limited_responses']) == (1, 1)
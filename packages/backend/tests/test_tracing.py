@@ -0,0 +1,89 @@
+"""Tests for request tracing and the trace debug endpoints' access rules."""
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from src.api import request_tracing
+from src.config.settings import Config
+from src.services.tracing import TraceStore, _current_trace, end_trace, record_span, start_trace, traced
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = TraceStore(str(tmp_path / 'traces'), max_traces=10)
+    monkeypatch.setattr(request_tracing, 'trace_store', store)
+    monkeypatch.setattr(Config, 'TRACING_ENABLED', False)
+    monkeypatch.setattr(Config, 'TRACING_TOKEN', 'secret')
+    monkeypatch.setattr(Config, 'TRACE_PROFILE_SAMPLE_RATE', 0.0)
+    return store
+
+
+@pytest.fixture
+def client(store):
+    app = Flask(__name__)
+    request_tracing.init_app(app)
+
+    @app.route('/work')
+    def work():
+        traced_work()
+        return jsonify({"traced": _current_trace.get() is not None})
+
+    return app.test_client()
+
+
+@traced('work')
+def traced_work():
+    record_span('notion pages.create', time.perf_counter())
+
+
+def test_end_trace_restores_the_context():
+    trace = start_trace('abc', 'GET', '/')
+    traced_work()
+    end_trace(trace)
+
+    assert _current_trace.get() is None
+    spans = {span['name']: span for span in trace.to_dict(200)['spans']}
+    assert spans['notion pages.create']['parent'] == spans['work']['id']
+    record_span('notion pages.create', time.perf_counter())
+    assert len(trace.spans) == 2
+
+
+def test_trace_does_not_leak_into_the_next_request_on_the_thread(client, store):
+    traced_response = client.get('/work', headers={'X-Debug-Trace': 'secret'})
+    untraced_response = client.get('/work')
+
+    assert traced_response.get_json() == {"traced": True}
+    assert untraced_response.get_json() == {"traced": False}
+    assert 'X-Request-ID' not in untraced_response.headers
+    assert len(store.recent()) == 1
+
+
+def test_trace_ids_are_generated_by_the_server(client, store):
+    first = client.get('/work', headers={'X-Debug-Trace': 'secret', 'X-Request-ID': 'mine'})
+    second = client.get('/work', headers={'X-Debug-Trace': 'secret', 'X-Request-ID': 'mine'})
+
+    first_id = first.headers['X-Request-ID']
+    second_id = second.headers['X-Request-ID']
+    assert 'mine' not in (first_id, second_id)
+    assert first_id != second_id
+    assert store.load(first_id)['client_request_id'] == 'mine'
+    assert store.load(second_id)['client_request_id'] == 'mine'
+    assert store.load('mine') is None
+
+
+def test_debug_endpoints_require_the_token(store, monkeypatch):
+    assert request_tracing.debug_access_error({'X-Debug-Trace': 'secret'}) is None
+    assert request_tracing.debug_access_error({'X-Debug-Trace': 'wrong'})[1] == 403
+    assert request_tracing.debug_access_error({})[1] == 403
+
+    # Tracing every request does not open the endpoints
+    monkeypatch.setattr(Config, 'TRACING_ENABLED', True)
+    monkeypatch.setattr(Config, 'TRACING_TOKEN', '')
+    assert request_tracing.debug_access_error({})[1] == 403
+    assert request_tracing.debug_access_error({'X-Debug-Trace': ''})[1] == 403
+
+
+def test_debug_endpoints_are_missing_when_tracing_is_off(monkeypatch):
+    monkeypatch.setattr(request_tracing, 'trace_store', None)
+    assert request_tracing.debug_access_error({'X-Debug-Trace': 'secret'})[1] == 404
@@ -0,0 +1,42 @@
+"""Tests for job posting request validation."""
+import pytest
+
+from src.api.validators import validate_job_posting
+
+
+def posting(**fields):
+    return dict({
+        "position": "Software Engineer",
+        "company": "Acme",
+        "posting_url": "https://www.linkedin.com/jobs/view/3881234567",
+        "origin": "LinkedIn"
+    }, **fields)
+
+
+def test_valid_posting():
+    assert validate_job_posting(posting(city="Berlin", match=None, budget=1000)) == (True, None)
+
+
+@pytest.mark.parametrize('field', ['position', 'company', 'posting_url', 'origin'])
+@pytest.mark.parametrize('value', [123, 1.5, True, None, ['a'], {'a': 1}])
+def test_required_fields_must_be_strings(field, value):
+    assert validate_job_posting(posting(**{field: value})) == (False, f"{field} must be a string")
+
+
+@pytest.mark.parametrize('field', ['match', 'work_arrangement', 'demand', 'city', 'country',
+                                   'job_description'])
+@pytest.mark.parametrize('value', [123, ['remote'], {'text': 'x'}])
+def test_optional_text_fields_must_be_strings(field, value):
+    assert validate_job_posting(posting(**{field: value})) == (False, f"{field} must be a string")
+
+
+@pytest.mark.parametrize('data', [None, [], 'posting', 123])
+def test_payload_must_be_an_object(data):
+    assert validate_job_posting(data) == (False, "job posting must be an object")
+
+
+def test_missing_and_empty_fields():
+    data = posting()
+    del data['company']
+    assert validate_job_posting(data) == (False, "company is required")
+    assert validate_job_posting(posting(position="  ")) == (False, "position cannot be empty")
@@ -5,12 +5,18 @@ Run with:
     OR
     flask run --debug
 """
-from src.app import create_app
+import os
+
+from src.app import create_app, start_background_tasks
 from src.config.settings import Config
 
 app = create_app()
 
 if __name__ == "__main__":
+    # Warm up caches before the first request; with the debug reloader
+    # only the child process (WERKZEUG_RUN_MAIN) serves requests
+    if not Config.FLASK_DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
     print(f"Starting server on http://127.0.0.1:{Config.FLASK_PORT}")
     app.run(
         host='127.0.0.1',
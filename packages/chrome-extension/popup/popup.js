@@ -33,6 +33,9 @@ let extractedJobDescription = null;
 let existingPageId = null;
 let existingPageUrl = null;
 
+// Idempotency key of the last save that did not succeed, reused when the same data is retried
+let pendingSave = null;
+
 /**
  * Ensure content script is loaded on the current tab
  * Injects content script if not already loaded (e.g., extension just installed or reloaded)
@@ -75,11 +78,10 @@ async function checkJobExists(postingUrl) {
   console.log('[Popup] Checking if job exists:', postingUrl);
   
   try {
+    // No custom headers: a simple GET needs no CORS preflight, and the browser's
+    // HTTP cache revalidates answers with If-None-Match (ETag) instead of refetching
     const response = await fetch(`${BACKEND_URL}/api/job-postings/check?posting_url=${encodeURIComponent(postingUrl)}`, {
-      method: 'GET',
-      headers: {
-        'Content-Type': 'application/json'
-      }
+      method: 'GET'
     });
     
     if (!response.ok) {
@@ -414,14 +416,21 @@ async function saveJobToNotion(jobData) {
   console.log('[Popup] Sending data to backend:', jobData);
   console.log('[Popup] Backend URL:', BACKEND_URL);
   
+  // A retry of the same data reuses the key so the backend saves it at most once
+  const body = JSON.stringify(jobData);
+  if (!pendingSave || pendingSave.body !== body) {
+    pendingSave = { body, idempotencyKey: crypto.randomUUID() };
+  }
+  
   try {
     console.log('[Popup] Initiating fetch request...');
     const response = await fetch(`${BACKEND_URL}/api/job-postings`, {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        'Idempotency-Key': pendingSave.idempotencyKey
       },
-      body: JSON.stringify(jobData)
+      body
     });
     
     console.log('[Popup] Fetch completed');
@@ -448,6 +457,10 @@ async function saveJobToNotion(jobData) {
       if (response.status === 429) {
         // Rate limit
         throw new Error('Notion API rate limit reached. Retry in 5 seconds?');
+      } else if (response.status === 503) {
+        // Backend is failing fast while Notion is down
+        const retryAfter = data.retry_after || response.headers.get('Retry-After') || 30;
+        throw new Error(`Notion is temporarily unavailable. Retry in ${retryAfter} seconds?`);
       } else if (response.status === 504) {
         // Timeout
         throw new Error('Notion API timeout. Would you like to retry?');
@@ -459,6 +472,7 @@ async function saveJobToNotion(jobData) {
       }
     }
     
+    pendingSave = null;
     return data;
   } catch (error) {
     console.error('[Popup] Caught error:', error);